@@ -19,7 +19,11 @@ from app.models.passage import Passage
 from app.models.link import Link
 from app.models.feedback import Feedback
 from app.models.bookmark import Bookmark
-from app.models.analytics import VisitLog, Image
+from app.models.reading_session import ReadingSession
+from app.models.analytics import (
+    VisitLog, PassageVisitRollup, StoryVisitRollup, TransitionRollup, PassageDwellRollup,
+    PassageReaderSketch, StoryReaderSketch, StatCounter, Image
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,28 @@
+"""Add composite (story_id, name) index on passages
+
+Revision ID: 002_passage_name_index
+Revises: 001_passage_number
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002_passage_name_index'
+down_revision: Union[str, None] = '001_passage_number'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Cover by-name passage lookups on the cold (uncached) path."""
+    # (story_id, passage_number) is already covered by uq_passage_story_number
+    op.create_index('ix_passages_story_name', 'passages', ['story_id', 'name'])
+
+
+def downgrade() -> None:
+    """Drop the by-name lookup index."""
+    op.drop_index('ix_passages_story_name', table_name='passages')
@@ -0,0 +1,54 @@
+"""Add composite indexes for hot query shapes
+
+Revision ID: 003_hot_query_indexes
+Revises: 002_passage_name_index
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003_hot_query_indexes'
+down_revision: Union[str, None] = '002_passage_name_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns) - kept in sync with the models' __table_args__
+INDEXES = [
+    # Outgoing links in link_order (story graph load, CSV export)
+    ('ix_links_source_order', 'links', ['source_passage_id', 'link_order']),
+    ('ix_links_story_source_order', 'links', ['story_id', 'source_passage_id', 'link_order']),
+    # ON DELETE CASCADE from passages
+    ('ix_links_target', 'links', ['target_passage_id']),
+
+    # Passage stats, per-story filters and cascades
+    ('ix_visit_logs_passage_created', 'visit_logs', ['passage_id', 'created_at']),
+    ('ix_visit_logs_story_passage', 'visit_logs', ['story_id', 'passage_id']),
+    ('ix_visit_logs_story_created', 'visit_logs', ['story_id', 'created_at']),
+    ('ix_visit_logs_user', 'visit_logs', ['user_id']),
+
+    # Reply threads and per-passage top-level listing
+    ('ix_feedback_parent_created', 'feedback', ['parent_id', 'created_at']),
+    ('ix_feedback_passage_parent_created', 'feedback', ['passage_id', 'parent_id', 'created_at']),
+    ('ix_feedback_user', 'feedback', ['user_id']),
+
+    # Bookmark listing per user and cascades from passages
+    ('ix_bookmarks_user_created', 'bookmarks', ['user_id', 'created_at']),
+    ('ix_bookmarks_passage', 'bookmarks', ['passage_id']),
+]
+
+
+def upgrade() -> None:
+    """Create indexes matched to the filter/order columns of hot queries."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Drop the hot query indexes."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,109 @@
+"""Add hourly/daily visit rollup tables with backfill
+
+Revision ID: 004_visit_rollups
+Revises: 003_hot_query_indexes
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004_visit_rollups'
+down_revision: Union[str, None] = '003_hot_query_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (granularity, bucket expression over visit_logs.created_at)
+BUCKETS = [
+    ('hour', 'substr(created_at, 1, 13)'),
+    ('day', 'substr(created_at, 1, 10)'),
+]
+
+
+def upgrade() -> None:
+    """Create rollup tables and backfill them from visit_logs."""
+
+    op.create_table(
+        'passage_visit_rollups',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('granularity', sa.String(5), nullable=False),
+        sa.Column('bucket', sa.String(13), nullable=False),
+        sa.Column('story_id', sa.String(36), sa.ForeignKey('stories.id', ondelete='CASCADE'), nullable=True),
+        sa.Column('passage_id', sa.String(36), sa.ForeignKey('passages.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('visit_count', sa.Integer(), nullable=False),
+        sa.UniqueConstraint('granularity', 'bucket', 'passage_id', name='uq_passage_rollup_bucket'),
+    )
+    op.create_index(
+        'ix_passage_rollups_story_bucket', 'passage_visit_rollups',
+        ['story_id', 'granularity', 'bucket']
+    )
+
+    op.create_table(
+        'story_visit_rollups',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('granularity', sa.String(5), nullable=False),
+        sa.Column('bucket', sa.String(13), nullable=False),
+        sa.Column('story_id', sa.String(36), sa.ForeignKey('stories.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('visit_count', sa.Integer(), nullable=False),
+        sa.UniqueConstraint('granularity', 'bucket', 'story_id', name='uq_story_rollup_bucket'),
+    )
+
+    op.create_table(
+        'transition_rollups',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('granularity', sa.String(5), nullable=False),
+        sa.Column('bucket', sa.String(13), nullable=False),
+        sa.Column('story_id', sa.String(36), sa.ForeignKey('stories.id', ondelete='CASCADE'), nullable=True),
+        sa.Column('from_passage_id', sa.String(36), nullable=False),
+        sa.Column('to_passage_id', sa.String(36), sa.ForeignKey('passages.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('transition_count', sa.Integer(), nullable=False),
+        sa.UniqueConstraint(
+            'granularity', 'bucket', 'from_passage_id', 'to_passage_id',
+            name='uq_transition_rollup_bucket'
+        ),
+    )
+    op.create_index(
+        'ix_transition_rollups_story_bucket', 'transition_rollups',
+        ['story_id', 'granularity', 'bucket']
+    )
+
+    # Backfill from the existing visit log
+    conn = op.get_bind()
+    for granularity, bucket in BUCKETS:
+        conn.execute(text(f"""
+            INSERT INTO passage_visit_rollups (id, granularity, bucket, story_id, passage_id, visit_count)
+            SELECT lower(hex(randomblob(16))), '{granularity}', {bucket}, max(story_id), passage_id, count(*)
+            FROM visit_logs
+            GROUP BY {bucket}, passage_id
+        """))
+        conn.execute(text(f"""
+            INSERT INTO story_visit_rollups (id, granularity, bucket, story_id, visit_count)
+            SELECT lower(hex(randomblob(16))), '{granularity}', {bucket}, story_id, count(*)
+            FROM visit_logs
+            WHERE story_id IS NOT NULL
+            GROUP BY {bucket}, story_id
+        """))
+        conn.execute(text(f"""
+            INSERT INTO transition_rollups
+                (id, granularity, bucket, story_id, from_passage_id, to_passage_id, transition_count)
+            SELECT lower(hex(randomblob(16))), '{granularity}', {bucket}, max(story_id),
+                   previous_passage_id, passage_id, count(*)
+            FROM visit_logs
+            WHERE previous_passage_id IS NOT NULL
+            GROUP BY {bucket}, previous_passage_id, passage_id
+        """))
+
+
+def downgrade() -> None:
+    """Drop the rollup tables."""
+    op.drop_index('ix_transition_rollups_story_bucket', table_name='transition_rollups')
+    op.drop_table('transition_rollups')
+    op.drop_table('story_visit_rollups')
+    op.drop_index('ix_passage_rollups_story_bucket', table_name='passage_visit_rollups')
+    op.drop_table('passage_visit_rollups')
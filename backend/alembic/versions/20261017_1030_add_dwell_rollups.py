@@ -0,0 +1,44 @@
+"""Add daily dwell-time histogram rollups
+
+Revision ID: 005_dwell_rollups
+Revises: 004_visit_rollups
+Create Date: 2026-10-17 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005_dwell_rollups'
+down_revision: Union[str, None] = '004_visit_rollups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the dwell histogram table (visit_logs.duration_seconds was never written, so no backfill)."""
+    op.create_table(
+        'passage_dwell_rollups',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('granularity', sa.String(5), nullable=False),
+        sa.Column('bucket', sa.String(13), nullable=False),
+        sa.Column('story_id', sa.String(36), sa.ForeignKey('stories.id', ondelete='CASCADE'), nullable=True),
+        sa.Column('passage_id', sa.String(36), sa.ForeignKey('passages.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('bin', sa.Integer(), nullable=False),
+        sa.Column('visit_count', sa.Integer(), nullable=False),
+        sa.Column('total_seconds', sa.Integer(), nullable=False),
+        sa.UniqueConstraint('granularity', 'bucket', 'passage_id', 'bin', name='uq_passage_dwell_rollup_bin'),
+    )
+    op.create_index(
+        'ix_passage_dwell_rollups_story_bucket', 'passage_dwell_rollups',
+        ['story_id', 'granularity', 'bucket']
+    )
+
+
+def downgrade() -> None:
+    """Drop the dwell histogram table."""
+    op.drop_index('ix_passage_dwell_rollups_story_bucket', table_name='passage_dwell_rollups')
+    op.drop_table('passage_dwell_rollups')
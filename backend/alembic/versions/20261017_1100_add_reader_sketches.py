@@ -0,0 +1,89 @@
+"""Add daily HyperLogLog unique-reader sketches with backfill
+
+Revision ID: 006_reader_sketches
+Revises: 005_dwell_rollups
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from app.services.hyperloglog import HyperLogLog, DEFAULT_PRECISION
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006_reader_sketches'
+down_revision: Union[str, None] = '005_dwell_rollups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create sketch tables and backfill them from signed-in visits in visit_logs."""
+    op.create_table(
+        'passage_reader_sketches',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('bucket', sa.String(10), nullable=False),
+        sa.Column('story_id', sa.String(36), sa.ForeignKey('stories.id', ondelete='CASCADE'), nullable=True),
+        sa.Column('passage_id', sa.String(36), sa.ForeignKey('passages.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('sketch', sa.LargeBinary(), nullable=False),
+        sa.UniqueConstraint('bucket', 'passage_id', name='uq_passage_reader_sketch_bucket'),
+    )
+    op.create_index(
+        'ix_passage_reader_sketches_story_bucket', 'passage_reader_sketches',
+        ['story_id', 'bucket']
+    )
+
+    op.create_table(
+        'story_reader_sketches',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('bucket', sa.String(10), nullable=False),
+        sa.Column('story_id', sa.String(36), sa.ForeignKey('stories.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('sketch', sa.LargeBinary(), nullable=False),
+        sa.UniqueConstraint('bucket', 'story_id', name='uq_story_reader_sketch_bucket'),
+    )
+
+    conn = op.get_bind()
+    passage_sketches = {}
+    story_sketches = {}
+    rows = conn.execute(text("""
+        SELECT DISTINCT substr(created_at, 1, 10), passage_id, story_id, user_id
+        FROM visit_logs
+        WHERE user_id IS NOT NULL
+    """))
+    for bucket, passage_id, story_id, user_id in rows:
+        entry = passage_sketches.setdefault((bucket, passage_id), [story_id, HyperLogLog(DEFAULT_PRECISION)])
+        entry[1].add(user_id)
+        if story_id:
+            story_sketches.setdefault((bucket, story_id), HyperLogLog(DEFAULT_PRECISION)).add(user_id)
+
+    for (bucket, passage_id), (story_id, sketch) in passage_sketches.items():
+        conn.execute(
+            text("""
+                INSERT INTO passage_reader_sketches (id, bucket, story_id, passage_id, sketch)
+                VALUES (:id, :bucket, :story_id, :passage_id, :sketch)
+            """),
+            {
+                "id": str(uuid.uuid4()), "bucket": bucket, "story_id": story_id,
+                "passage_id": passage_id, "sketch": sketch.to_bytes()
+            }
+        )
+    for (bucket, story_id), sketch in story_sketches.items():
+        conn.execute(
+            text("""
+                INSERT INTO story_reader_sketches (id, bucket, story_id, sketch)
+                VALUES (:id, :bucket, :story_id, :sketch)
+            """),
+            {"id": str(uuid.uuid4()), "bucket": bucket, "story_id": story_id, "sketch": sketch.to_bytes()}
+        )
+
+
+def downgrade() -> None:
+    """Drop the sketch tables."""
+    op.drop_table('story_reader_sketches')
+    op.drop_index('ix_passage_reader_sketches_story_bucket', table_name='passage_reader_sketches')
+    op.drop_table('passage_reader_sketches')
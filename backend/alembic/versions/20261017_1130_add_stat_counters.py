@@ -0,0 +1,70 @@
+"""Add trigger-maintained stat counters for the admin overview
+
+Revision ID: 007_stat_counters
+Revises: 006_reader_sketches
+Create Date: 2026-10-17 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007_stat_counters'
+down_revision: Union[str, None] = '006_reader_sketches'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of the schema at this revision; later model changes must not alter it
+# counter name -> counted table
+COUNTED_TABLES = {
+    "users": "users",
+    "stories": "stories",
+    "passages": "passages",
+    "visits": "visit_logs",
+    "feedbacks": "feedback",
+}
+
+
+def counter_trigger_statements() -> list:
+    """AFTER INSERT / AFTER DELETE triggers keeping stat_counters current"""
+    statements = []
+    for name, table in COUNTED_TABLES.items():
+        for action, delta in (("INSERT", "+ 1"), ("DELETE", "- 1")):
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_count_{action.lower()} "
+                f"AFTER {action} ON {table} BEGIN "
+                f"INSERT INTO stat_counters (name, value) VALUES ('{name}', 0 {delta}) "
+                f"ON CONFLICT(name) DO UPDATE SET value = value {delta}; "
+                f"END"
+            )
+    return statements
+
+
+def upgrade() -> None:
+    """Create stat_counters, seed it with exact counts and install the triggers."""
+    op.create_table(
+        'stat_counters',
+        sa.Column('name', sa.String(50), primary_key=True),
+        sa.Column('value', sa.Integer(), nullable=False),
+    )
+
+    conn = op.get_bind()
+    for name, table in COUNTED_TABLES.items():
+        conn.execute(
+            text(f"INSERT INTO stat_counters (name, value) SELECT :name, COUNT(*) FROM {table}"),
+            {"name": name}
+        )
+    for statement in counter_trigger_statements():
+        conn.execute(text(statement))
+
+
+def downgrade() -> None:
+    """Drop the triggers and stat_counters."""
+    for table in COUNTED_TABLES.values():
+        for action in ("insert", "delete"):
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_count_{action}")
+    op.drop_table('stat_counters')
@@ -0,0 +1,46 @@
+"""Add per-user reading sessions (resume point and visited-passage bitset)
+
+Revision ID: 008_reading_sessions
+Revises: 007_stat_counters
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008_reading_sessions'
+down_revision: Union[str, None] = '007_stat_counters'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create reading_sessions; sessions start empty and fill as readers move through stories."""
+    op.create_table(
+        'reading_sessions',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('user_id', sa.String(36), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('story_id', sa.String(36), sa.ForeignKey('stories.id', ondelete='CASCADE'), nullable=False),
+        sa.Column(
+            'last_passage_id', sa.String(36),
+            sa.ForeignKey('passages.id', ondelete='SET NULL'), nullable=True
+        ),
+        sa.Column('visited', sa.LargeBinary(), nullable=False),
+        sa.Column('visited_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.String(26), nullable=True),
+        sa.UniqueConstraint('user_id', 'story_id', name='uq_reading_session_user_story'),
+    )
+    op.create_index(
+        'ix_reading_sessions_user_updated', 'reading_sessions',
+        ['user_id', 'updated_at']
+    )
+
+
+def downgrade() -> None:
+    """Drop reading_sessions."""
+    op.drop_index('ix_reading_sessions_user_updated', table_name='reading_sessions')
+    op.drop_table('reading_sessions')
@@ -8,13 +8,89 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str = "sqlite+aiosqlite:///./data/app.db"
 
+    # SQLite engine profile (applied as PRAGMAs on connect)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE: int = -65536  # negative = KiB, i.e. 64MB
+    SQLITE_MMAP_SIZE: int = 268435456  # 256MB
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # Enforce REFERENCES / ON DELETE CASCADE / SET NULL (off by default in SQLite); the background
+    # writers drop rows whose parents were deleted while queued instead of failing a batch
+    SQLITE_FOREIGN_KEYS: bool = True
+    SQLITE_READ_POOL_SIZE: int = 8
+
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
 
+    # bcrypt thread pool: hashes running at once (0 = CPU count - 1, so the event loop keeps a core),
+    # and requests allowed to wait for a free worker (beyond that: 503; 0 = no queueing)
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE: int = 5242880  # 5MB
 
+    # Compiled-story cache: stories per worker, and seconds before an admin edit made
+    # through another worker is picked up (edits in the same worker apply at once)
+    STORY_CACHE_MAX_STORIES: int = 64
+    STORY_CACHE_TTL_SECONDS: int = 60
+
+    # Authenticated-user cache: entries per worker, and seconds before a name/role change
+    # made through another worker is picked up (changes in the same worker apply at once)
+    USER_CACHE_MAX_USERS: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    PREFETCH_MAX_DEPTH: int = 3
+    PREFETCH_MAX_BYTES: int = 262144  # 256KB
+
+    # Background visit-log writer
+    VISIT_QUEUE_MAX_SIZE: int = 10000
+    VISIT_FLUSH_BATCH_SIZE: int = 500
+    VISIT_FLUSH_INTERVAL_MS: int = 200
+    VISIT_QUEUE_OVERFLOW: str = "drop_newest"  # drop_newest, drop_oldest
+
+    # Dwell-time beacons
+    BEACON_MAX_ITEMS: int = 100
+    BEACON_MAX_BYTES: int = 16384  # 16KB
+    DWELL_MAX_SECONDS: int = 21600  # 6 hours
+
+    # Visit-log retention: months kept in SQLite (current month included), 0 disables archiving
+    VISIT_ARCHIVE_AFTER_MONTHS: int = 3
+    VISIT_ARCHIVE_DIR: str = "./data/visit_archive"
+    VISIT_ARCHIVE_CHECK_HOURS: int = 24
+    VISIT_ARCHIVE_BATCH_SIZE: int = 5000  # rows per read page / archive chunk / delete transaction
+
+    # Unique-reader HyperLogLog sketches: 2^precision registers per sketch
+    HLL_PRECISION: int = 12
+
+    # Transition matrices: seconds before a cached matrix is rebuilt from the rollups
+    # (picks up visits flushed by other worker processes)
+    TRANSITION_MATRIX_TTL_SECONDS: int = 300
+
+    # Overview counters: hours between drift-correcting recounts (0 disables)
+    STAT_COUNTER_RECONCILE_HOURS: int = 24
+
+    # Feedback listings: keyset page size (default / maximum per request)
+    FEEDBACK_PAGE_SIZE: int = 20
+    FEEDBACK_MAX_PAGE_SIZE: int = 100
+
+    # Bookmark sync: maximum passage ids in one PUT /api/bookmarks/sync
+    BOOKMARK_SYNC_MAX_ITEMS: int = 2000
+
+    # Live feedback (Server-Sent Events): per-connection queue, idle heartbeat, per-worker cap
+    FEEDBACK_SSE_QUEUE_SIZE: int = 64
+    FEEDBACK_SSE_HEARTBEAT_SECONDS: int = 15
+    FEEDBACK_SSE_RETRY_MS: int = 3000
+    FEEDBACK_SSE_MAX_SUBSCRIBERS: int = 10000
+
+    # Reading sessions: seconds between coalesced writes, or sooner once this many sessions are pending
+    READING_SESSION_FLUSH_SECONDS: int = 5
+    READING_SESSION_MAX_PENDING: int = 5000
+    READING_SESSION_FLUSH_BATCH_SIZE: int = 500  # sessions per write transaction
+
+    # Streaming exports: rows fetched per server-side cursor round trip
+    EXPORT_YIELD_PER: int = 5000
+
     class Config:
         env_file = ".env"
 
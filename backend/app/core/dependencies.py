@@ -1,18 +1,17 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from typing import Optional
-from app.database import get_db
+from app.database import get_read_db
 from app.core.security import decode_token
-from app.models.user import User
+from app.services.user_cache import CachedUser, user_cache
 
 security = HTTPBearer(auto_error=False)
 
 async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> Optional[User]:
+    db: AsyncSession = Depends(get_read_db)
+) -> Optional[CachedUser]:
     if not credentials:
         return None
 
@@ -24,13 +23,12 @@ async def get_current_user(
     if not user_id:
         return None
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    return user
+    # id / name / role snapshot, served from memory while fresh (see services/user_cache)
+    return await user_cache.get(db, user_id)
 
 async def get_current_user_required(
-    user: Optional[User] = Depends(get_current_user)
-) -> User:
+    user: Optional[CachedUser] = Depends(get_current_user)
+) -> CachedUser:
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -40,8 +38,8 @@ async def get_current_user_required(
     return user
 
 async def get_admin_user(
-    user: User = Depends(get_current_user_required)
-) -> User:
+    user: CachedUser = Depends(get_current_user_required)
+) -> CachedUser:
     if user.role not in ["super_admin", "editor"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -50,8 +48,8 @@ async def get_admin_user(
     return user
 
 async def get_super_admin(
-    user: User = Depends(get_current_user_required)
-) -> User:
+    user: CachedUser = Depends(get_current_user_required)
+) -> CachedUser:
     if user.role != "super_admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -60,8 +58,8 @@ async def get_super_admin(
     return user
 
 async def get_content_editor(
-    user: User = Depends(get_current_user_required)
-) -> User:
+    user: CachedUser = Depends(get_current_user_required)
+) -> CachedUser:
     if user.role not in ["super_admin", "editor", "viewer"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,106 @@
+from typing import Callable, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import time
+from app.core.security import verify_password, get_password_hash
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hash requests are already waiting"""
+
+
+class PasswordHasher:
+    """
+    bcrypt off the event loop
+    - Hashes run on a small dedicated thread pool (bcrypt releases the GIL while it works),
+      so a login costs its own request ~100-300 ms but no longer stalls other readers
+    - At most max_workers hashes run at once (default: one per CPU but one); up to max_queue
+      more wait their turn and anything beyond that is rejected with PasswordHasherBusy (503)
+    - Queue and timing counters are exposed for the admin statistics
+    """
+
+    def __init__(self, max_workers: int = 0, max_queue: int = 64):
+        # bcrypt is CPU-bound: leave one core to the event loop
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._running = 0
+        self.stats = {
+            "completed": 0,
+            "rejected": 0,
+            "max_waiting": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "run_ms_total": 0.0,
+            "run_ms_max": 0.0,
+        }
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def _run(self, func: Callable, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="password-hasher")
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        # Only a caller that would have to wait counts against the queue (max_queue=0: no queueing)
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise PasswordHasherBusy()
+
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        self.stats["max_waiting"] = max(self.stats["max_waiting"], self._waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        started_at = time.perf_counter()
+        self._running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._running -= 1
+            self._semaphore.release()
+            self._record(started_at - queued_at, time.perf_counter() - started_at)
+
+    def _record(self, waited: float, ran: float):
+        waited_ms, ran_ms = waited * 1000, ran * 1000
+        self.stats["completed"] += 1
+        self.stats["wait_ms_total"] += waited_ms
+        self.stats["wait_ms_max"] = max(self.stats["wait_ms_max"], waited_ms)
+        self.stats["run_ms_total"] += ran_ms
+        self.stats["run_ms_max"] = max(self.stats["run_ms_max"], ran_ms)
+
+    def get_stats(self) -> Dict[str, float]:
+        completed = self.stats["completed"]
+        return {
+            **{key: round(value, 1) for key, value in self.stats.items()},
+            "workers": self.max_workers,
+            "running": self._running,
+            "waiting": self._waiting,
+            "wait_ms_avg": round(self.stats["wait_ms_total"] / completed, 1) if completed else 0,
+            "run_ms_avg": round(self.stats["run_ms_total"] / completed, 1) if completed else 0,
+        }
+
+    def shutdown(self):
+        """Release the worker threads (app shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._semaphore = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
@@ -1,7 +1,11 @@
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 import os
 from pathlib import Path
+from app.config import get_settings
+
+settings = get_settings()
 
 # 절대경로 사용 - .env 무시
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -10,11 +14,59 @@ DATABASE_DIR.mkdir(parents=True, exist_ok=True)
 
 DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_DIR.absolute()}/app.db"
 
+
+def _sqlite_pragmas(read_only: bool) -> list:
+    """PRAGMA statements applied to every new connection (see SQLITE_* settings)"""
+    pragmas = [
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        # Per connection, not persistent: without it the ondelete= clauses of the models are ignored
+        f"PRAGMA foreign_keys={'ON' if settings.SQLITE_FOREIGN_KEYS else 'OFF'}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    else:
+        # journal_mode is persistent in the file; the writer sets it once per connection
+        pragmas.insert(0, f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    return pragmas
+
+
+def _apply_pragmas(sync_engine, read_only: bool):
+    pragmas = _sqlite_pragmas(read_only)
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+# Single writer connection: SQLite allows one writer at a time anyway,
+# so mutations queue on the pool instead of failing with "database is locked".
+# Requests share it with the background jobs, so those keep every write transaction
+# short and bounded (batch-sized flushes, chunked archive deletes) and do their
+# long reads on the read pool
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False},
+    pool_size=1,
+    max_overflow=0
+)
+_apply_pragmas(engine.sync_engine, read_only=False)
+
+# Read-only pool for GET routes; with WAL, readers never wait behind the writer
+read_engine = create_async_engine(
+    DATABASE_URL,
+    echo=False,
+    connect_args={"check_same_thread": False},
+    pool_size=settings.SQLITE_READ_POOL_SIZE,
+    max_overflow=0
 )
+_apply_pragmas(read_engine.sync_engine, read_only=True)
 
 async_session_maker = async_sessionmaker(
     engine,
@@ -22,6 +74,12 @@ async_session_maker = async_sessionmaker(
     expire_on_commit=False
 )
 
+async_read_session_maker = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 async def get_db():
@@ -31,6 +89,25 @@ async def get_db():
         finally:
             await session.close()
 
+async def get_read_db():
+    async with async_read_session_maker() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+async def existing_ids(db: AsyncSession, model, ids) -> set:
+    """Which of ids still exist as model primary keys (one IN query)"""
+    ids = set(ids)
+    if not ids:
+        return set()
+    result = await db.execute(select(model.id).where(model.id.in_(ids)))
+    return set(result.scalars().all())
+
 async def init_db():
+    from app.models.analytics import counter_trigger_statements
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        for statement in counter_trigger_statements():
+            await conn.exec_driver_sql(statement)
@@ -0,0 +1,73 @@
+"""Startup/shutdown and API routes shared by app.main and app.main2 (the integrated build)"""
+from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import asyncio
+import signal
+import threading
+
+from app.database import init_db
+from app.routers import auth, stories, passages, visits, feedback, bookmarks, admin, admin_csv, admin_export
+from app.config import get_settings
+from app.services.visit_writer import visit_log_writer
+from app.services.visit_archive import run_archiver
+from app.services.stat_counters import run_reconciler
+from app.services.feedback_hub import feedback_hub
+from app.services.reading_sessions import reading_session_store
+from app.core.password_hasher import password_hasher
+
+settings = get_settings()
+
+def close_feedback_streams_on_exit():
+    """
+    uvicorn waits for open responses before running the lifespan shutdown, and live
+    feedback streams never end on their own: close the hub as soon as the exit signal
+    arrives, then hand the signal on to the server's own handler
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(feedback_hub.close)
+            previous(signum, frame)
+
+        signal.signal(sig, handler)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup
+    await init_db()
+    close_feedback_streams_on_exit()
+    visit_log_writer.start()
+    reading_session_store.start()
+    archiver = None
+    if settings.VISIT_ARCHIVE_AFTER_MONTHS > 0:
+        archiver = asyncio.create_task(run_archiver(settings.VISIT_ARCHIVE_CHECK_HOURS))
+    reconciler = None
+    if settings.STAT_COUNTER_RECONCILE_HOURS > 0:
+        reconciler = asyncio.create_task(run_reconciler(settings.STAT_COUNTER_RECONCILE_HOURS))
+    yield
+    # Shutdown
+    feedback_hub.close()
+    for task in (archiver, reconciler):
+        if task:
+            task.cancel()
+    await visit_log_writer.stop()
+    await reading_session_store.stop()
+    password_hasher.shutdown()
+
+def include_api_routers(app: FastAPI):
+    """Every /api router; both entry points must serve the same API"""
+    app.include_router(auth.router)
+    app.include_router(stories.router)
+    app.include_router(passages.router)
+    app.include_router(visits.router)
+    app.include_router(feedback.router)
+    app.include_router(bookmarks.router)
+    app.include_router(admin.router)
+    app.include_router(admin_csv.router, prefix="/api/admin")
+    app.include_router(admin_export.router, prefix="/api/admin")
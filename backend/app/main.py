@@ -1,22 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from contextlib import asynccontextmanager
 import os
 
-from app.database import init_db
-from app.routers import auth, stories, passages, feedback, bookmarks, admin, admin_csv
 from app.config import get_settings
+from app.lifecycle import lifespan, include_api_routers
 
 settings = get_settings()
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup
-    await init_db()
-    yield
-    # Shutdown
-
 app = FastAPI(
     title=settings.APP_NAME,
     lifespan=lifespan
@@ -36,13 +27,7 @@ os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
 # Routers
-app.include_router(auth.router)
-app.include_router(stories.router)
-app.include_router(passages.router)
-app.include_router(feedback.router)
-app.include_router(bookmarks.router)
-app.include_router(admin.router)
-app.include_router(admin_csv.router, prefix="/api/admin")
+include_api_routers(app)
 
 @app.get("/")
 async def root():
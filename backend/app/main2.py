@@ -9,21 +9,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from contextlib import asynccontextmanager
 import os
 from pathlib import Path
 
-from app.database import init_db
-from app.routers import auth, stories, passages, feedback, bookmarks, admin, admin_csv
 from app.config import get_settings
+from app.lifecycle import lifespan, include_api_routers
 
 settings = get_settings()
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    await init_db()
-    yield
-
 app = FastAPI(
     title=settings.APP_NAME,
     lifespan=lifespan
@@ -43,13 +36,7 @@ os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
 # API Routers - 각 라우터가 이미 /api prefix를 포함하고 있음
-app.include_router(auth.router)
-app.include_router(stories.router)
-app.include_router(passages.router)
-app.include_router(feedback.router)
-app.include_router(bookmarks.router)
-app.include_router(admin.router)
-app.include_router(admin_csv.router)
+include_api_routers(app)
 
 # Health check
 @app.get("/api/health")
@@ -4,6 +4,15 @@ from app.models.passage import Passage
 from app.models.link import Link
 from app.models.feedback import Feedback
 from app.models.bookmark import Bookmark
-from app.models.analytics import VisitLog, Image
+from app.models.reading_session import ReadingSession
+from app.models.analytics import (
+    VisitLog, PassageVisitRollup, StoryVisitRollup, TransitionRollup, PassageDwellRollup,
+    PassageReaderSketch, StoryReaderSketch, StatCounter, Image
+)
 
-__all__ = ["User", "Story", "Passage", "Link", "Feedback", "Bookmark", "VisitLog", "Image"]
+__all__ = [
+    "User", "Story", "Passage", "Link", "Feedback", "Bookmark", "ReadingSession",
+    "VisitLog", "PassageVisitRollup", "StoryVisitRollup", "TransitionRollup",
+    "PassageDwellRollup", "PassageReaderSketch", "StoryReaderSketch",
+    "StatCounter", "Image"
+]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey
+from sqlalchemy import Column, String, Integer, LargeBinary, ForeignKey, Index, UniqueConstraint
 from app.database import Base
 import uuid
 from datetime import datetime
@@ -11,6 +11,12 @@ def now_iso():
 
 class VisitLog(Base):
     __tablename__ = "visit_logs"
+    __table_args__ = (
+        Index('ix_visit_logs_passage_created', 'passage_id', 'created_at'),
+        Index('ix_visit_logs_story_passage', 'story_id', 'passage_id'),
+        Index('ix_visit_logs_story_created', 'story_id', 'created_at'),
+        Index('ix_visit_logs_user', 'user_id'),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     user_id = Column(String(36), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
@@ -20,6 +26,129 @@ class VisitLog(Base):
     duration_seconds = Column(Integer, nullable=True)
     created_at = Column(String(26), default=now_iso)
 
+class PassageVisitRollup(Base):
+    """Visit counts per passage per hour/day bucket, maintained by the visit-log writer"""
+    __tablename__ = "passage_visit_rollups"
+    __table_args__ = (
+        UniqueConstraint('granularity', 'bucket', 'passage_id', name='uq_passage_rollup_bucket'),
+        Index('ix_passage_rollups_story_bucket', 'story_id', 'granularity', 'bucket'),
+    )
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    granularity = Column(String(5), nullable=False)  # hour, day
+    bucket = Column(String(13), nullable=False)  # 2026-10-17T09 / 2026-10-17
+    story_id = Column(String(36), ForeignKey("stories.id", ondelete="CASCADE"), nullable=True)
+    passage_id = Column(String(36), ForeignKey("passages.id", ondelete="CASCADE"), nullable=False)
+    visit_count = Column(Integer, nullable=False, default=0)
+
+class StoryVisitRollup(Base):
+    """Visit counts per story per hour/day bucket"""
+    __tablename__ = "story_visit_rollups"
+    __table_args__ = (
+        UniqueConstraint('granularity', 'bucket', 'story_id', name='uq_story_rollup_bucket'),
+    )
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    granularity = Column(String(5), nullable=False)
+    bucket = Column(String(13), nullable=False)
+    story_id = Column(String(36), ForeignKey("stories.id", ondelete="CASCADE"), nullable=False)
+    visit_count = Column(Integer, nullable=False, default=0)
+
+class TransitionRollup(Base):
+    """Passage-to-passage transition counts (from previous_passage_id) per hour/day bucket"""
+    __tablename__ = "transition_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            'granularity', 'bucket', 'from_passage_id', 'to_passage_id',
+            name='uq_transition_rollup_bucket'
+        ),
+        Index('ix_transition_rollups_story_bucket', 'story_id', 'granularity', 'bucket'),
+    )
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    granularity = Column(String(5), nullable=False)
+    bucket = Column(String(13), nullable=False)
+    story_id = Column(String(36), ForeignKey("stories.id", ondelete="CASCADE"), nullable=True)
+    from_passage_id = Column(String(36), nullable=False)
+    to_passage_id = Column(String(36), ForeignKey("passages.id", ondelete="CASCADE"), nullable=False)
+    transition_count = Column(Integer, nullable=False, default=0)
+
+class PassageDwellRollup(Base):
+    """Dwell-time histogram per passage per day (bin index -> visits, seconds)"""
+    __tablename__ = "passage_dwell_rollups"
+    __table_args__ = (
+        UniqueConstraint('granularity', 'bucket', 'passage_id', 'bin', name='uq_passage_dwell_rollup_bin'),
+        Index('ix_passage_dwell_rollups_story_bucket', 'story_id', 'granularity', 'bucket'),
+    )
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    granularity = Column(String(5), nullable=False)
+    bucket = Column(String(13), nullable=False)
+    story_id = Column(String(36), ForeignKey("stories.id", ondelete="CASCADE"), nullable=True)
+    passage_id = Column(String(36), ForeignKey("passages.id", ondelete="CASCADE"), nullable=False)
+    bin = Column(Integer, nullable=False)  # see visit_rollups.DWELL_BIN_BOUNDS
+    visit_count = Column(Integer, nullable=False, default=0)
+    total_seconds = Column(Integer, nullable=False, default=0)
+
+class PassageReaderSketch(Base):
+    """HyperLogLog sketch of distinct readers (user ids) per passage per day"""
+    __tablename__ = "passage_reader_sketches"
+    __table_args__ = (
+        UniqueConstraint('bucket', 'passage_id', name='uq_passage_reader_sketch_bucket'),
+        Index('ix_passage_reader_sketches_story_bucket', 'story_id', 'bucket'),
+    )
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    bucket = Column(String(10), nullable=False)  # 2026-10-17
+    story_id = Column(String(36), ForeignKey("stories.id", ondelete="CASCADE"), nullable=True)
+    passage_id = Column(String(36), ForeignKey("passages.id", ondelete="CASCADE"), nullable=False)
+    sketch = Column(LargeBinary, nullable=False)  # see services/hyperloglog.py
+
+class StoryReaderSketch(Base):
+    """HyperLogLog sketch of distinct readers per story per day"""
+    __tablename__ = "story_reader_sketches"
+    __table_args__ = (
+        UniqueConstraint('bucket', 'story_id', name='uq_story_reader_sketch_bucket'),
+    )
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    bucket = Column(String(10), nullable=False)
+    story_id = Column(String(36), ForeignKey("stories.id", ondelete="CASCADE"), nullable=False)
+    sketch = Column(LargeBinary, nullable=False)
+
+class StatCounter(Base):
+    """Row counts for the admin overview, kept current by the triggers below"""
+    __tablename__ = "stat_counters"
+
+    name = Column(String(50), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+# counter name -> counted table
+COUNTED_TABLES = {
+    "users": "users",
+    "stories": "stories",
+    "passages": "passages",
+    "visits": "visit_logs",
+    "feedbacks": "feedback",
+}
+
+def counter_trigger_statements() -> list:
+    """
+    AFTER INSERT / AFTER DELETE triggers that keep stat_counters in the same transaction
+    Triggers also see Core inserts and ON DELETE CASCADE deletes, which ORM events would miss
+    """
+    statements = []
+    for name, table in COUNTED_TABLES.items():
+        for action, delta in (("INSERT", "+ 1"), ("DELETE", "- 1")):
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_count_{action.lower()} "
+                f"AFTER {action} ON {table} BEGIN "
+                f"INSERT INTO stat_counters (name, value) VALUES ('{name}', 0 {delta}) "
+                f"ON CONFLICT(name) DO UPDATE SET value = value {delta}; "
+                f"END"
+            )
+    return statements
+
 class Image(Base):
     __tablename__ = "images"
 
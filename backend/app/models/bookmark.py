@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, ForeignKey, UniqueConstraint, Index
 from app.database import Base
 import uuid
 from datetime import datetime
@@ -17,4 +17,8 @@ class Bookmark(Base):
     passage_id = Column(String(36), ForeignKey("passages.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(String(26), default=now_iso)
 
-    __table_args__ = (UniqueConstraint('user_id', 'passage_id', name='uq_user_passage'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'passage_id', name='uq_user_passage'),
+        Index('ix_bookmarks_user_created', 'user_id', 'created_at'),
+        Index('ix_bookmarks_passage', 'passage_id'),
+    )
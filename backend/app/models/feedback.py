@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Integer, ForeignKey
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, Index
 from app.database import Base
 import uuid
 from datetime import datetime
@@ -11,6 +11,11 @@ def now_iso():
 
 class Feedback(Base):
     __tablename__ = "feedback"
+    __table_args__ = (
+        Index('ix_feedback_parent_created', 'parent_id', 'created_at'),
+        Index('ix_feedback_passage_parent_created', 'passage_id', 'parent_id', 'created_at'),
+        Index('ix_feedback_user', 'user_id'),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     user_id = Column(String(36), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey
+from sqlalchemy import Column, String, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 import uuid
@@ -8,6 +8,11 @@ def generate_uuid():
 
 class Link(Base):
     __tablename__ = "links"
+    __table_args__ = (
+        Index('ix_links_source_order', 'source_passage_id', 'link_order'),
+        Index('ix_links_story_source_order', 'story_id', 'source_passage_id', 'link_order'),
+        Index('ix_links_target', 'target_passage_id'),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     story_id = Column(String(36), ForeignKey("stories.id", ondelete="CASCADE"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Float, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy import Column, String, Text, Float, ForeignKey, Integer, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 import uuid
@@ -10,9 +10,15 @@ def generate_uuid():
 def now_iso():
     return datetime.utcnow().isoformat()
 
+# Highest passage_number: references use the 6-digit #NNNNNN format
+MAX_PASSAGE_NUMBER = 999999
+
 class Passage(Base):
     __tablename__ = "passages"
-    __table_args__ = (UniqueConstraint('story_id', 'passage_number', name='uq_passage_story_number'),)
+    __table_args__ = (
+        UniqueConstraint('story_id', 'passage_number', name='uq_passage_story_number'),
+        Index('ix_passages_story_name', 'story_id', 'name'),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     story_id = Column(String(36), ForeignKey("stories.id", ondelete="CASCADE"), nullable=False)
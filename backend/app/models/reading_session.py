@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, Integer, LargeBinary, ForeignKey, UniqueConstraint, Index
+from app.database import Base
+import uuid
+from datetime import datetime
+
+def generate_uuid():
+    return str(uuid.uuid4())
+
+def now_iso():
+    return datetime.utcnow().isoformat()
+
+class ReadingSession(Base):
+    """A reader's progress in one story, written in batches by the reading-session store"""
+    __tablename__ = "reading_sessions"
+    __table_args__ = (
+        UniqueConstraint('user_id', 'story_id', name='uq_reading_session_user_story'),
+        Index('ix_reading_sessions_user_updated', 'user_id', 'updated_at'),
+    )
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    story_id = Column(String(36), ForeignKey("stories.id", ondelete="CASCADE"), nullable=False)
+    last_passage_id = Column(String(36), ForeignKey("passages.id", ondelete="SET NULL"), nullable=True)
+    visited = Column(LargeBinary, nullable=False)  # bitset over passage_number, see services/reading_sessions.py
+    visited_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(String(26), default=now_iso)
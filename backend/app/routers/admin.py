@@ -11,12 +11,16 @@ import os
 import aiofiles
 import csv
 import io
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.story import Story
 from app.models.passage import Passage
 from app.models.link import Link
 from app.models.user import User
-from app.models.analytics import VisitLog, Image
+from app.services.user_cache import CachedUser
+from app.models.analytics import (
+    PassageVisitRollup, StoryVisitRollup, TransitionRollup, PassageDwellRollup,
+    PassageReaderSketch, StoryReaderSketch, Image
+)
 from app.models.feedback import Feedback
 from app.schemas.story import (
     StoryCreate, StoryUpdate, StoryResponse, StoryWithPassages,
@@ -24,17 +28,34 @@ from app.schemas.story import (
     LinkCreate, LinkUpdate, LinkResponse, StoryReorderRequest
 )
 from app.schemas.user import UserResponse, UserUpdate
-from app.schemas.feedback import FeedbackWithPassageInfo, FeedbackResponse
+from app.schemas.feedback import FeedbackWithPassageInfo, FeedbackAdminPage
 from app.core.dependencies import get_admin_user, get_super_admin, get_content_editor
+from app.services.story_cache import story_graph_cache
+from app.services.feedback_threads import page_statement, split_page, page_items
+from app.services.visit_writer import visit_log_writer
+from app.services.feedback_hub import feedback_hub
+from app.services.reading_sessions import reading_session_store
+from app.services.user_cache import user_cache
+from app.core.password_hasher import password_hasher
+from app.services.visit_rollups import DAY, parse_bucket_range, dwell_percentiles, union_sketches
+from app.services.stat_counters import read_counters, reconcile_counters
+from app.services.visit_archive import (
+    visit_archive, live_month_counts, archive_cutoff_month, archive_old_partitions
+)
+from app.services.transition_matrix import (
+    transition_matrix_cache, passage_flow, link_probabilities, story_funnel
+)
 from app.config import get_settings
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 settings = get_settings()
 
+DWELL_PERCENTILES = (50, 75, 90, 95)
+
 # ===== Story CRUD =====
 @router.get("/stories", response_model=List[StoryResponse])
 async def get_all_stories(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     result = await db.execute(select(Story).order_by(Story.sort_order.asc(), Story.created_at.desc()))
     stories = result.scalars().all()
@@ -135,7 +156,7 @@ async def reorder_stories(
 @router.get("/stories/{story_id}", response_model=StoryWithPassages)
 async def get_story_full(
     story_id: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     result = await db.execute(select(Story).where(Story.id == story_id))
     story = result.scalar_one_or_none()
@@ -227,6 +248,7 @@ async def update_story(
     story.updated_at = datetime.utcnow().isoformat()
     await db.commit()
     await db.refresh(story)
+    story_graph_cache.invalidate(story.id)
 
     return StoryResponse(
         id=story.id,
@@ -255,9 +277,14 @@ async def delete_story(
 
     await db.delete(story)
     await db.commit()
+    story_graph_cache.invalidate(story_id)
+    transition_matrix_cache.invalidate(story_id)
     return {"message": "Story deleted"}
 
 # ===== Passage CRUD =====
+def max_passage_number_statement(story_id: str):
+    return select(func.max(Passage.passage_number)).where(Passage.story_id == story_id)
+
 @router.post("/passages", response_model=PassageResponse)
 async def create_passage(
     passage_data: PassageCreate,
@@ -268,10 +295,7 @@ async def create_passage(
     for attempt in range(max_retries):
         try:
             # Get next passage_number for this story
-            result = await db.execute(
-                select(func.max(Passage.passage_number))
-                .where(Passage.story_id == passage_data.story_id)
-            )
+            result = await db.execute(max_passage_number_statement(passage_data.story_id))
             max_number = result.scalar() or 0
             next_number = max_number + 1
 
@@ -299,6 +323,8 @@ async def create_passage(
                 raise HTTPException(status_code=409, detail="Failed to assign passage number after retries")
             # Continue to next retry attempt
 
+    story_graph_cache.invalidate(passage.story_id)
+
     return PassageResponse(
         id=passage.id,
         story_id=passage.story_id,
@@ -346,6 +372,7 @@ async def update_passage(
     passage.updated_at = datetime.utcnow().isoformat()
     await db.commit()
     await db.refresh(passage)
+    story_graph_cache.invalidate(passage.story_id)
 
     return PassageResponse(
         id=passage.id,
@@ -373,8 +400,11 @@ async def delete_passage(
     if not passage:
         raise HTTPException(status_code=404, detail="Passage not found")
 
+    story_id = passage.story_id
     await db.delete(passage)
     await db.commit()
+    story_graph_cache.invalidate(story_id)
+    transition_matrix_cache.invalidate(story_id)
     return {"message": "Passage deleted"}
 
 # ===== Link CRUD =====
@@ -395,6 +425,7 @@ async def create_link(
     db.add(link)
     await db.commit()
     await db.refresh(link)
+    story_graph_cache.invalidate(link.story_id)
 
     return LinkResponse(
         id=link.id,
@@ -429,6 +460,7 @@ async def update_link(
 
     await db.commit()
     await db.refresh(link)
+    story_graph_cache.invalidate(link.story_id)
 
     return LinkResponse(
         id=link.id,
@@ -451,8 +483,10 @@ async def delete_link(
     if not link:
         raise HTTPException(status_code=404, detail="Link not found")
 
+    story_id = link.story_id
     await db.delete(link)
     await db.commit()
+    story_graph_cache.invalidate(story_id)
     return {"message": "Link deleted"}
 
 # ===== Image Upload =====
@@ -491,8 +525,8 @@ async def upload_image(
 # ===== User Management =====
 @router.get("/users", response_model=List[UserResponse])
 async def get_users(
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_super_admin)
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_super_admin)
 ):
     result = await db.execute(select(User).order_by(User.created_at.desc()))
     users = result.scalars().all()
@@ -503,7 +537,7 @@ async def update_user_role(
     user_id: str,
     user_data: UserUpdate,
     db: AsyncSession = Depends(get_db),
-    admin: User = Depends(get_super_admin)
+    admin: CachedUser = Depends(get_super_admin)
 ):
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
@@ -518,175 +552,582 @@ async def update_user_role(
     user.updated_at = datetime.utcnow().isoformat()
     await db.commit()
     await db.refresh(user)
+    user_cache.invalidate(user.id)
 
     return user
 
 # ===== Statistics =====
 @router.get("/stats/overview")
 async def get_stats_overview(
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_admin_user)
+    exact: bool = Query(False, description="Recount every table and correct the counters"),
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_admin_user)
 ):
-    # Total users
-    result = await db.execute(select(func.count(User.id)))
-    total_users = result.scalar()
+    """Table totals from the trigger-maintained counters (constant time)"""
+    if exact:
+        counters = {name: entry["value"] for name, entry in (await reconcile_counters()).items()}
+    else:
+        counters = await read_counters(db)
+
+    return {
+        "total_users": counters["users"],
+        "total_stories": counters["stories"],
+        "total_passages": counters["passages"],
+        # Live partition + archived months
+        "total_visits": counters["visits"] + visit_archive.visit_count(),
+        "total_feedbacks": counters["feedbacks"]
+    }
 
-    # Total stories
-    result = await db.execute(select(func.count(Story.id)))
-    total_stories = result.scalar()
+@router.post("/maintenance/reconcile-counters")
+async def reconcile_stat_counters(
+    user: CachedUser = Depends(get_super_admin)
+):
+    """Recount every table behind the overview counters and report the drift"""
+    return await reconcile_counters()
 
-    # Total passages
-    result = await db.execute(select(func.count(Passage.id)))
-    total_passages = result.scalar()
+@router.get("/stats/ingest")
+async def get_ingest_stats(
+    user: CachedUser = Depends(get_admin_user)
+):
+    """Visit-log writer counters (queued, written, dropped, failed)"""
+    return visit_log_writer.get_stats()
 
-    # Total visits
-    result = await db.execute(select(func.count(VisitLog.id)))
-    total_visits = result.scalar()
+@router.get("/stats/feedback-streams")
+async def get_feedback_stream_stats(
+    user: CachedUser = Depends(get_admin_user)
+):
+    """Live feedback hub counters of this worker (subscribers, published, overflows)"""
+    return feedback_hub.get_stats()
+
+@router.get("/stats/reading-sessions")
+async def get_reading_session_stats(
+    user: CachedUser = Depends(get_admin_user)
+):
+    """Reading-session store counters of this worker (recorded, coalesced, written, pending)"""
+    return reading_session_store.get_stats()
+
+@router.get("/stats/user-cache")
+async def get_user_cache_stats(
+    user: CachedUser = Depends(get_admin_user)
+):
+    """Authenticated-user cache counters of this worker (hits, misses, expired, invalidated)"""
+    return user_cache.get_stats()
+
+@router.get("/stats/password-hashing")
+async def get_password_hashing_stats(
+    user: CachedUser = Depends(get_admin_user)
+):
+    """bcrypt pool counters of this worker (running, waiting, rejected, wait/run times in ms)"""
+    return password_hasher.get_stats()
+
+def _rollup_range(start: Optional[str], end: Optional[str], granularity: Optional[str] = None):
+    try:
+        return parse_bucket_range(start, end, granularity)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start/end must be ISO dates or datetimes")
+
+def _bucket_range(query, model, start_key: Optional[str], end_key: Optional[str]):
+    if start_key:
+        query = query.where(model.bucket >= start_key)
+    if end_key:
+        query = query.where(model.bucket <= end_key)
+    return query
+
+def _filter_buckets(query, model, granularity: str, start_key: Optional[str], end_key: Optional[str]):
+    return _bucket_range(query.where(model.granularity == granularity), model, start_key, end_key)
+
+def passage_visits_statement(granularity: str, start_key: Optional[str], end_key: Optional[str], story_id: Optional[str] = None):
+    """Visits per Passage (with its name) from the rollups, most visited first"""
+    visit_count = func.sum(PassageVisitRollup.visit_count).label('visit_count')
+
+    query = select(
+        PassageVisitRollup.passage_id,
+        Passage.name,
+        visit_count
+    ).join(
+        Passage, Passage.id == PassageVisitRollup.passage_id
+    ).group_by(
+        PassageVisitRollup.passage_id, Passage.name
+    ).order_by(visit_count.desc())
+    query = _filter_buckets(query, PassageVisitRollup, granularity, start_key, end_key)
+
+    if story_id:
+        query = query.where(PassageVisitRollup.story_id == story_id)
+    return query
 
-    # Total feedbacks
-    result = await db.execute(select(func.count(Feedback.id)))
-    total_feedbacks = result.scalar()
+def story_visits_statement(granularity: str, start_key: Optional[str], end_key: Optional[str]):
+    """Visits per Story (with its name) from the rollups, most visited first"""
+    visit_count = func.sum(StoryVisitRollup.visit_count).label('visit_count')
+
+    query = select(
+        StoryVisitRollup.story_id,
+        Story.name,
+        visit_count
+    ).join(
+        Story, Story.id == StoryVisitRollup.story_id
+    ).group_by(
+        StoryVisitRollup.story_id, Story.name
+    ).order_by(visit_count.desc())
+    return _filter_buckets(query, StoryVisitRollup, granularity, start_key, end_key)
+
+def transition_counts_statement(story_id: str, granularity: str, start_key: Optional[str], end_key: Optional[str]):
+    """Passage-to-passage transition counts of a Story, most taken first"""
+    transition_count = func.sum(TransitionRollup.transition_count).label('transition_count')
+
+    query = select(
+        TransitionRollup.from_passage_id,
+        TransitionRollup.to_passage_id,
+        transition_count
+    ).where(
+        TransitionRollup.story_id == story_id
+    ).group_by(
+        TransitionRollup.from_passage_id, TransitionRollup.to_passage_id
+    ).order_by(transition_count.desc())
+    return _filter_buckets(query, TransitionRollup, granularity, start_key, end_key)
+
+def timeseries_statement(granularity: str, start_key: Optional[str], end_key: Optional[str], story_id: Optional[str] = None):
+    """Visits per bucket, for one Story or all of them"""
+    query = select(
+        StoryVisitRollup.bucket,
+        func.sum(StoryVisitRollup.visit_count)
+    ).group_by(StoryVisitRollup.bucket).order_by(StoryVisitRollup.bucket)
+    query = _filter_buckets(query, StoryVisitRollup, granularity, start_key, end_key)
+
+    if story_id:
+        query = query.where(StoryVisitRollup.story_id == story_id)
+    return query
+
+def dwell_histogram_statement(granularity: str, start_key: Optional[str], end_key: Optional[str], story_id: Optional[str] = None):
+    """Dwell-time histogram bins (count, seconds) per Passage"""
+    query = select(
+        PassageDwellRollup.passage_id,
+        Passage.name,
+        PassageDwellRollup.bin,
+        func.sum(PassageDwellRollup.visit_count),
+        func.sum(PassageDwellRollup.total_seconds)
+    ).join(
+        Passage, Passage.id == PassageDwellRollup.passage_id
+    ).group_by(
+        PassageDwellRollup.passage_id, Passage.name, PassageDwellRollup.bin
+    )
+    query = _filter_buckets(query, PassageDwellRollup, granularity, start_key, end_key)
+
+    if story_id:
+        query = query.where(PassageDwellRollup.story_id == story_id)
+    return query
+
+def story_sketches_statement(start_key: Optional[str], end_key: Optional[str], story_id: Optional[str] = None):
+    """Daily reader sketches per Story"""
+    query = _bucket_range(
+        select(StoryReaderSketch.story_id, StoryReaderSketch.sketch), StoryReaderSketch, start_key, end_key
+    )
+    if story_id:
+        query = query.where(StoryReaderSketch.story_id == story_id)
+    return query
+
+def passage_sketches_statement(story_id: str, start_key: Optional[str], end_key: Optional[str]):
+    """Daily reader sketches per Passage (with its name) of a Story"""
+    return _bucket_range(
+        select(PassageReaderSketch.passage_id, Passage.name, PassageReaderSketch.sketch)
+        .join(Passage, Passage.id == PassageReaderSketch.passage_id)
+        .where(PassageReaderSketch.story_id == story_id),
+        PassageReaderSketch, start_key, end_key
+    )
+
+def heatmap_statements(story_id: str, granularity: str, start_key: Optional[str], end_key: Optional[str]):
+    """The heatmap's per-source queries, each grouped by Passage"""
+    feedback_day = func.substr(Feedback.created_at, 1, 10)
+    feedback = select(Feedback.passage_id, func.count(Feedback.id)).join(
+        Passage, Passage.id == Feedback.passage_id
+    ).where(Passage.story_id == story_id).group_by(Feedback.passage_id)
+    if start_key:
+        feedback = feedback.where(feedback_day >= start_key)
+    if end_key:
+        feedback = feedback.where(feedback_day <= end_key)
 
     return {
-        "total_users": total_users,
-        "total_stories": total_stories,
-        "total_passages": total_passages,
-        "total_visits": total_visits,
-        "total_feedbacks": total_feedbacks
+        "visits": _filter_buckets(
+            select(PassageVisitRollup.passage_id, func.sum(PassageVisitRollup.visit_count))
+            .where(PassageVisitRollup.story_id == story_id)
+            .group_by(PassageVisitRollup.passage_id),
+            PassageVisitRollup, granularity, start_key, end_key
+        ),
+        "onward": _filter_buckets(
+            select(TransitionRollup.from_passage_id, func.sum(TransitionRollup.transition_count))
+            .where(TransitionRollup.story_id == story_id)
+            .group_by(TransitionRollup.from_passage_id),
+            TransitionRollup, granularity, start_key, end_key
+        ),
+        "dwell": _filter_buckets(
+            select(
+                PassageDwellRollup.passage_id,
+                func.sum(PassageDwellRollup.visit_count),
+                func.sum(PassageDwellRollup.total_seconds)
+            )
+            .where(PassageDwellRollup.story_id == story_id)
+            .group_by(PassageDwellRollup.passage_id),
+            PassageDwellRollup, granularity, start_key, end_key
+        ),
+        "sketches": _bucket_range(
+            select(PassageReaderSketch.passage_id, PassageReaderSketch.sketch)
+            .where(PassageReaderSketch.story_id == story_id),
+            PassageReaderSketch, start_key, end_key
+        ),
+        "feedback": feedback,
     }
 
+@router.get("/stats/partitions")
+async def get_visit_partitions(
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_admin_user)
+):
+    """Visit-log months in SQLite (live) and in archive files"""
+    live = await live_month_counts(db)
+    archived = [visit_archive.manifest(month) for month in visit_archive.months()]
+
+    return {
+        "archive_cutoff_month": archive_cutoff_month(),
+        "live": [{"month": month, "row_count": count} for month, count in live.items()],
+        "archived": [
+            {
+                "month": manifest["month"],
+                "row_count": manifest["row_count"],
+                "size_bytes": os.path.getsize(visit_archive.path(manifest["month"]))
+            }
+            for manifest in archived
+        ]
+    }
+
+@router.post("/maintenance/archive-visits")
+async def archive_visit_partitions(
+    keep_months: Optional[int] = Query(None, ge=1, description="Defaults to VISIT_ARCHIVE_AFTER_MONTHS"),
+    vacuum: bool = Query(False, description="VACUUM the database after archiving"),
+    user: CachedUser = Depends(get_super_admin)
+):
+    """Move visit-log months older than the retention window into archive files"""
+    archived = await archive_old_partitions(keep_months, vacuum)
+    return {"archived": archived}
+
 @router.get("/stats/passages")
 async def get_passage_stats(
     story_id: str = None,
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_admin_user)
+    start: Optional[str] = Query(None, description="ISO date or datetime, inclusive"),
+    end: Optional[str] = Query(None, description="ISO date or datetime, inclusive"),
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_admin_user)
 ):
-    query = select(
-        VisitLog.passage_id,
-        func.count(VisitLog.id).label('visit_count')
-    ).group_by(VisitLog.passage_id)
+    """Visit counts per Passage from the hourly/daily rollups"""
+    granularity, start_key, end_key = _rollup_range(start, end)
+    result = await db.execute(passage_visits_statement(granularity, start_key, end_key, story_id))
 
-    if story_id:
-        query = query.where(VisitLog.story_id == story_id)
+    return [
+        {
+            "passage_id": passage_id,
+            "passage_name": passage_name,
+            "visit_count": count
+        }
+        for passage_id, passage_name, count in result.all()
+    ]
 
-    result = await db.execute(query)
-    stats = result.all()
+@router.get("/stats/stories")
+async def get_story_stats(
+    start: Optional[str] = Query(None, description="ISO date or datetime, inclusive"),
+    end: Optional[str] = Query(None, description="ISO date or datetime, inclusive"),
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_admin_user)
+):
+    """Visit counts per Story from the rollups"""
+    granularity, start_key, end_key = _rollup_range(start, end)
+    result = await db.execute(story_visits_statement(granularity, start_key, end_key))
 
-    passage_stats = []
-    for passage_id, visit_count in stats:
-        result = await db.execute(select(Passage).where(Passage.id == passage_id))
-        passage = result.scalar_one_or_none()
-        if passage:
-            passage_stats.append({
-                "passage_id": passage_id,
-                "passage_name": passage.name,
-                "visit_count": visit_count
-            })
+    return [
+        {
+            "story_id": story_id,
+            "story_name": story_name,
+            "visit_count": count
+        }
+        for story_id, story_name, count in result.all()
+    ]
 
-    return passage_stats
+@router.get("/stats/transitions")
+async def get_transition_stats(
+    story_id: str,
+    start: Optional[str] = Query(None, description="ISO date or datetime, inclusive"),
+    end: Optional[str] = Query(None, description="ISO date or datetime, inclusive"),
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_admin_user)
+):
+    """Passage-to-passage transition counts of a Story from the rollups"""
+    granularity, start_key, end_key = _rollup_range(start, end)
+    result = await db.execute(transition_counts_statement(story_id, granularity, start_key, end_key))
 
-# ===== Feedback Management =====
-async def build_feedback_response(feedback: Feedback, db: AsyncSession) -> FeedbackResponse:
-    user_name = None
-    if feedback.user_id and not feedback.is_anonymous:
-        result = await db.execute(select(User).where(User.id == feedback.user_id))
-        user = result.scalar_one_or_none()
-        if user:
-            user_name = user.name
-
-    # Get replies
-    result = await db.execute(
-        select(Feedback)
-        .where(Feedback.parent_id == feedback.id)
-        .order_by(Feedback.created_at)
-    )
-    replies_db = result.scalars().all()
-
-    replies = []
-    for reply in replies_db:
-        reply_response = await build_feedback_response(reply, db)
-        replies.append(reply_response)
-
-    return FeedbackResponse(
-        id=feedback.id,
-        user_id=feedback.user_id if not feedback.is_anonymous else None,
-        user_name=user_name,
-        passage_id=feedback.passage_id,
-        content=feedback.content,
-        is_anonymous=bool(feedback.is_anonymous),
-        parent_id=feedback.parent_id,
-        created_at=feedback.created_at,
-        updated_at=feedback.updated_at,
-        replies=replies
-    )
+    return [
+        {
+            "from_passage_id": from_passage_id,
+            "to_passage_id": to_passage_id,
+            "transition_count": count
+        }
+        for from_passage_id, to_passage_id, count in result.all()
+    ]
 
-@router.get("/feedback/all", response_model=List[FeedbackWithPassageInfo])
-async def get_all_feedback_admin(
-    story_id: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_admin_user)
+@router.get("/stats/timeseries")
+async def get_visit_timeseries(
+    story_id: Optional[str] = None,
+    granularity: str = Query(DAY, pattern="^(hour|day)$"),
+    start: Optional[str] = Query(None, description="ISO date or datetime, inclusive"),
+    end: Optional[str] = Query(None, description="ISO date or datetime, inclusive"),
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_admin_user)
 ):
-    """Get all feedback across all passages (admin only)"""
-    # Get top-level feedbacks only
-    query = select(Feedback).where(Feedback.parent_id == None)
+    """Visits per hour/day bucket, for one Story or all of them"""
+    granularity, start_key, end_key = _rollup_range(start, end, granularity)
+    result = await db.execute(timeseries_statement(granularity, start_key, end_key, story_id))
 
+    return [
+        {"bucket": bucket, "visit_count": count}
+        for bucket, count in result.all()
+    ]
+
+@router.get("/stats/dwell")
+async def get_dwell_stats(
+    story_id: Optional[str] = None,
+    start: Optional[str] = Query(None, description="ISO date, inclusive"),
+    end: Optional[str] = Query(None, description="ISO date, inclusive"),
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_admin_user)
+):
+    """Dwell-time percentiles per Passage from the daily dwell histograms"""
+    granularity, start_key, end_key = _rollup_range(start, end, DAY)
+    result = await db.execute(dwell_histogram_statement(granularity, start_key, end_key, story_id))
+
+    passages = {}
+    for passage_id, passage_name, bin_index, count, seconds in result.all():
+        entry = passages.setdefault(passage_id, {"name": passage_name, "histogram": {}, "seconds": 0})
+        entry["histogram"][bin_index] = count
+        entry["seconds"] += seconds
+
+    dwell_stats = []
+    for passage_id, entry in passages.items():
+        sample_count = sum(entry["histogram"].values())
+        dwell_stats.append({
+            "passage_id": passage_id,
+            "passage_name": entry["name"],
+            "sample_count": sample_count,
+            "avg_seconds": round(entry["seconds"] / sample_count, 1) if sample_count else None,
+            **dwell_percentiles(entry["histogram"], DWELL_PERCENTILES)
+        })
+
+    dwell_stats.sort(key=lambda s: s["sample_count"], reverse=True)
+    return dwell_stats
+
+@router.get("/stats/readers")
+async def get_reader_stats(
+    story_id: Optional[str] = None,
+    start: Optional[str] = Query(None, description="ISO date, inclusive"),
+    end: Optional[str] = Query(None, description="ISO date, inclusive"),
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_admin_user)
+):
+    """
+    Approximate distinct signed-in readers, unioned from daily HyperLogLog sketches
+    - Without story_id: totals per Story; with story_id: the Story total and per-Passage counts
+    """
+    _, start_key, end_key = _rollup_range(start, end, DAY)
+
+    result = await db.execute(story_sketches_statement(start_key, end_key, story_id))
+
+    story_sketches = {}
+    for sketch_story_id, blob in result.all():
+        story_sketches.setdefault(sketch_story_id, []).append(blob)
+
+    if not story_id:
+        result = await db.execute(select(Story.id, Story.name).where(Story.id.in_(list(story_sketches))))
+        names = dict(result.all())
+        stories = [
+            {
+                "story_id": sketch_story_id,
+                "story_name": names.get(sketch_story_id),
+                "unique_readers": union_sketches(blobs).count()
+            }
+            for sketch_story_id, blobs in story_sketches.items()
+        ]
+        stories.sort(key=lambda s: s["unique_readers"], reverse=True)
+        return stories
+
+    result = await db.execute(passage_sketches_statement(story_id, start_key, end_key))
+
+    passage_sketches = {}
+    for passage_id, passage_name, blob in result.all():
+        passage_sketches.setdefault((passage_id, passage_name), []).append(blob)
+
+    story_union = union_sketches(story_sketches.get(story_id, []))
+    passages = [
+        {
+            "passage_id": passage_id,
+            "passage_name": passage_name,
+            "unique_readers": union_sketches(blobs).count()
+        }
+        for (passage_id, passage_name), blobs in passage_sketches.items()
+    ]
+    passages.sort(key=lambda p: p["unique_readers"], reverse=True)
+
+    return {
+        "story_id": story_id,
+        "unique_readers": story_union.count() if story_union else 0,
+        "passages": passages
+    }
+
+@router.get("/stats/stories/{story_id}/flow")
+async def get_story_flow(
+    story_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_admin_user)
+):
+    """Per-Passage drop-off and per-Link traversal probability from the transition matrix"""
+    compiled = await story_graph_cache.get(db, story_id)
+    if not compiled:
+        raise HTTPException(status_code=404, detail="Story not found")
+
+    matrix = await transition_matrix_cache.get(db, compiled)
+    return {
+        "story_id": story_id,
+        "passages": passage_flow(compiled, matrix),
+        "links": link_probabilities(compiled, matrix)
+    }
+
+@router.get("/stats/stories/{story_id}/funnel")
+async def get_story_funnel(
+    story_id: str,
+    end_passage_id: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_admin_user)
+):
+    """Completion rate from the start Passage to the end Passages (all 'end' passages by default)"""
+    compiled = await story_graph_cache.get(db, story_id)
+    if not compiled:
+        raise HTTPException(status_code=404, detail="Story not found")
+
+    matrix = await transition_matrix_cache.get(db, compiled)
+    return await story_funnel(compiled, matrix, end_passage_id)
+
+@router.get("/stats/stories/{story_id}/heatmap")
+async def get_story_heatmap(
+    story_id: str,
+    start: Optional[str] = Query(None, description="ISO date, inclusive"),
+    end: Optional[str] = Query(None, description="ISO date, inclusive"),
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_admin_user)
+):
+    """
+    Per-Passage overlay for the story editor, every Passage of the Story in passage ordering
+    - visits, exits and dwell time from the daily rollups, unique readers from the sketches,
+      feedback count from one grouped query; one query per source, none per Passage
+    - exit_rate: share of visits not followed by a transition to another Passage
+    """
+    compiled = await story_graph_cache.get(db, story_id)
+    if not compiled:
+        raise HTTPException(status_code=404, detail="Story not found")
+
+    granularity, start_key, end_key = _rollup_range(start, end, DAY)
+
+    statements = heatmap_statements(story_id, granularity, start_key, end_key)
+
+    result = await db.execute(statements["visits"])
+    visits = dict(result.all())
+
+    result = await db.execute(statements["onward"])
+    onward = dict(result.all())
+
+    result = await db.execute(statements["dwell"])
+    dwell = {passage_id: (count, seconds) for passage_id, count, seconds in result.all()}
+
+    result = await db.execute(statements["sketches"])
+    sketches = {}
+    for passage_id, blob in result.all():
+        sketches.setdefault(passage_id, []).append(blob)
+
+    result = await db.execute(statements["feedback"])
+    feedback_counts = dict(result.all())
+
+    passages = []
+    # Passages without a number go last instead of failing the comparison
+    ordered = sorted(
+        compiled.passages.values(),
+        key=lambda p: (p.passage_number is None, p.passage_number or 0)
+    )
+    for passage in ordered:
+        visit_count = visits.get(passage.id, 0)
+        exits = max(visit_count - onward.get(passage.id, 0), 0)
+        dwell_count, dwell_seconds = dwell.get(passage.id, (0, 0))
+        readers = union_sketches(sketches.get(passage.id, []))
+        passages.append({
+            "passage_id": passage.id,
+            "passage_name": passage.name,
+            "passage_number": passage.passage_number,
+            "passage_type": passage.passage_type,
+            "visit_count": visit_count,
+            "unique_readers": readers.count() if readers else 0,
+            "avg_dwell_seconds": round(dwell_seconds / dwell_count, 1) if dwell_count else None,
+            "exit_count": exits,
+            "exit_rate": exits / visit_count if visit_count else 0.0,
+            "feedback_count": feedback_counts.get(passage.id, 0)
+        })
+
+    return {
+        "story_id": story_id,
+        "start": start_key,
+        "end": end_key,
+        "max_visit_count": max((p["visit_count"] for p in passages), default=0),
+        "passages": passages
+    }
+
+# ===== Feedback Management =====
+def admin_feedback_page_statement(limit: int, cursor: Optional[str], story_id: Optional[str] = None):
+    """
+    One page of top-level feedback with its Passage and Story names
+    Raises ValueError for a malformed cursor
+    """
+    criteria = []
     if story_id:
-        # Filter by story - need to join with passages
-        query = query.join(Passage, Feedback.passage_id == Passage.id).where(Passage.story_id == story_id)
-
-    query = query.order_by(Feedback.created_at.desc())
-    result = await db.execute(query)
-    feedbacks = result.scalars().all()
-
-    responses = []
-    for f in feedbacks:
-        # Get user name
-        user_name = None
-        if f.user_id and not f.is_anonymous:
-            result = await db.execute(select(User).where(User.id == f.user_id))
-            feedback_user = result.scalar_one_or_none()
-            if feedback_user:
-                user_name = feedback_user.name
-
-        # Get passage and story info
-        passage_name = None
-        story_id_val = None
-        story_name = None
-        if f.passage_id:
-            result = await db.execute(select(Passage).where(Passage.id == f.passage_id))
-            passage = result.scalar_one_or_none()
-            if passage:
-                passage_name = passage.name
-                story_id_val = passage.story_id
-                result = await db.execute(select(Story).where(Story.id == passage.story_id))
-                story = result.scalar_one_or_none()
-                if story:
-                    story_name = story.name
-
-        # Count replies
-        result = await db.execute(
-            select(func.count(Feedback.id)).where(Feedback.parent_id == f.id)
-        )
-        reply_count = result.scalar() or 0
+        criteria.append(Feedback.passage_id.in_(select(Passage.id).where(Passage.story_id == story_id)))
 
-        # Get replies
-        replies_response = await build_feedback_response(f, db)
+    return page_statement(limit, cursor, *criteria).outerjoin(
+        Passage, Passage.id == Feedback.passage_id
+    ).outerjoin(
+        Story, Story.id == Passage.story_id
+    ).add_columns(Passage.name, Passage.story_id, Story.name)
 
-        responses.append(FeedbackWithPassageInfo(
-            id=f.id,
-            user_id=f.user_id if not f.is_anonymous else None,
-            user_name=user_name,
-            passage_id=f.passage_id,
+@router.get("/feedback/all", response_model=FeedbackAdminPage)
+async def get_all_feedback_admin(
+    story_id: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(settings.FEEDBACK_PAGE_SIZE, ge=1, le=settings.FEEDBACK_MAX_PAGE_SIZE),
+    expand_replies: bool = Query(False, description="Include the full reply tree of every item"),
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_admin_user)
+):
+    """Get a page of top-level feedback across all passages, newest first (admin only)"""
+    try:
+        statement = admin_feedback_page_statement(limit, cursor, story_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    result = await db.execute(statement)
+    rows = result.all()
+    feedbacks, next_cursor = split_page([row[0] for row in rows], limit)
+
+    # Author names (one IN query) plus reply counts (one grouped query) or the reply trees (one CTE)
+    items = await page_items(db, feedbacks, expand_replies)
+
+    responses = [
+        FeedbackWithPassageInfo(
+            **item.model_dump(exclude={"replies"}),
             passage_name=passage_name,
-            story_id=story_id_val,
+            story_id=passage_story_id,
             story_name=story_name,
-            content=f.content,
-            is_anonymous=bool(f.is_anonymous),
-            parent_id=f.parent_id,
-            created_at=f.created_at,
-            updated_at=f.updated_at,
-            reply_count=reply_count,
-            replies=replies_response.replies
-        ))
-
-    return responses
+            replies=item.replies
+        )
+        for item, (_, passage_name, passage_story_id, story_name) in zip(items, rows)
+    ]
+
+    return FeedbackAdminPage(items=responses, next_cursor=next_cursor)
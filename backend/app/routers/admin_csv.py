@@ -2,27 +2,68 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 from typing import List
 import csv
 import io
 import json
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.story import Story
-from app.models.passage import Passage
+from app.models.passage import Passage, MAX_PASSAGE_NUMBER
 from app.models.link import Link
-from app.models.user import User
+from app.services.user_cache import CachedUser
 from app.core.dependencies import get_admin_user
+from app.services.story_cache import story_graph_cache
+from app.services.export_stream import stream_statement, encode_csv
 
 router = APIRouter()
 
+PASSAGE_CSV_COLUMNS = [
+    'id', 'story_id', 'passage_number', 'name', 'content',
+    'passage_type', 'tags', 'position_x', 'position_y',
+    'width', 'height'
+]
+
+LINK_CSV_COLUMNS = [
+    'id', 'story_id', 'source_passage_id', 'target_passage_id',
+    'name', 'condition_type', 'condition_value', 'link_order'
+]
+
+
+def passage_export_statement(story_id: str):
+    """A Story's passages in PASSAGE_CSV_COLUMNS order, by passage_number"""
+    return select(
+        Passage.id,
+        Passage.story_id,
+        Passage.passage_number,
+        Passage.name,
+        Passage.content,
+        Passage.passage_type,
+        func.coalesce(Passage.tags, '[]').label('tags'),
+        Passage.position_x,
+        Passage.position_y,
+        Passage.width,
+        Passage.height
+    ).where(
+        Passage.story_id == story_id
+    ).order_by(Passage.passage_number)
+
+
+def link_export_statement(story_id: str):
+    """A Story's links in LINK_CSV_COLUMNS order, grouped by source passage"""
+    return select(
+        *[Link.__table__.c[column] for column in LINK_CSV_COLUMNS]
+    ).where(
+        Link.story_id == story_id
+    ).order_by(Link.source_passage_id, Link.link_order)
+
 
 @router.get("/stories/{story_id}/export/passages")
 async def export_passages_csv(
     story_id: str,
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_admin_user)
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_admin_user)
 ):
     """Export passages to CSV"""
     # Verify story exists
@@ -31,47 +72,9 @@ async def export_passages_csv(
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
 
-    # Get all passages
-    result = await db.execute(
-        select(Passage)
-        .where(Passage.story_id == story_id)
-        .order_by(Passage.passage_number)
-    )
-    passages = result.scalars().all()
-
-    # Create CSV in memory with UTF-8 BOM for Excel compatibility
-    output = io.StringIO()
-    # Write UTF-8 BOM
-    output.write('\ufeff')
-    writer = csv.writer(output)
-
-    # Write header
-    writer.writerow([
-        'id', 'story_id', 'passage_number', 'name', 'content',
-        'passage_type', 'tags', 'position_x', 'position_y',
-        'width', 'height'
-    ])
-
-    # Write data
-    for passage in passages:
-        writer.writerow([
-            passage.id,
-            passage.story_id,
-            passage.passage_number or '',
-            passage.name,
-            passage.content or '',
-            passage.passage_type,
-            passage.tags or '[]',
-            passage.position_x,
-            passage.position_y,
-            passage.width,
-            passage.height
-        ])
-
-    # Prepare response
-    output.seek(0)
+    # Stream rows from a server-side cursor instead of building the file in memory
     return StreamingResponse(
-        iter([output.getvalue()]),
+        encode_csv(PASSAGE_CSV_COLUMNS, stream_statement(passage_export_statement(story_id))),
         media_type="text/csv; charset=utf-8",
         headers={
             "Content-Disposition": f"attachment; filename=passages_{story_id}.csv"
@@ -82,8 +85,8 @@ async def export_passages_csv(
 @router.get("/stories/{story_id}/export/links")
 async def export_links_csv(
     story_id: str,
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_admin_user)
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_admin_user)
 ):
     """Export links to CSV"""
     # Verify story exists
@@ -92,43 +95,8 @@ async def export_links_csv(
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
 
-    # Get all links
-    result = await db.execute(
-        select(Link)
-        .where(Link.story_id == story_id)
-        .order_by(Link.source_passage_id, Link.link_order)
-    )
-    links = result.scalars().all()
-
-    # Create CSV in memory with UTF-8 BOM for Excel compatibility
-    output = io.StringIO()
-    # Write UTF-8 BOM
-    output.write('\ufeff')
-    writer = csv.writer(output)
-
-    # Write header
-    writer.writerow([
-        'id', 'story_id', 'source_passage_id', 'target_passage_id',
-        'name', 'condition_type', 'condition_value', 'link_order'
-    ])
-
-    # Write data
-    for link in links:
-        writer.writerow([
-            link.id,
-            link.story_id,
-            link.source_passage_id,
-            link.target_passage_id,
-            link.name or '',
-            link.condition_type,
-            link.condition_value or '',
-            link.link_order
-        ])
-
-    # Prepare response
-    output.seek(0)
     return StreamingResponse(
-        iter([output.getvalue()]),
+        encode_csv(LINK_CSV_COLUMNS, stream_statement(link_export_statement(story_id))),
         media_type="text/csv; charset=utf-8",
         headers={
             "Content-Disposition": f"attachment; filename=links_{story_id}.csv"
@@ -141,7 +109,7 @@ async def import_passages_csv(
     story_id: str,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_admin_user)
+    user: CachedUser = Depends(get_admin_user)
 ):
     """Import passages from CSV"""
     # Verify story exists
@@ -159,6 +127,8 @@ async def import_passages_csv(
     imported_count = 0
     updated_count = 0
     errors = []
+    # Rows may move passages/links from other stories, so those go stale too
+    touched_story_ids = {story_id}
 
     for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
         try:
@@ -173,6 +143,9 @@ async def import_passages_csv(
                 except ValueError:
                     errors.append(f"Row {row_num}: Invalid passage_number '{passage_number_str}'")
                     continue
+                if not 1 <= passage_number <= MAX_PASSAGE_NUMBER:
+                    errors.append(f"Row {row_num}: passage_number must be between 1 and {MAX_PASSAGE_NUMBER}")
+                    continue
 
             # Check if passage exists
             result = await db.execute(
@@ -189,6 +162,7 @@ async def import_passages_csv(
 
             if existing_passage:
                 # Update existing passage
+                touched_story_ids.add(existing_passage.story_id)
                 existing_passage.story_id = story_id
                 existing_passage.passage_number = passage_number
                 existing_passage.name = row['name']
@@ -224,6 +198,8 @@ async def import_passages_csv(
             errors.append(f"Row {row_num}: {str(e)}")
 
     await db.commit()
+    for touched_story_id in touched_story_ids:
+        story_graph_cache.invalidate(touched_story_id)
 
     return {
         "imported": imported_count,
@@ -237,7 +213,7 @@ async def import_links_csv(
     story_id: str,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_admin_user)
+    user: CachedUser = Depends(get_admin_user)
 ):
     """Import links from CSV"""
     # Verify story exists
@@ -255,6 +231,8 @@ async def import_links_csv(
     imported_count = 0
     updated_count = 0
     errors = []
+    # Rows may move passages/links from other stories, so those go stale too
+    touched_story_ids = {story_id}
 
     for row_num, row in enumerate(reader, start=2):
         try:
@@ -270,6 +248,7 @@ async def import_links_csv(
 
             if existing_link:
                 # Update existing link
+                touched_story_ids.add(existing_link.story_id)
                 existing_link.story_id = story_id
                 existing_link.source_passage_id = row['source_passage_id']
                 existing_link.target_passage_id = row['target_passage_id']
@@ -299,6 +278,8 @@ async def import_links_csv(
             errors.append(f"Row {row_num}: {str(e)}")
 
     await db.commit()
+    for touched_story_id in touched_story_ids:
+        story_graph_cache.invalidate(touched_story_id)
 
     return {
         "imported": imported_count,
@@ -0,0 +1,101 @@
+"""Streaming exports of visit logs and analytics rollups (CSV / NDJSON)"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from typing import Optional
+
+from app.models.analytics import (
+    VisitLog, PassageVisitRollup, StoryVisitRollup, TransitionRollup, PassageDwellRollup
+)
+from app.services.user_cache import CachedUser
+from app.core.dependencies import get_admin_user
+from app.services.export_stream import (
+    EXPORT_FORMAT_PATTERN, FORMAT_CSV, parse_time_range, stream_statement, batched, chain, export_response
+)
+from app.services.visit_archive import visit_archive
+from app.services.visit_rollups import DAY, parse_bucket_range
+
+router = APIRouter()
+
+VISIT_LOG_COLUMNS = [
+    'id', 'user_id', 'story_id', 'passage_id', 'previous_passage_id', 'duration_seconds', 'created_at'
+]
+
+# kind -> (model, exported columns)
+ROLLUP_EXPORTS = {
+    "passages": (PassageVisitRollup, ['granularity', 'bucket', 'story_id', 'passage_id', 'visit_count']),
+    "stories": (StoryVisitRollup, ['granularity', 'bucket', 'story_id', 'visit_count']),
+    "transitions": (
+        TransitionRollup,
+        ['granularity', 'bucket', 'story_id', 'from_passage_id', 'to_passage_id', 'transition_count']
+    ),
+    "dwell": (
+        PassageDwellRollup,
+        ['granularity', 'bucket', 'story_id', 'passage_id', 'bin', 'visit_count', 'total_seconds']
+    ),
+}
+
+
+def visit_export_statement(story_id: Optional[str], start: Optional[str], end: Optional[str]):
+    """Live visit logs in time order, so they follow the archived months (which come first)"""
+    statement = select(
+        *[VisitLog.__table__.c[column] for column in VISIT_LOG_COLUMNS]
+    ).order_by(VisitLog.created_at, VisitLog.id)
+    if story_id:
+        statement = statement.where(VisitLog.story_id == story_id)
+    if start:
+        statement = statement.where(VisitLog.created_at >= start)
+    if end:
+        statement = statement.where(VisitLog.created_at < end)
+    return statement
+
+
+@router.get("/export/visits")
+async def export_visit_logs(
+    format: str = Query(FORMAT_CSV, pattern=EXPORT_FORMAT_PATTERN),
+    story_id: Optional[str] = None,
+    start: Optional[str] = Query(None, description="ISO date or datetime, inclusive"),
+    end: Optional[str] = Query(None, description="ISO datetime (exclusive) or date (inclusive)"),
+    include_archived: bool = Query(True, description="Include months moved to archive files"),
+    user: CachedUser = Depends(get_admin_user)
+):
+    """Stream raw visit logs: archived months first, then the live table"""
+    start, end = parse_time_range(start, end)
+
+    sources = [stream_statement(visit_export_statement(story_id, start, end))]
+    if include_archived:
+        sources.insert(0, batched(visit_archive.iter_rows(story_id, start, end)))
+
+    return export_response(format, VISIT_LOG_COLUMNS, chain(*sources), "visit_logs")
+
+
+@router.get("/export/rollups/{kind}")
+async def export_rollups(
+    kind: str,
+    format: str = Query(FORMAT_CSV, pattern=EXPORT_FORMAT_PATTERN),
+    granularity: str = Query(DAY, pattern="^(hour|day)$"),
+    story_id: Optional[str] = None,
+    start: Optional[str] = Query(None, description="ISO date or datetime, inclusive"),
+    end: Optional[str] = Query(None, description="ISO date or datetime, inclusive"),
+    user: CachedUser = Depends(get_admin_user)
+):
+    """Stream one rollup table (passages, stories, transitions, dwell)"""
+    if kind not in ROLLUP_EXPORTS:
+        raise HTTPException(status_code=404, detail="Unknown rollup")
+    model, columns = ROLLUP_EXPORTS[kind]
+
+    try:
+        granularity, start_key, end_key = parse_bucket_range(start, end, granularity)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start/end must be ISO dates or datetimes")
+
+    statement = select(*[model.__table__.c[column] for column in columns]).where(
+        model.granularity == granularity
+    )
+    if story_id:
+        statement = statement.where(model.story_id == story_id)
+    if start_key:
+        statement = statement.where(model.bucket >= start_key)
+    if end_key:
+        statement = statement.where(model.bucket <= end_key)
+
+    return export_response(format, columns, stream_statement(statement), f"{kind}_rollups_{granularity}")
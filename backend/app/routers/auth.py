@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User
+from app.services.user_cache import CachedUser
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import create_access_token
+from app.core.password_hasher import password_hasher, PasswordHasherBusy
 from app.core.dependencies import get_current_user_required
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -19,15 +22,29 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
+    # Release the single writer connection while bcrypt runs on the hasher's thread pool
+    await db.commit()
 
     # Create user
+    try:
+        hashed_password = await password_hasher.hash(user_data.password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many sign-ins, try again shortly")
     user = User(
         email=user_data.email,
-        password=get_password_hash(user_data.password),
+        password=hashed_password,
         name=user_data.name
     )
     db.add(user)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another sign-up with this email committed while the password was hashing
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     await db.refresh(user)
 
     return user
@@ -36,8 +53,15 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
 async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == user_data.email))
     user = result.scalar_one_or_none()
+    # Release the single writer connection while bcrypt runs on the hasher's thread pool
+    await db.commit()
 
-    if not user or not verify_password(user_data.password, user.password):
+    try:
+        valid = bool(user) and await password_hasher.verify(user_data.password, user.password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many sign-ins, try again shortly")
+
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -51,8 +75,16 @@ async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
     return Token(access_token=access_token)
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(user: User = Depends(get_current_user_required)):
-    return user
+async def get_me(
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_current_user_required)
+):
+    # The dependency only carries id / name / role; the profile needs the full row
+    result = await db.execute(select(User).where(User.id == user.id))
+    profile = result.scalar_one_or_none()
+    if not profile:
+        raise HTTPException(status_code=404, detail="User not found")
+    return profile
 
 @router.post("/logout")
 async def logout():
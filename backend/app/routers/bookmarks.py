@@ -1,84 +1,144 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
-from app.database import get_db
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import IntegrityError
+from typing import Iterable, List
+from datetime import datetime
+import uuid
+from app.database import get_db, get_read_db
 from app.models.bookmark import Bookmark
 from app.models.passage import Passage
-from app.models.user import User
-from app.schemas.bookmark import BookmarkResponse
+from app.models.story import Story
+from app.services.user_cache import CachedUser
+from app.schemas.bookmark import BookmarkResponse, BookmarkSyncRequest, BookmarkSyncResponse
 from app.core.dependencies import get_current_user_required
+from app.config import get_settings
 
 router = APIRouter(prefix="/api/bookmarks", tags=["bookmarks"])
+settings = get_settings()
+
+def bookmark_listing(user_id: str):
+    """A user's bookmarks with passage and story names, newest first (one join)"""
+    return select(
+        Bookmark.id,
+        Bookmark.user_id,
+        Bookmark.passage_id,
+        Passage.name.label("passage_name"),
+        Passage.story_id,
+        Story.name.label("story_name"),
+        Bookmark.created_at
+    ).outerjoin(
+        Passage, Passage.id == Bookmark.passage_id
+    ).outerjoin(
+        Story, Story.id == Passage.story_id
+    ).where(
+        Bookmark.user_id == user_id
+    ).order_by(Bookmark.created_at.desc())
+
+def bookmarked_passages(user_id: str):
+    return select(Bookmark.passage_id).where(Bookmark.user_id == user_id)
+
+def bookmark_removal(user_id: str, passage_ids: Iterable[str]):
+    return delete(Bookmark).where(Bookmark.user_id == user_id, Bookmark.passage_id.in_(passage_ids))
+
+async def load_bookmarks(db: AsyncSession, user_id: str) -> List[BookmarkResponse]:
+    result = await db.execute(bookmark_listing(user_id))
+    return [BookmarkResponse(**row._mapping) for row in result.all()]
 
 @router.get("", response_model=List[BookmarkResponse])
 async def get_bookmarks(
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user_required)
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_current_user_required)
 ):
     """Get user's bookmarks"""
-    result = await db.execute(
-        select(Bookmark)
-        .where(Bookmark.user_id == user.id)
-        .order_by(Bookmark.created_at.desc())
-    )
-    bookmarks = result.scalars().all()
+    return await load_bookmarks(db, user.id)
 
-    responses = []
-    for b in bookmarks:
-        # Get passage info
-        result = await db.execute(select(Passage).where(Passage.id == b.passage_id))
-        passage = result.scalar_one_or_none()
+@router.put("/sync", response_model=BookmarkSyncResponse)
+async def sync_bookmarks(
+    sync_data: BookmarkSyncRequest,
+    db: AsyncSession = Depends(get_db),
+    user: CachedUser = Depends(get_current_user_required)
+):
+    """
+    Replace the user's bookmarks with the client's full set
+    - Only the difference is written: one INSERT for the additions, one DELETE for the removals,
+      in a single transaction; unknown passage ids are ignored and reported
+    """
+    wanted = set(sync_data.passage_ids)
+    if len(wanted) > settings.BOOKMARK_SYNC_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail="Too many bookmarks in one sync")
+
+    result = await db.execute(bookmarked_passages(user.id))
+    current = set(result.scalars().all())
 
-        responses.append(BookmarkResponse(
-            id=b.id,
-            user_id=b.user_id,
-            passage_id=b.passage_id,
-            passage_name=passage.name if passage else None,
-            story_id=passage.story_id if passage else None,
-            created_at=b.created_at
-        ))
+    to_add = wanted - current
+    to_remove = current - wanted
+    ignored = []
 
-    return responses
+    if to_add:
+        result = await db.execute(select(Passage.id).where(Passage.id.in_(to_add)))
+        existing = set(result.scalars().all())
+        ignored = sorted(to_add - existing)
+        to_add = existing
+
+    if to_add:
+        now = datetime.utcnow().isoformat()
+        await db.execute(
+            insert(Bookmark).on_conflict_do_nothing(index_elements=["user_id", "passage_id"]),
+            [
+                {"id": str(uuid.uuid4()), "user_id": user.id, "passage_id": passage_id, "created_at": now}
+                for passage_id in to_add
+            ]
+        )
+    if to_remove:
+        await db.execute(bookmark_removal(user.id, to_remove))
+    await db.commit()
+
+    return BookmarkSyncResponse(
+        added=len(to_add),
+        removed=len(to_remove),
+        ignored=ignored,
+        bookmarks=await load_bookmarks(db, user.id)
+    )
 
 @router.post("/{passage_id}", response_model=BookmarkResponse)
 async def add_bookmark(
     passage_id: str,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user_required)
+    user: CachedUser = Depends(get_current_user_required)
 ):
     """Add bookmark"""
-    # Check passage exists
-    result = await db.execute(select(Passage).where(Passage.id == passage_id))
-    passage = result.scalar_one_or_none()
-    if not passage:
-        raise HTTPException(status_code=404, detail="Passage not found")
-
-    # Check if already bookmarked
+    # Check passage exists (with its story name for the response)
     result = await db.execute(
-        select(Bookmark).where(
-            Bookmark.user_id == user.id,
-            Bookmark.passage_id == passage_id
-        )
+        select(Passage.name, Passage.story_id, Story.name)
+        .outerjoin(Story, Story.id == Passage.story_id)
+        .where(Passage.id == passage_id)
     )
-    existing = result.scalar_one_or_none()
-    if existing:
-        raise HTTPException(status_code=400, detail="Already bookmarked")
+    passage = result.one_or_none()
+    if not passage:
+        raise HTTPException(status_code=404, detail="Passage not found")
+    passage_name, story_id, story_name = passage
 
+    # The unique (user_id, passage_id) constraint rejects duplicates
     bookmark = Bookmark(
         user_id=user.id,
         passage_id=passage_id
     )
     db.add(bookmark)
-    await db.commit()
-    await db.refresh(bookmark)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Already bookmarked")
 
     return BookmarkResponse(
         id=bookmark.id,
         user_id=bookmark.user_id,
         passage_id=bookmark.passage_id,
-        passage_name=passage.name,
-        story_id=passage.story_id,
+        passage_name=passage_name,
+        story_id=story_id,
+        story_name=story_name,
         created_at=bookmark.created_at
     )
 
@@ -86,21 +146,12 @@ async def add_bookmark(
 async def remove_bookmark(
     passage_id: str,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user_required)
+    user: CachedUser = Depends(get_current_user_required)
 ):
     """Remove bookmark"""
-    result = await db.execute(
-        select(Bookmark).where(
-            Bookmark.user_id == user.id,
-            Bookmark.passage_id == passage_id
-        )
-    )
-    bookmark = result.scalar_one_or_none()
-
-    if not bookmark:
+    result = await db.execute(bookmark_removal(user.id, [passage_id]))
+    if not result.rowcount:
         raise HTTPException(status_code=404, detail="Bookmark not found")
-
-    await db.delete(bookmark)
     await db.commit()
 
     return {"message": "Bookmark removed"}
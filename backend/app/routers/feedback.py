@@ -1,78 +1,107 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.feedback import Feedback
-from app.models.user import User
+from app.services.user_cache import CachedUser
 from app.models.passage import Passage
 from app.models.story import Story
-from app.schemas.feedback import FeedbackCreate, FeedbackResponse, FeedbackWithPassageInfo
+from app.schemas.feedback import FeedbackCreate, FeedbackResponse, FeedbackWithPassageInfo, FeedbackPage
 from app.core.dependencies import get_current_user, get_current_user_required, get_admin_user
+from app.services.feedback_threads import (
+    feedback_response, page_statement, split_page, page_items, load_threads
+)
+from app.services.feedback_hub import (
+    feedback_hub, FeedbackHubFull, ALL_FEEDBACK, passage_topic, story_topic
+)
+from app.config import get_settings
 
 router = APIRouter(prefix="/api/feedback", tags=["feedback"])
+settings = get_settings()
 
-async def build_feedback_response(feedback: Feedback, db: AsyncSession) -> FeedbackResponse:
-    user_name = None
-    if feedback.user_id and not feedback.is_anonymous:
-        result = await db.execute(select(User).where(User.id == feedback.user_id))
-        user = result.scalar_one_or_none()
-        if user:
-            user_name = user.name
-
-    # Get replies
-    result = await db.execute(
-        select(Feedback)
-        .where(Feedback.parent_id == feedback.id)
-        .order_by(Feedback.created_at)
-    )
-    replies_db = result.scalars().all()
-
-    replies = []
-    for reply in replies_db:
-        reply_response = await build_feedback_response(reply, db)
-        replies.append(reply_response)
-
-    return FeedbackResponse(
-        id=feedback.id,
-        user_id=feedback.user_id if not feedback.is_anonymous else None,
-        user_name=user_name,
-        passage_id=feedback.passage_id,
-        content=feedback.content,
-        is_anonymous=bool(feedback.is_anonymous),
-        parent_id=feedback.parent_id,
-        created_at=feedback.created_at,
-        updated_at=feedback.updated_at,
-        replies=replies
+async def publish_feedback_event(db: AsyncSession, event_type: str, passage_id: Optional[str], payload: dict):
+    """Push a change to the live streams of its passage, its story and the global feed"""
+    topics = [ALL_FEEDBACK]
+    if passage_id:
+        topics.append(passage_topic(passage_id))
+        result = await db.execute(select(Passage.story_id).where(Passage.id == passage_id))
+        story_id = result.scalar_one_or_none()
+        if story_id:
+            topics.append(story_topic(story_id))
+    feedback_hub.publish(topics, {"type": event_type, "feedback": payload})
+
+def event_stream(topics: List[str]) -> StreamingResponse:
+    try:
+        subscription = feedback_hub.subscribe(topics)
+    except FeedbackHubFull:
+        raise HTTPException(status_code=503, detail="Too many live feedback connections")
+    return StreamingResponse(
+        feedback_hub.stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also runs when the client left before the body generator started
+        background=BackgroundTask(feedback_hub.unsubscribe, subscription)
     )
 
-@router.get("", response_model=List[FeedbackResponse])
+@router.get("", response_model=FeedbackPage)
 async def get_feedback(
     passage_id: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(settings.FEEDBACK_PAGE_SIZE, ge=1, le=settings.FEEDBACK_MAX_PAGE_SIZE),
+    expand_replies: bool = Query(False, description="Include the full reply tree of every item"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get feedback list (optionally filtered by passage)"""
-    query = select(Feedback).where(Feedback.parent_id == None)
+    """Get a page of top-level feedback, newest first (optionally filtered by passage)"""
+    criteria = [Feedback.passage_id == passage_id] if passage_id else []
+    try:
+        statement = page_statement(limit, cursor, *criteria)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    result = await db.execute(statement)
+    feedbacks, next_cursor = split_page(result.scalars().all(), limit)
+
+    return FeedbackPage(
+        items=await page_items(db, feedbacks, expand_replies),
+        next_cursor=next_cursor
+    )
 
-    if passage_id:
-        query = query.where(Feedback.passage_id == passage_id)
+@router.get("/stream")
+async def stream_all_feedback():
+    """Live feedback changes across all passages (Server-Sent Events)"""
+    return event_stream([ALL_FEEDBACK])
 
-    query = query.order_by(Feedback.created_at.desc())
-    result = await db.execute(query)
-    feedbacks = result.scalars().all()
+@router.get("/stream/passages/{passage_id}")
+async def stream_passage_feedback(passage_id: str):
+    """Live feedback changes of one passage (Server-Sent Events)"""
+    return event_stream([passage_topic(passage_id)])
 
-    responses = []
-    for f in feedbacks:
-        response = await build_feedback_response(f, db)
-        responses.append(response)
+@router.get("/stream/stories/{story_id}")
+async def stream_story_feedback(story_id: str):
+    """Live feedback changes of every passage of one story (Server-Sent Events)"""
+    return event_stream([story_topic(story_id)])
 
-    return responses
+@router.get("/{feedback_id}/replies", response_model=List[FeedbackResponse])
+async def get_feedback_replies(
+    feedback_id: str,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the full reply tree below one feedback, oldest first"""
+    replies = await load_threads(db, Feedback.parent_id == feedback_id)
+    if not replies:
+        result = await db.execute(select(Feedback.id).where(Feedback.id == feedback_id))
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Feedback not found")
+    return replies
 
 @router.post("", response_model=FeedbackResponse)
 async def create_feedback(
     feedback_data: FeedbackCreate,
     db: AsyncSession = Depends(get_db),
-    user: Optional[User] = Depends(get_current_user)
+    user: Optional[CachedUser] = Depends(get_current_user)
 ):
     """Create new feedback"""
     feedback = Feedback(
@@ -86,14 +115,16 @@ async def create_feedback(
     await db.commit()
     await db.refresh(feedback)
 
-    return await build_feedback_response(feedback, db)
+    response = feedback_response(feedback, user.name if user else None)
+    await publish_feedback_event(db, "created", feedback.passage_id, response.model_dump())
+    return response
 
 @router.post("/{feedback_id}/reply", response_model=FeedbackResponse)
 async def reply_feedback(
     feedback_id: str,
     feedback_data: FeedbackCreate,
     db: AsyncSession = Depends(get_db),
-    user: Optional[User] = Depends(get_current_user)
+    user: Optional[CachedUser] = Depends(get_current_user)
 ):
     """Reply to feedback"""
     # Check parent exists
@@ -113,13 +144,15 @@ async def reply_feedback(
     await db.commit()
     await db.refresh(feedback)
 
-    return await build_feedback_response(feedback, db)
+    response = feedback_response(feedback, user.name if user else None)
+    await publish_feedback_event(db, "created", feedback.passage_id, response.model_dump())
+    return response
 
 @router.delete("/{feedback_id}")
 async def delete_feedback(
     feedback_id: str,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user_required)
+    user: CachedUser = Depends(get_current_user_required)
 ):
     """Delete feedback (owner or admin only)"""
     result = await db.execute(select(Feedback).where(Feedback.id == feedback_id))
@@ -134,4 +167,10 @@ async def delete_feedback(
     await db.delete(feedback)
     await db.commit()
 
+    await publish_feedback_event(db, "deleted", feedback.passage_id, {
+        "id": feedback.id,
+        "parent_id": feedback.parent_id,
+        "passage_id": feedback.passage_id
+    })
+
     return {"message": "Feedback deleted"}
@@ -3,14 +3,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Optional
 import json
-from app.database import get_db
-from app.models.passage import Passage
-from app.models.story import Story
-from app.models.analytics import VisitLog
+from app.database import get_db, get_read_db
+from app.models.passage import Passage, MAX_PASSAGE_NUMBER
 from app.schemas.story import PassageWithContext, NavigationRequest, PassageResponse, PassageUpdate
 from app.services.story_engine import StoryEngine
+from app.services.story_cache import story_graph_cache
+from app.services.visit_writer import visit_log_writer
+from app.services.reading_sessions import reading_session_store
 from app.core.dependencies import get_current_user
-from app.models.user import User
+from app.services.user_cache import CachedUser
 
 router = APIRouter(prefix="/api/passages", tags=["passages"])
 
@@ -18,88 +19,64 @@ router = APIRouter(prefix="/api/passages", tags=["passages"])
 async def resolve_passage_reference(
     story_id: str = Query(...),
     reference: str = Query(..., description="Passage name or #XXXXXX ID format"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Resolve a passage reference to its full data."""
-    # Check if story exists and is active
-    story_result = await db.execute(
-        select(Story).where(Story.id == story_id, Story.is_active == True)
-    )
-    if not story_result.scalar_one_or_none():
+    # Served from the compiled story's name/number lookup tables
+    engine = StoryEngine(db)
+    compiled = await engine.get_compiled_story(story_id)
+    if not compiled or not compiled.story.is_active:
         raise HTTPException(status_code=404, detail="Story not found")
 
     # Check if reference is in #XXXXXX format
     if reference.startswith('#'):
         try:
             passage_number = int(reference[1:])
-            # Validate bounds (1 to 999999)
-            if passage_number <= 0 or passage_number > 999999:
-                raise HTTPException(status_code=400, detail="Invalid passage number")
-            result = await db.execute(
-                select(Passage).where(
-                    Passage.story_id == story_id,
-                    Passage.passage_number == passage_number
-                )
-            )
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid passage number format")
+        # Validate bounds (1 to 999999)
+        if passage_number <= 0 or passage_number > MAX_PASSAGE_NUMBER:
+            raise HTTPException(status_code=400, detail="Invalid passage number")
+        passage = compiled.get_passage_by_number(passage_number)
     else:
-        # Query by passage name
-        result = await db.execute(
-            select(Passage).where(
-                Passage.story_id == story_id,
-                Passage.name == reference
-            )
-        )
-
-    passage = result.scalar_one_or_none()
+        passage = compiled.get_passage_by_name(reference)
 
     if not passage:
         raise HTTPException(status_code=404, detail="Passage not found")
 
-    return PassageResponse(
-        id=passage.id,
-        story_id=passage.story_id,
-        passage_number=passage.passage_number,
-        name=passage.name,
-        content=passage.content or "",
-        passage_type=passage.passage_type,
-        tags=json.loads(passage.tags) if passage.tags else [],
-        position_x=passage.position_x,
-        position_y=passage.position_y,
-        width=passage.width,
-        height=passage.height,
-        created_at=passage.created_at,
-        updated_at=passage.updated_at
-    )
+    return passage
 
 @router.get("/{passage_id}", response_model=PassageWithContext)
 async def get_passage(
     passage_id: str,
     previous_passage_id: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
-    user: Optional[User] = Depends(get_current_user)
+    prefetch: int = Query(0, ge=0, description="Embed next-hop passages up to this many hops"),
+    render: bool = Query(False, description="Include server-compiled content"),
+    db: AsyncSession = Depends(get_read_db),
+    user: Optional[CachedUser] = Depends(get_current_user)
 ):
     """Get passage with navigation context"""
     engine = StoryEngine(db)
-    context = await engine.get_passage_with_context(passage_id, previous_passage_id)
+    context = await engine.get_passage_with_context(passage_id, previous_passage_id, prefetch, render)
 
     if not context:
         raise HTTPException(status_code=404, detail="Passage not found")
 
-    # Log visit
-    result = await db.execute(select(Passage).where(Passage.id == passage_id))
-    passage = result.scalar_one_or_none()
-
-    if passage:
-        visit_log = VisitLog(
-            user_id=user.id if user else None,
-            story_id=passage.story_id,
-            passage_id=passage_id,
-            previous_passage_id=previous_passage_id
-        )
-        db.add(visit_log)
-        await db.commit()
+    # previous_passage_id comes straight from the client and keys the transition rollups:
+    # only a Passage of the same Story is recorded (served from the compiled graph cache)
+    compiled = await engine.get_compiled_story_for_passage(passage_id)
+    if previous_passage_id and not (compiled and compiled.get_passage(previous_passage_id)):
+        previous_passage_id = None
+
+    # Log visit in the background (the context already carries the owning story)
+    context.visit_id = visit_log_writer.record(
+        passage_id=passage_id,
+        story_id=context.passage.story_id,
+        user_id=user.id if user else None,
+        previous_passage_id=previous_passage_id
+    )
+    if user:
+        reading_session_store.record(user.id, context.passage)
 
     return context
 
@@ -107,7 +84,10 @@ async def get_passage(
 async def navigate(
     passage_id: str,
     nav_request: NavigationRequest,
-    db: AsyncSession = Depends(get_db)
+    prefetch: int = Query(0, ge=0, description="Embed next-hop passages up to this many hops"),
+    render: bool = Query(False, description="Include server-compiled content"),
+    db: AsyncSession = Depends(get_read_db),
+    user: Optional[CachedUser] = Depends(get_current_user)
 ):
     """Navigate to next passage via link"""
     engine = StoryEngine(db)
@@ -118,8 +98,12 @@ async def navigate(
 
     context = await engine.get_passage_with_context(
         next_passage.id,
-        passage_id  # Current passage becomes previous
+        passage_id,  # Current passage becomes previous
+        prefetch,
+        render
     )
+    if context and user:
+        reading_session_store.record(user.id, context.passage)
 
     return context
 
@@ -158,6 +142,7 @@ async def update_passage(
 
     await db.commit()
     await db.refresh(passage)
+    story_graph_cache.invalidate(passage.story_id)
 
     return PassageResponse(
         id=passage.id,
@@ -1,19 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
-from app.database import get_db
+from typing import List, Optional
+from app.database import get_read_db
 from app.models.story import Story
-from app.models.passage import Passage
-from app.models.link import Link
-from app.schemas.story import StoryResponse, PassageResponse, PassageWithContext, StoryWithPassages, LinkResponse
+from app.services.user_cache import CachedUser
+from app.schemas.story import (
+    StoryResponse, PassageWithContext, StoryWithPassages, StoryBundleManifest, ReadingProgressResponse
+)
 from app.services.story_engine import StoryEngine
+from app.services.story_bundle import get_story_bundle, accepts_gzip
+from app.services.reading_sessions import reading_session_store
+from app.core.dependencies import get_current_user, get_current_user_required
 import json
 
 router = APIRouter(prefix="/api/stories", tags=["stories"])
 
 @router.get("", response_model=List[StoryResponse])
-async def get_stories(db: AsyncSession = Depends(get_db)):
+async def get_stories(db: AsyncSession = Depends(get_read_db)):
     """Get all active stories"""
     result = await db.execute(
         select(Story).where(Story.is_active == 1).order_by(Story.sort_order.asc(), Story.created_at.desc())
@@ -39,68 +43,21 @@ async def get_stories(db: AsyncSession = Depends(get_db)):
     ]
 
 @router.get("/structure/{story_id}", response_model=StoryWithPassages)
-async def get_story_structure(story_id: str, db: AsyncSession = Depends(get_db)):
+async def get_story_structure(story_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get full story structure with passages and links (public)"""
-    result = await db.execute(select(Story).where(Story.id == story_id))
-    story = result.scalar_one_or_none()
-    if not story:
+    engine = StoryEngine(db)
+    compiled = await engine.get_compiled_story(story_id)
+    if not compiled:
         raise HTTPException(status_code=404, detail="Story not found")
 
-    # Get passages
-    result = await db.execute(select(Passage).where(Passage.story_id == story_id))
-    passages = result.scalars().all()
-
-    # Get links
-    result = await db.execute(select(Link).where(Link.story_id == story_id))
-    links = result.scalars().all()
-
     return StoryWithPassages(
-        id=story.id,
-        name=story.name,
-        description=story.description,
-        start_passage_id=story.start_passage_id,
-        is_active=bool(story.is_active),
-        zoom=story.zoom,
-        tags=json.loads(story.tags) if story.tags else [],
-        sort_order=story.sort_order,
-        icon=story.icon or "book-open",
-        created_by=story.created_by,
-        created_at=story.created_at,
-        updated_at=story.updated_at,
-        passages=[
-            PassageResponse(
-                id=p.id,
-                story_id=p.story_id,
-                name=p.name,
-                content=p.content,
-                passage_type=p.passage_type,
-                tags=json.loads(p.tags) if p.tags else [],
-                position_x=p.position_x,
-                position_y=p.position_y,
-                width=p.width,
-                height=p.height,
-                created_at=p.created_at,
-                updated_at=p.updated_at
-            )
-            for p in passages
-        ],
-        links=[
-            LinkResponse(
-                id=l.id,
-                story_id=l.story_id,
-                source_passage_id=l.source_passage_id,
-                target_passage_id=l.target_passage_id,
-                name=l.name,
-                condition_type=l.condition_type,
-                condition_value=l.condition_value,
-                link_order=l.link_order
-            )
-            for l in links
-        ]
+        **compiled.story.model_dump(),
+        passages=list(compiled.passages.values()),
+        links=list(compiled.links.values())
     )
 
 @router.get("/{story_id}", response_model=StoryResponse)
-async def get_story(story_id: str, db: AsyncSession = Depends(get_db)):
+async def get_story(story_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get story by ID"""
     result = await db.execute(select(Story).where(Story.id == story_id))
     story = result.scalar_one_or_none()
@@ -123,8 +80,67 @@ async def get_story(story_id: str, db: AsyncSession = Depends(get_db)):
         updated_at=story.updated_at
     )
 
+@router.get("/{story_id}/bundle", response_model=StoryBundleManifest)
+async def get_story_bundle_manifest(
+    story_id: str,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the current content-hashed bundle URL of a story"""
+    engine = StoryEngine(db)
+    compiled = await engine.get_compiled_story(story_id)
+    if not compiled:
+        raise HTTPException(status_code=404, detail="Story not found")
+
+    artifact = get_story_bundle(compiled)
+    response.headers["Cache-Control"] = "no-cache"
+    return StoryBundleManifest(
+        story_id=story_id,
+        version=artifact.version,
+        url=f"/api/stories/{story_id}/bundle/{artifact.version}",
+        size_bytes=len(artifact.gzip_body)
+    )
+
+
+@router.get("/{story_id}/bundle/{version}")
+async def get_story_bundle_version(
+    story_id: str,
+    version: str,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get an immutable story bundle (full story graph with lookup tables)"""
+    engine = StoryEngine(db)
+    compiled = await engine.get_compiled_story(story_id)
+    if not compiled:
+        raise HTTPException(status_code=404, detail="Story not found")
+
+    artifact = get_story_bundle(compiled)
+    if artifact.version != version:
+        raise HTTPException(status_code=404, detail="Bundle version not found")
+
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{artifact.version}"',
+        # Shared by the 304, gzip and identity responses
+        "Vary": "Accept-Encoding",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=artifact.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=artifact.body, media_type="application/json", headers=headers)
+
+
 @router.get("/{story_id}/start", response_model=PassageWithContext)
-async def get_start_passage(story_id: str, db: AsyncSession = Depends(get_db)):
+async def get_start_passage(
+    story_id: str,
+    render: bool = Query(False, description="Include server-compiled content"),
+    db: AsyncSession = Depends(get_read_db),
+    user: Optional[CachedUser] = Depends(get_current_user)
+):
     """Get the starting passage of a story"""
     engine = StoryEngine(db)
     passage = await engine.get_start_passage(story_id)
@@ -132,7 +148,64 @@ async def get_start_passage(story_id: str, db: AsyncSession = Depends(get_db)):
     if not passage:
         raise HTTPException(status_code=404, detail="Start passage not found")
 
-    context = await engine.get_passage_with_context(passage.id)
+    context = await engine.get_passage_with_context(passage.id, render=render)
+    if context and user:
+        reading_session_store.record(user.id, context.passage)
+    return context
+
+
+@router.get("/{story_id}/progress", response_model=ReadingProgressResponse)
+async def get_reading_progress(
+    story_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_current_user_required)
+):
+    """
+    The reader's progress in a story
+    - percent_explored comes from the session bitset and the cached graph, no visit-log scan
+    """
+    engine = StoryEngine(db)
+    compiled = await engine.get_compiled_story(story_id)
+    if not compiled or not compiled.story.is_active:
+        raise HTTPException(status_code=404, detail="Story not found")
+
+    progress = ReadingProgressResponse(story_id=story_id, total_passages=compiled.passage_mask.bit_count())
+    session = await reading_session_store.get(db, user.id, story_id)
+    if session:
+        visited = session.visited & compiled.passage_mask
+        if compiled.get_passage(session.last_passage_id):
+            progress.last_passage_id = session.last_passage_id
+        progress.visited_passage_numbers = [n for n in range(visited.bit_length()) if visited >> n & 1]
+        progress.visited_count = visited.bit_count()
+        progress.updated_at = session.updated_at
+    if progress.total_passages:
+        progress.percent_explored = round(100 * progress.visited_count / progress.total_passages, 1)
+    return progress
+
+
+@router.get("/{story_id}/resume", response_model=PassageWithContext)
+async def resume_story(
+    story_id: str,
+    render: bool = Query(False, description="Include server-compiled content"),
+    db: AsyncSession = Depends(get_read_db),
+    user: CachedUser = Depends(get_current_user_required)
+):
+    """The passage the reader last opened in a story (the start passage when there is none)"""
+    engine = StoryEngine(db)
+    compiled = await engine.get_compiled_story(story_id)
+    if not compiled or not compiled.story.is_active:
+        raise HTTPException(status_code=404, detail="Story not found")
+
+    session = await reading_session_store.get(db, user.id, story_id)
+    passage_id = session.last_passage_id if session else None
+    if not compiled.get_passage(passage_id):
+        # Never read, or the passage was deleted since
+        passage_id = compiled.start_passage_id
+    if not passage_id:
+        raise HTTPException(status_code=404, detail="Start passage not found")
+
+    context = engine.build_context(compiled, passage_id, None, render)
+    reading_session_store.record(user.id, context.passage)
     return context
 
 
@@ -141,17 +214,14 @@ async def get_passage_by_name(
     story_id: str,
     passage_name: str,
     previous_passage_id: str = None,
-    db: AsyncSession = Depends(get_db)
+    render: bool = Query(False, description="Include server-compiled content"),
+    db: AsyncSession = Depends(get_read_db),
+    user: Optional[CachedUser] = Depends(get_current_user)
 ):
     """Get a passage by its name within a story"""
-    # Find the passage by name
-    result = await db.execute(
-        select(Passage).where(
-            Passage.story_id == story_id,
-            Passage.name == passage_name
-        )
-    )
-    passage = result.scalar_one_or_none()
+    engine = StoryEngine(db)
+    compiled = await engine.get_compiled_story(story_id)
+    passage = compiled.get_passage_by_name(passage_name) if compiled else None
 
     if not passage:
         raise HTTPException(
@@ -159,6 +229,7 @@ async def get_passage_by_name(
             detail=f"Passage '{passage_name}' not found in story"
         )
 
-    engine = StoryEngine(db)
-    context = await engine.get_passage_with_context(passage.id, previous_passage_id)
+    context = engine.build_context(compiled, passage.id, previous_passage_id, render)
+    if user:
+        reading_session_store.record(user.id, context.passage)
     return context
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from pydantic import TypeAdapter, ValidationError
+from typing import List
+import json
+from app.schemas.visit import VisitBeaconItem
+from app.services.visit_writer import visit_log_writer
+from app.config import get_settings
+
+router = APIRouter(prefix="/api/visits", tags=["visits"])
+settings = get_settings()
+
+beacon_items = TypeAdapter(List[VisitBeaconItem])
+
+
+async def read_limited(request: Request, max_bytes: int) -> bytes:
+    """Request body, refused with 413 as soon as it is known to exceed max_bytes"""
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise HTTPException(status_code=413, detail="Beacon too large")
+
+    # Content-Length may be missing (chunked) or wrong; count what actually arrives
+    chunks, total = [], 0
+    async for chunk in request.stream():
+        total += len(chunk)
+        if total > max_bytes:
+            raise HTTPException(status_code=413, detail="Beacon too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+@router.post("/beacon", status_code=204)
+async def visit_beacon(request: Request):
+    """
+    Dwell-time beacon (navigator.sendBeacon)
+    - Body: [{visit_id, duration}, ...] or {"visits": [...]}, sent as JSON or text/plain
+    - Only queues the durations in memory; no database access on the request path
+    """
+    body = await read_limited(request, settings.BEACON_MAX_BYTES)
+
+    try:
+        payload = json.loads(body or b"[]")
+        if isinstance(payload, dict):
+            payload = payload.get("visits", [])
+        items = beacon_items.validate_python(payload)
+    except (ValueError, ValidationError):
+        raise HTTPException(status_code=400, detail="Invalid beacon payload")
+
+    if len(items) > settings.BEACON_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail="Too many visits in one beacon")
+
+    for item in items:
+        visit_log_writer.record_duration(item.visit_id, item.duration)
+
+    return Response(status_code=204)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 
 class BookmarkResponse(BaseModel):
     id: str
@@ -7,7 +7,17 @@ class BookmarkResponse(BaseModel):
     passage_id: str
     passage_name: Optional[str] = None
     story_id: Optional[str] = None
+    story_name: Optional[str] = None
     created_at: str
 
     class Config:
         from_attributes = True
+
+class BookmarkSyncRequest(BaseModel):
+    passage_ids: List[str]
+
+class BookmarkSyncResponse(BaseModel):
+    added: int
+    removed: int
+    ignored: List[str] = []  # passage ids that do not exist
+    bookmarks: List[BookmarkResponse]
@@ -17,6 +17,7 @@ class FeedbackResponse(BaseModel):
     parent_id: Optional[str]
     created_at: str
     updated_at: str
+    reply_count: int = 0
     replies: List["FeedbackResponse"] = []
 
     class Config:
@@ -41,5 +42,13 @@ class FeedbackWithPassageInfo(BaseModel):
     class Config:
         from_attributes = True
 
+class FeedbackPage(BaseModel):
+    items: List[FeedbackResponse]
+    next_cursor: Optional[str] = None
+
+class FeedbackAdminPage(BaseModel):
+    items: List[FeedbackWithPassageInfo]
+    next_cursor: Optional[str] = None
+
 FeedbackResponse.model_rebuild()
 FeedbackWithPassageInfo.model_rebuild()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
 from enum import Enum
 
 class PassageType(str, Enum):
@@ -121,13 +121,43 @@ class StoryWithPassages(StoryResponse):
     passages: List[PassageResponse] = []
     links: List[LinkResponse] = []
 
+class StoryBundle(StoryWithPassages):
+    passage_ids_by_name: Dict[str, str] = {}
+    passage_ids_by_number: Dict[int, str] = {}
+
+class StoryBundleManifest(BaseModel):
+    story_id: str
+    version: str
+    url: str
+    size_bytes: int
+
 # ===== Navigation Context =====
+class RenderedContent(BaseModel):
+    content_hash: str
+    html: str
+    is_static: bool  # True when no macros/variables are left for the browser to evaluate
+
 class PassageWithContext(BaseModel):
     passage: PassageResponse
     available_links: List[LinkResponse]
     previous_passage_id: Optional[str]
     is_end: bool
+    rendered: Optional[RenderedContent] = None  # Server-compiled content (opt-in via ?render=true)
+    prefetched: List["PassageWithContext"] = []  # Next-hop contexts (opt-in via ?prefetch=N)
+    visit_id: Optional[str] = None  # Logged visit, for dwell-time beacons
 
 class NavigationRequest(BaseModel):
     link_id: str
     previous_passage_id: Optional[str] = None
+
+PassageWithContext.model_rebuild()
+
+# ===== Reading progress =====
+class ReadingProgressResponse(BaseModel):
+    story_id: str
+    last_passage_id: Optional[str] = None
+    visited_passage_numbers: List[int] = []
+    visited_count: int = 0  # visited passages that still exist
+    total_passages: int = 0
+    percent_explored: float = 0
+    updated_at: Optional[str] = None
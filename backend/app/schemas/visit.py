@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+from app.config import get_settings
+
+settings = get_settings()
+
+class VisitBeaconItem(BaseModel):
+    visit_id: str = Field(..., max_length=36)
+    # seconds spent on the passage; Infinity/NaN would poison the dwell sums
+    duration: float = Field(..., ge=0, le=settings.DWELL_MAX_SECONDS, allow_inf_nan=False)
@@ -0,0 +1,139 @@
+"""Streaming CSV / NDJSON exports
+- Rows are read through a server-side cursor (yield_per) in their own read session,
+  so the request's session can close while the body is still streaming
+- Each partition of rows is encoded and sent before the next one is fetched,
+  keeping memory flat regardless of the export size
+- Synchronous sources (archive files) are read on a worker thread, see batched()
+"""
+
+from typing import AsyncIterator, Iterable, List, Optional, Sequence
+from datetime import datetime, timedelta
+from itertools import islice
+import asyncio
+import csv
+import io
+import json
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from app.database import async_read_session_maker
+from app.config import get_settings
+
+settings = get_settings()
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+EXPORT_FORMAT_PATTERN = f"^({FORMAT_CSV}|{FORMAT_NDJSON})$"
+
+MEDIA_TYPES = {
+    FORMAT_CSV: "text/csv; charset=utf-8",
+    FORMAT_NDJSON: "application/x-ndjson",
+}
+
+
+def parse_time_range(start: Optional[str] = None, end: Optional[str] = None):
+    """
+    ISO date/datetime filters -> (start, end) bounds for created_at comparisons
+    - start is inclusive; end is exclusive, except that a plain date includes that whole day
+    """
+    try:
+        if start:
+            datetime.fromisoformat(start)
+        if end:
+            end_value = datetime.fromisoformat(end)
+            if "T" not in end:
+                end = (end_value + timedelta(days=1)).date().isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start/end must be ISO dates or datetimes")
+    return start, end
+
+
+async def stream_statement(statement, yield_per: Optional[int] = None) -> AsyncIterator[List[dict]]:
+    """Yield partitions of row mappings from a server-side cursor"""
+    yield_per = yield_per or settings.EXPORT_YIELD_PER
+    async with async_read_session_maker() as db:
+        result = await db.stream(statement.execution_options(yield_per=yield_per))
+        async for partition in result.partitions():
+            yield [row._mapping for row in partition]
+
+
+async def batched(rows: Iterable[dict], size: Optional[int] = None) -> AsyncIterator[List[dict]]:
+    """
+    Group a synchronous row iterator into partitions (e.g. archived visit logs)
+    - Each partition is pulled on a worker thread, so reading and decompressing
+      archive members never blocks the event loop
+    """
+    size = size or settings.EXPORT_YIELD_PER
+    rows = iter(rows)
+    try:
+        while True:
+            batch = await asyncio.to_thread(list, islice(rows, size))
+            if not batch:
+                break
+            yield batch
+    finally:
+        # A disconnected client would leave the archive open until garbage collection;
+        # if a pull was cancelled mid-flight the generator is still running and closes itself later
+        close = getattr(rows, "close", None)
+        if close is not None:
+            try:
+                close()
+            except ValueError:
+                pass
+
+
+async def chain(*sources: AsyncIterator[List[dict]]) -> AsyncIterator[List[dict]]:
+    for source in sources:
+        async for batch in source:
+            yield batch
+
+
+async def encode_csv(
+    columns: Sequence[str],
+    batches: AsyncIterator[List[dict]],
+    bom: bool = True
+) -> AsyncIterator[str]:
+    """CSV with a header row (UTF-8 BOM for Excel compatibility); None becomes ''"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if bom:
+        buffer.write('\ufeff')
+    writer.writerow(columns)
+
+    async for batch in batches:
+        for row in batch:
+            writer.writerow(['' if row[column] is None else row[column] for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def encode_ndjson(columns: Sequence[str], batches: AsyncIterator[List[dict]]) -> AsyncIterator[str]:
+    """One JSON object per line"""
+    async for batch in batches:
+        yield "".join(
+            json.dumps({column: row[column] for column in columns}, ensure_ascii=False) + "\n"
+            for row in batch
+        )
+
+
+def export_response(
+    export_format: str,
+    columns: Sequence[str],
+    batches: AsyncIterator[List[dict]],
+    filename: str
+) -> StreamingResponse:
+    if export_format == FORMAT_NDJSON:
+        body = encode_ndjson(columns, batches)
+    else:
+        body = encode_csv(columns, batches)
+
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}.{export_format}"
+        }
+    )
@@ -0,0 +1,161 @@
+from typing import AsyncIterator, Dict, Iterable, Set
+import asyncio
+import json
+from app.config import get_settings
+
+settings = get_settings()
+
+# Topic names
+ALL_FEEDBACK = "all"
+
+
+def passage_topic(passage_id: str) -> str:
+    return f"passage:{passage_id}"
+
+
+def story_topic(story_id: str) -> str:
+    return f"story:{story_id}"
+
+
+# Queue markers
+RESYNC = object()   # events were dropped; the client should refetch
+CLOSED = object()   # the hub is shutting down
+
+
+class FeedbackHubFull(Exception):
+    """max_subscribers streams are already open"""
+
+
+class Subscription:
+    """One SSE connection: its topics and a bounded event queue"""
+
+    __slots__ = ("topics", "queue", "overflows")
+
+    def __init__(self, topics: Set[str], queue_size: int):
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflows = 0
+
+
+class FeedbackHub:
+    """
+    In-process publish/subscribe for live feedback (one hub per worker process)
+    - publish() never blocks or awaits: each subscriber has a bounded queue, and a subscriber
+      that falls behind has its backlog replaced by a single resync marker (the client refetches)
+    - An idle subscriber costs one queue and one suspended task, no polling
+    - Streams send a comment heartbeat when idle so proxies keep the connection open
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 64,
+        heartbeat_seconds: float = 15,
+        retry_ms: int = 3000,
+        max_subscribers: int = 10000
+    ):
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self.retry_ms = retry_ms
+        self.max_subscribers = max_subscribers
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._subscriptions: Set[Subscription] = set()
+        self._event_id = 0
+        self.stats = {
+            "published": 0,
+            "delivered": 0,
+            "overflows": 0,
+            "rejected": 0,
+        }
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "subscribers": len(self._subscriptions), "topics": len(self._topics)}
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        """Check the cap and register in one step; raises FeedbackHubFull"""
+        if len(self._subscriptions) >= self.max_subscribers:
+            self.stats["rejected"] += 1
+            raise FeedbackHubFull()
+        subscription = Subscription(set(topics), self.queue_size)
+        self._subscriptions.add(subscription)
+        for topic in subscription.topics:
+            self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscriptions.discard(subscription)
+        for topic in subscription.topics:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[topic]
+
+    def publish(self, topics: Iterable[str], event: dict) -> int:
+        """Queue an event for every subscriber of any of the topics; returns the number reached"""
+        subscribers: Set[Subscription] = set()
+        for topic in topics:
+            subscribers.update(self._topics.get(topic, ()))
+
+        self._event_id += 1
+        message = (self._event_id, event)
+        self.stats["published"] += 1
+
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._overflow(subscription)
+        self.stats["delivered"] += len(subscribers)
+        return len(subscribers)
+
+    def _overflow(self, subscription: Subscription):
+        """Slow consumer: drop its backlog and tell it to refetch"""
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(RESYNC)
+        subscription.overflows += 1
+        self.stats["overflows"] += 1
+
+    def close(self):
+        """
+        End every open stream; called on the server's exit signal, since the server waits
+        for open responses before it runs the lifespan shutdown
+        """
+        for subscription in list(self._subscriptions):
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+            subscription.queue.put_nowait(CLOSED)
+
+    async def stream(self, subscription: Subscription) -> AsyncIterator[str]:
+        """
+        SSE body of a subscription; unsubscribes when the client goes away (the server
+        cancels the generator on disconnect) or the hub closes
+        """
+        try:
+            yield f"retry: {self.retry_ms}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+
+                if message is CLOSED:
+                    return
+                if message is RESYNC:
+                    yield "event: resync\ndata: {}\n\n"
+                    continue
+
+                event_id, event = message
+                data = json.dumps(event, ensure_ascii=False)
+                yield f"id: {event_id}\nevent: feedback\ndata: {data}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+
+feedback_hub = FeedbackHub(
+    queue_size=settings.FEEDBACK_SSE_QUEUE_SIZE,
+    heartbeat_seconds=settings.FEEDBACK_SSE_HEARTBEAT_SECONDS,
+    retry_ms=settings.FEEDBACK_SSE_RETRY_MS,
+    max_subscribers=settings.FEEDBACK_SSE_MAX_SUBSCRIBERS
+)
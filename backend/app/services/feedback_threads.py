@@ -0,0 +1,154 @@
+"""Feedback thread loading
+- Listings are keyset-paginated on (created_at, id), newest first; replies are not expanded,
+  each item carries its direct reply_count
+- A whole subtree is loaded with one recursive CTE plus one IN query for the author names,
+  and assembled in memory in O(n); replies are ordered oldest first
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import base64
+import binascii
+import json
+from sqlalchemy import select, func, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.feedback import Feedback
+from app.models.user import User
+from app.schemas.feedback import FeedbackResponse
+
+
+def feedback_response(feedback: Feedback, user_name: Optional[str] = None) -> FeedbackResponse:
+    """Single node without replies; the author is hidden for anonymous feedback"""
+    anonymous = bool(feedback.is_anonymous)
+    return FeedbackResponse(
+        id=feedback.id,
+        user_id=None if anonymous else feedback.user_id,
+        user_name=None if anonymous else user_name,
+        passage_id=feedback.passage_id,
+        content=feedback.content,
+        is_anonymous=anonymous,
+        parent_id=feedback.parent_id,
+        created_at=feedback.created_at,
+        updated_at=feedback.updated_at,
+        replies=[]
+    )
+
+
+async def user_names(db: AsyncSession, feedbacks: Iterable[Feedback]) -> Dict[str, str]:
+    """Author names of non-anonymous feedback, one IN query"""
+    user_ids = {f.user_id for f in feedbacks if f.user_id and not f.is_anonymous}
+    if not user_ids:
+        return {}
+    result = await db.execute(select(User.id, User.name).where(User.id.in_(user_ids)))
+    return dict(result.all())
+
+
+# ----- Keyset pages -----
+
+def encode_cursor(feedback: Feedback) -> str:
+    raw = json.dumps([feedback.created_at, feedback.id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Raises ValueError on a malformed cursor"""
+    try:
+        created_at, feedback_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, UnicodeError, TypeError, json.JSONDecodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(created_at, str) or not isinstance(feedback_id, str):
+        raise ValueError("Invalid cursor")
+    return created_at, feedback_id
+
+
+def page_statement(limit: int, cursor: Optional[str] = None, *criteria):
+    """
+    One page of top-level feedback, newest first; fetches limit + 1 rows to detect a next page
+    Raises ValueError on a malformed cursor
+    """
+    query = select(Feedback).where(Feedback.parent_id == None, *criteria)
+    if cursor:
+        query = query.where(tuple_(Feedback.created_at, Feedback.id) < tuple_(*decode_cursor(cursor)))
+    return query.order_by(Feedback.created_at.desc(), Feedback.id.desc()).limit(limit + 1)
+
+
+def split_page(rows: List[Feedback], limit: int) -> Tuple[List[Feedback], Optional[str]]:
+    """Drop the look-ahead row; the next cursor points at the last row of the page"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def reply_count_statement(feedback_ids: List[str]):
+    return (
+        select(Feedback.parent_id, func.count(Feedback.id))
+        .where(Feedback.parent_id.in_(feedback_ids))
+        .group_by(Feedback.parent_id)
+    )
+
+
+async def reply_counts(db: AsyncSession, feedback_ids: List[str]) -> Dict[str, int]:
+    """Direct reply count per feedback, one grouped query"""
+    if not feedback_ids:
+        return {}
+    result = await db.execute(reply_count_statement(feedback_ids))
+    return dict(result.all())
+
+
+# ----- Threads -----
+
+def thread_statement(*anchor_criteria):
+    """Feedback matching anchor_criteria plus all their descendants, with the depth below the anchor"""
+    thread = select(
+        Feedback.id, literal(0).label("depth")
+    ).where(*anchor_criteria).cte("thread", recursive=True)
+
+    thread = thread.union_all(
+        select(Feedback.id, thread.c.depth + 1).join(thread, Feedback.parent_id == thread.c.id)
+    )
+
+    return select(Feedback, thread.c.depth).join(
+        thread, Feedback.id == thread.c.id
+    ).order_by(Feedback.created_at, Feedback.id)
+
+
+async def load_threads(db: AsyncSession, *anchor_criteria) -> List[FeedbackResponse]:
+    """Anchors (oldest first) with their full reply trees"""
+    result = await db.execute(thread_statement(*anchor_criteria))
+    rows = result.all()
+
+    names = await user_names(db, (f for f, _ in rows))
+
+    nodes = {f.id: feedback_response(f, names.get(f.user_id)) for f, _ in rows}
+    anchors = []
+    for feedback, depth in rows:
+        node = nodes[feedback.id]
+        if depth == 0:
+            anchors.append(node)
+        else:
+            nodes[feedback.parent_id].replies.append(node)
+
+    for node in nodes.values():
+        node.reply_count = len(node.replies)
+    return anchors
+
+
+async def page_items(
+    db: AsyncSession,
+    feedbacks: List[Feedback],
+    expand_replies: bool = False
+) -> List[FeedbackResponse]:
+    """Responses for one page of top-level feedback: reply counts only, or the full trees"""
+    if expand_replies:
+        threads = await load_threads(db, Feedback.id.in_([f.id for f in feedbacks]))
+        by_id = {node.id: node for node in threads}
+        return [by_id[f.id] for f in feedbacks]
+
+    names = await user_names(db, feedbacks)
+    counts = await reply_counts(db, [f.id for f in feedbacks])
+    items = []
+    for f in feedbacks:
+        item = feedback_response(f, names.get(f.user_id))
+        item.reply_count = counts.get(f.id, 0)
+        items.append(item)
+    return items
@@ -0,0 +1,260 @@
+"""Per-user reading sessions (resume point and explored passages)
+- One row per (user, story): last passage, a bitset with bit n set once passage_number n was
+  read, and the popcount of that bitset
+- Reads only update an in-memory entry per (user, story); repeated clicks coalesce and the
+  store flushes them as one upsert batch every flush_interval_seconds (or sooner when
+  max_pending sessions are waiting), so the database is not written on every click;
+  each write transaction covers at most batch_size sessions
+- Lookups merge the stored row with entries not yet flushed, so a reader always sees
+  their latest position in this process
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+import asyncio
+import logging
+from sqlalchemy import select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import async_session_maker, existing_ids
+from app.models.reading_session import ReadingSession
+from app.models.passage import Passage, MAX_PASSAGE_NUMBER
+from app.models.story import Story
+from app.models.user import User
+from app.schemas.story import PassageResponse
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+SessionKey = Tuple[str, str]  # (user_id, story_id)
+
+
+def encode_bitset(bits: int) -> bytes:
+    """Little-endian bytes: passage_number n is bit n % 8 of byte n // 8"""
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def decode_bitset(blob: Optional[bytes]) -> int:
+    return int.from_bytes(blob or b"", "little")
+
+
+def session_statement(user_id: str, story_id: str):
+    return (
+        select(ReadingSession.last_passage_id, ReadingSession.visited, ReadingSession.updated_at)
+        .where(ReadingSession.user_id == user_id, ReadingSession.story_id == story_id)
+    )
+
+
+def stored_visits_statement(keys: Iterable[SessionKey]):
+    """Stored visited bitsets of the given sessions (plus any other user x story combinations)"""
+    keys = list(keys)
+    return select(ReadingSession.user_id, ReadingSession.story_id, ReadingSession.visited).where(
+        ReadingSession.user_id.in_({user_id for user_id, _ in keys}),
+        ReadingSession.story_id.in_({story_id for _, story_id in keys})
+    )
+
+
+@dataclass
+class SessionState:
+    last_passage_id: Optional[str]
+    visited: int
+    updated_at: Optional[str]
+
+    def merge(self, newer: "SessionState") -> "SessionState":
+        """Union of the visited sets; the newer entry's position wins"""
+        return SessionState(
+            last_passage_id=newer.last_passage_id or self.last_passage_id,
+            visited=self.visited | newer.visited,
+            updated_at=newer.updated_at or self.updated_at
+        )
+
+
+class ReadingSessionStore:
+    """
+    Write-coalescing store for reading sessions
+    - record() is synchronous and never touches the database
+    - stop() flushes whatever is still pending (called from the app lifespan)
+    """
+
+    def __init__(self, flush_interval_seconds: float = 5, max_pending: int = 5000, batch_size: int = 500):
+        self.flush_interval = flush_interval_seconds
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self._pending: Dict[SessionKey, SessionState] = {}
+        self._flushing: Dict[SessionKey, SessionState] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.stats = {
+            "recorded": 0,
+            "coalesced": 0,
+            "written": 0,
+            "failed": 0,
+            "orphaned": 0,
+            "flushes": 0,
+        }
+
+    def record(self, user_id: str, passage: PassageResponse):
+        """Note that a signed-in reader was shown a passage"""
+        if not passage.story_id:
+            return
+        passage_number = passage.passage_number
+        # Out-of-range numbers would make the bitset huge; such passages only move the position
+        tracked = passage_number is not None and 0 <= passage_number <= MAX_PASSAGE_NUMBER
+        visited = 1 << passage_number if tracked else 0
+        passage_id = passage.id
+        now = datetime.utcnow().isoformat()
+        key = (user_id, passage.story_id)
+
+        state = self._pending.get(key)
+        if state is None:
+            self._pending[key] = SessionState(passage_id, visited, now)
+        else:
+            state.last_passage_id = passage_id
+            state.visited |= visited
+            state.updated_at = now
+            self.stats["coalesced"] += 1
+        self.stats["recorded"] += 1
+
+        if len(self._pending) >= self.max_pending:
+            self._wake.set()
+
+    async def get(self, db: AsyncSession, user_id: str, story_id: str) -> Optional[SessionState]:
+        """The reader's session in a story: stored row merged with entries not yet written"""
+        result = await db.execute(session_statement(user_id, story_id))
+        row = result.one_or_none()
+        state = SessionState(row.last_passage_id, decode_bitset(row.visited), row.updated_at) if row else None
+
+        key = (user_id, story_id)
+        for unwritten in (self._flushing.get(key), self._pending.get(key)):
+            if unwritten is not None:
+                state = state.merge(unwritten) if state else SessionState(
+                    unwritten.last_passage_id, unwritten.visited, unwritten.updated_at
+                )
+        return state
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            "pending": len(self._pending),
+            "running": int(self._task is not None and not self._task.done()),
+        }
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still pending"""
+        self._stopping = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        self._flushing, self._pending = self._pending, {}
+        keys = list(self._flushing)
+        try:
+            # One short transaction per chunk so requests never wait behind a large flush
+            for start in range(0, len(keys), self.batch_size):
+                chunk = {key: self._flushing[key] for key in keys[start:start + self.batch_size]}
+                try:
+                    async with async_session_maker() as db:
+                        written = await self.write_batch(db, chunk)
+                        await db.commit()
+                    self.stats["written"] += written
+                    self.stats["flushes"] += 1
+                except Exception:
+                    self.stats["failed"] += len(chunk)
+                    logger.exception("Failed to write %d reading sessions", len(chunk))
+        finally:
+            self._flushing = {}
+
+    async def drop_orphans(
+        self,
+        db: AsyncSession,
+        sessions: Dict[SessionKey, SessionState]
+    ) -> Dict[SessionKey, SessionState]:
+        """
+        Drop sessions whose user or story was deleted while pending and forget deleted
+        last passages; with foreign keys on, one such row would fail the whole batch
+        """
+        users = await existing_ids(db, User, {user_id for user_id, _ in sessions})
+        stories = await existing_ids(db, Story, {story_id for _, story_id in sessions})
+        passages = await existing_ids(
+            db, Passage, {state.last_passage_id for state in sessions.values() if state.last_passage_id}
+        )
+
+        kept = {}
+        for (user_id, story_id), state in sessions.items():
+            if user_id not in users or story_id not in stories:
+                continue
+            if state.last_passage_id not in passages:
+                state = SessionState(None, state.visited, state.updated_at)
+            kept[(user_id, story_id)] = state
+
+        self.stats["orphaned"] += len(sessions) - len(kept)
+        return kept
+
+    async def write_batch(self, db: AsyncSession, sessions: Dict[SessionKey, SessionState]) -> int:
+        """
+        Merge pending sessions into their stored rows: one SELECT and one upsert per batch
+        Returns the number of sessions written
+        """
+        sessions = await self.drop_orphans(db, sessions)
+        if not sessions:
+            return 0
+
+        result = await db.execute(stored_visits_statement(sessions))
+        existing = {(user_id, story_id): blob for user_id, story_id, blob in result.all()}
+
+        rows = []
+        for (user_id, story_id), state in sessions.items():
+            visited = state.visited | decode_bitset(existing.get((user_id, story_id)))
+            rows.append({
+                "user_id": user_id,
+                "story_id": story_id,
+                "last_passage_id": state.last_passage_id,
+                "visited": encode_bitset(visited),
+                "visited_count": visited.bit_count(),
+                "updated_at": state.updated_at,
+            })
+
+        stmt = sqlite_insert(ReadingSession)
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["user_id", "story_id"],
+                set_={
+                    # A last passage deleted while pending keeps the stored position
+                    "last_passage_id": func.coalesce(stmt.excluded.last_passage_id, ReadingSession.last_passage_id),
+                    "visited": stmt.excluded.visited,
+                    "visited_count": stmt.excluded.visited_count,
+                    "updated_at": stmt.excluded.updated_at,
+                }
+            ),
+            rows
+        )
+        return len(rows)
+
+
+reading_session_store = ReadingSessionStore(
+    flush_interval_seconds=settings.READING_SESSION_FLUSH_SECONDS,
+    max_pending=settings.READING_SESSION_MAX_PENDING,
+    batch_size=settings.READING_SESSION_FLUSH_BATCH_SIZE
+)
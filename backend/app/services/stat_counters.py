@@ -0,0 +1,61 @@
+"""Admin overview counters
+- stat_counters is maintained by triggers (see models/analytics.counter_trigger_statements)
+- reconcile_counters() recounts every table on the read pool and corrects drifted values
+"""
+
+from typing import Dict
+import asyncio
+import logging
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import async_session_maker, async_read_session_maker
+from app.models.analytics import StatCounter, COUNTED_TABLES
+
+logger = logging.getLogger(__name__)
+
+
+async def read_counters(db: AsyncSession) -> Dict[str, int]:
+    result = await db.execute(select(StatCounter.name, StatCounter.value))
+    counters = dict(result.all())
+    return {name: counters.get(name, 0) for name in COUNTED_TABLES}
+
+
+async def reconcile_counters() -> Dict[str, dict]:
+    """
+    Recount every counted table and correct its counter
+    The COUNT(*) runs on the read pool, in one statement with the counter so both come
+    from the same snapshot; the writer only applies the drift (counter - count) in one
+    short upsert. Rows committed since the snapshot moved the counter through the
+    triggers and stay counted. Returns {name: {"value", "drift"}} as of the snapshot.
+    """
+    report = {}
+    for name, table in COUNTED_TABLES.items():
+        async with async_read_session_maker() as db:
+            result = await db.execute(text(
+                f"SELECT (SELECT value FROM stat_counters WHERE name = :name), COUNT(*) FROM {table}"
+            ), {"name": name})
+            counter, count = result.one()
+
+        drift = (counter or 0) - count
+        if counter is None or drift:
+            async with async_session_maker() as db:
+                await db.execute(text(
+                    "INSERT INTO stat_counters (name, value) VALUES (:name, :count) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value - :drift"
+                ), {"name": name, "count": count, "drift": drift})
+                await db.commit()
+
+        report[name] = {"value": count, "drift": drift}
+        if drift:
+            logger.warning("Counter %s drifted by %d", name, drift)
+    return report
+
+
+async def run_reconciler(interval_hours: float):
+    """Periodic drift correction (started from the app lifespan); the first run seeds the counters"""
+    while True:
+        try:
+            await reconcile_counters()
+        except Exception:
+            logger.exception("Counter reconcile failed")
+        await asyncio.sleep(interval_hours * 3600)
@@ -0,0 +1,81 @@
+from typing import Optional
+from dataclasses import dataclass
+import gzip
+import hashlib
+from app.schemas.story import StoryBundle
+from app.services.story_cache import CompiledStory
+
+BUNDLE_ARTIFACT_KEY = "bundle"
+
+
+@dataclass
+class StoryBundleArtifact:
+    """Serialized, gzip-compressed Story bundle addressed by its content hash"""
+    version: str
+    body: bytes
+    gzip_body: bytes
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """
+    Whether an Accept-Encoding header allows gzip: an explicit gzip / x-gzip entry wins
+    over "*", and q=0 means "not acceptable"
+    """
+    qualities = {}
+    for entry in (accept_encoding or "").split(","):
+        coding, _, params = entry.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+def build_story_bundle(compiled: CompiledStory) -> StoryBundle:
+    passages = sorted(
+        compiled.passages.values(),
+        key=lambda p: (p.passage_number is None, p.passage_number or 0, p.id)
+    )
+    links = sorted(
+        compiled.links.values(),
+        key=lambda l: (l.source_passage_id, l.link_order, l.id)
+    )
+
+    return StoryBundle(
+        **compiled.story.model_dump(exclude={"start_passage_id"}),
+        start_passage_id=compiled.start_passage_id,
+        passages=passages,
+        links=links,
+        passage_ids_by_name=compiled.passage_ids_by_name,
+        passage_ids_by_number=compiled.passage_ids_by_number
+    )
+
+
+def get_story_bundle(compiled: CompiledStory) -> StoryBundleArtifact:
+    """
+    Get the bundle artifact of a compiled Story
+    - Built once per compiled graph and dropped when the Story is invalidated
+    - version is a hash of the serialized content, so equal content gives equal URLs
+    """
+    artifact = compiled.artifacts.get(BUNDLE_ARTIFACT_KEY)
+    if artifact is None:
+        body = build_story_bundle(compiled).model_dump_json().encode("utf-8")
+        artifact = StoryBundleArtifact(
+            version=hashlib.sha256(body).hexdigest()[:16],
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=9, mtime=0)
+        )
+        compiled.artifacts[BUNDLE_ARTIFACT_KEY] = artifact
+    return artifact
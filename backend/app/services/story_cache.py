@@ -0,0 +1,290 @@
+from typing import Optional, List, Dict, Any, Tuple
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+import asyncio
+import json
+import time
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.story import Story
+from app.models.passage import Passage, MAX_PASSAGE_NUMBER
+from app.models.link import Link
+from app.schemas.story import StoryResponse, PassageResponse, LinkResponse
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def story_to_response(story: Story) -> StoryResponse:
+    return StoryResponse(
+        id=story.id,
+        name=story.name,
+        description=story.description,
+        start_passage_id=story.start_passage_id,
+        is_active=bool(story.is_active),
+        zoom=story.zoom,
+        tags=json.loads(story.tags) if story.tags else [],
+        sort_order=story.sort_order,
+        icon=story.icon or "book-open",
+        created_by=story.created_by,
+        created_at=story.created_at,
+        updated_at=story.updated_at
+    )
+
+
+def passage_to_response(passage: Passage) -> PassageResponse:
+    return PassageResponse(
+        id=passage.id,
+        story_id=passage.story_id,
+        passage_number=passage.passage_number,
+        name=passage.name,
+        content=passage.content or "",
+        passage_type=passage.passage_type,
+        tags=json.loads(passage.tags) if passage.tags else [],
+        position_x=passage.position_x,
+        position_y=passage.position_y,
+        width=passage.width,
+        height=passage.height,
+        created_at=passage.created_at,
+        updated_at=passage.updated_at
+    )
+
+
+def link_to_response(link: Link) -> LinkResponse:
+    return LinkResponse(
+        id=link.id,
+        story_id=link.story_id,
+        source_passage_id=link.source_passage_id,
+        target_passage_id=link.target_passage_id,
+        name=link.name,
+        condition_type=link.condition_type,
+        condition_value=link.condition_value,
+        link_order=link.link_order
+    )
+
+
+@dataclass
+class CompiledStory:
+    """
+    Read-only snapshot of a Story graph
+    - Passages keyed by id
+    - Outgoing links per Passage, sorted by link_order
+    - Start Passage already resolved
+    - Name / passage_number lookup tables for reference resolution
+    """
+    story: StoryResponse
+    start_passage_id: Optional[str]
+    passages: Dict[str, PassageResponse] = field(default_factory=dict)
+    links: Dict[str, LinkResponse] = field(default_factory=dict)
+    links_by_source: Dict[str, List[LinkResponse]] = field(default_factory=dict)
+    passage_ids_by_name: Dict[str, str] = field(default_factory=dict)
+    passage_ids_by_number: Dict[int, str] = field(default_factory=dict)
+    # Bit n set for every existing passage_number n up to MAX_PASSAGE_NUMBER (denominator of reading progress)
+    passage_mask: int = 0
+    # Derived artifacts (e.g. the story bundle), dropped together with the graph
+    artifacts: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def story_id(self) -> str:
+        return self.story.id
+
+    def get_passage(self, passage_id: str) -> Optional[PassageResponse]:
+        return self.passages.get(passage_id)
+
+    def get_links(self, passage_id: str) -> List[LinkResponse]:
+        return self.links_by_source.get(passage_id, [])
+
+    def get_passage_by_name(self, name: str) -> Optional[PassageResponse]:
+        passage_id = self.passage_ids_by_name.get(name)
+        return self.passages.get(passage_id) if passage_id else None
+
+    def get_passage_by_number(self, passage_number: int) -> Optional[PassageResponse]:
+        passage_id = self.passage_ids_by_number.get(passage_number)
+        return self.passages.get(passage_id) if passage_id else None
+
+
+def compile_story(story: Story, passages: List[Passage], links: List[Link]) -> CompiledStory:
+    """Build a CompiledStory from ORM rows"""
+    compiled = CompiledStory(story=story_to_response(story), start_passage_id=None)
+
+    # Lowest passage_number wins when names are duplicated
+    for p in sorted(passages, key=lambda p: (p.passage_number is None, p.passage_number or 0)):
+        compiled.passages[p.id] = passage_to_response(p)
+        compiled.passage_ids_by_name.setdefault(p.name, p.id)
+        if p.passage_number is not None:
+            compiled.passage_ids_by_number[p.passage_number] = p.id
+            if 0 <= p.passage_number <= MAX_PASSAGE_NUMBER:
+                compiled.passage_mask |= 1 << p.passage_number
+
+    for l in sorted(links, key=lambda l: l.link_order or 0):
+        link = link_to_response(l)
+        compiled.links[link.id] = link
+        compiled.links_by_source.setdefault(link.source_passage_id, []).append(link)
+
+    if story.start_passage_id:
+        if story.start_passage_id in compiled.passages:
+            compiled.start_passage_id = story.start_passage_id
+    else:
+        for p in compiled.passages.values():
+            if p.passage_type == "start":
+                compiled.start_passage_id = p.id
+                break
+
+    return compiled
+
+
+def story_graph_statement(story_key):
+    """Story, its Passages and their outgoing Links as one joined SELECT"""
+    return (
+        select(Story, Passage, Link)
+        .outerjoin(Passage, Passage.story_id == Story.id)
+        .outerjoin(Link, Link.source_passage_id == Passage.id)
+        .where(Story.id == story_key)
+        .order_by(Link.link_order)
+    )
+
+
+def passage_story_subquery(passage_id: str):
+    return select(Passage.story_id).where(Passage.id == passage_id).scalar_subquery()
+
+
+class KeyedLocks:
+    """One asyncio.Lock per key, forgotten as soon as no request holds or waits on it"""
+
+    def __init__(self):
+        self._locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: str):
+        lock, users = self._locks.get(key, (None, 0))
+        lock = lock or asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[key]
+            if users > 1:
+                self._locks[key] = (lock, users - 1)
+            else:
+                del self._locks[key]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+class StoryGraphCache:
+    """
+    Process-local TTL + LRU cache of compiled Story graphs
+    - Reader requests are served from memory once a Story is compiled
+    - Admin write endpoints must call invalidate() after commit; other worker
+      processes pick the edit up when their entry expires (ttl_seconds)
+    - Each worker process holds its own copy
+    """
+
+    def __init__(self, max_stories: int = 64, ttl_seconds: float = 60):
+        self.max_stories = max_stories
+        self.ttl_seconds = ttl_seconds
+        self._stories: "OrderedDict[str, Tuple[float, CompiledStory]]" = OrderedDict()
+        self._passage_story: Dict[str, str] = {}
+        self._generation = 0
+        self._locks = KeyedLocks()
+
+    def get_cached(self, story_id: str) -> Optional[CompiledStory]:
+        entry = self._stories.get(story_id)
+        if entry is None:
+            return None
+        expires_at, compiled = entry
+        if expires_at <= time.monotonic():
+            self._drop(story_id)
+            return None
+        self._stories.move_to_end(story_id)
+        return compiled
+
+    async def get(self, db: AsyncSession, story_id: str) -> Optional[CompiledStory]:
+        """Return the compiled Story, loading it from the database on a miss"""
+        compiled = self.get_cached(story_id)
+        if compiled is not None:
+            return compiled
+
+        async with self._locks.hold(story_id):
+            # Another request may have compiled it while we waited
+            compiled = self.get_cached(story_id)
+            if compiled is not None:
+                return compiled
+            return await self._load(db, story_id)
+
+    async def get_for_passage(self, db: AsyncSession, passage_id: str) -> Optional[CompiledStory]:
+        """Return the compiled Story that owns a Passage"""
+        story_id = self._passage_story.get(passage_id)
+        if story_id:
+            return await self.get(db, story_id)
+
+        compiled = await self._load(db, passage_story_subquery(passage_id))
+        if compiled is None or passage_id not in compiled.passages:
+            return None
+        return compiled
+
+    async def _load(self, db: AsyncSession, story_key) -> Optional[CompiledStory]:
+        """
+        Load Story, Passages and outgoing Links in one joined statement
+        story_key is a story id or a scalar subquery resolving to one
+        """
+        generation = self._generation
+        result = await db.execute(story_graph_statement(story_key))
+        rows = result.all()
+        if not rows:
+            return None
+
+        story = rows[0][0]
+        passages = {}
+        links = {}
+        for _, passage, link in rows:
+            if passage is not None:
+                passages[passage.id] = passage
+            if link is not None:
+                links[link.id] = link
+
+        compiled = compile_story(story, list(passages.values()), list(links.values()))
+
+        # Don't store a snapshot that was invalidated while loading
+        if self._generation == generation:
+            self._store(compiled)
+        return compiled
+
+    def _store(self, compiled: CompiledStory):
+        self._drop(compiled.story_id)
+        self._stories[compiled.story_id] = (time.monotonic() + self.ttl_seconds, compiled)
+        for passage_id in compiled.passages:
+            self._passage_story[passage_id] = compiled.story_id
+
+        while len(self._stories) > self.max_stories:
+            oldest_id = next(iter(self._stories))
+            self._drop(oldest_id)
+
+    def _drop(self, story_id: str):
+        entry = self._stories.pop(story_id, None)
+        if entry is None:
+            return
+        _, compiled = entry
+        for passage_id in compiled.passages:
+            if self._passage_story.get(passage_id) == story_id:
+                del self._passage_story[passage_id]
+
+    def invalidate(self, story_id: Optional[str]):
+        """Drop a Story after its passages or links changed"""
+        if not story_id:
+            return
+        self._generation += 1
+        self._drop(story_id)
+
+    def clear(self):
+        for story_id in list(self._stories):
+            self.invalidate(story_id)
+
+
+story_graph_cache = StoryGraphCache(
+    max_stories=settings.STORY_CACHE_MAX_STORIES,
+    ttl_seconds=settings.STORY_CACHE_TTL_SECONDS
+)
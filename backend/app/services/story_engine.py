@@ -1,66 +1,62 @@
 from typing import Optional, List
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.story import Story
-from app.models.passage import Passage
-from app.models.link import Link
 from app.schemas.story import LinkConditionType, PassageResponse, LinkResponse, PassageWithContext
-import json
+from app.services.story_cache import CompiledStory, story_graph_cache
+from app.services.twine_compiler import render_passage
+from app.config import get_settings
+
+settings = get_settings()
 
 class StoryEngine:
     """
     Twine-style Story navigation engine
     - Handles conditional branching
     - Dynamic routing based on previous Passage
+    - Reads are served from the compiled Story graph cache
     """
 
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_start_passage(self, story_id: str) -> Optional[Passage]:
-        """Get the starting Passage of a Story"""
-        result = await self.db.execute(
-            select(Story).where(Story.id == story_id)
-        )
-        story = result.scalar_one_or_none()
+    async def get_compiled_story(self, story_id: str) -> Optional[CompiledStory]:
+        """Get the compiled graph of a Story (served from memory when cached)"""
+        return await story_graph_cache.get(self.db, story_id)
 
-        if story and story.start_passage_id:
-            result = await self.db.execute(
-                select(Passage).where(Passage.id == story.start_passage_id)
-            )
-            return result.scalar_one_or_none()
+    async def get_compiled_story_for_passage(self, passage_id: str) -> Optional[CompiledStory]:
+        """Get the compiled graph of the Story that owns a Passage"""
+        return await story_graph_cache.get_for_passage(self.db, passage_id)
 
-        result = await self.db.execute(
-            select(Passage).where(
-                Passage.story_id == story_id,
-                Passage.passage_type == "start"
-            )
-        )
-        return result.scalar_one_or_none()
+    async def get_start_passage(self, story_id: str) -> Optional[PassageResponse]:
+        """Get the starting Passage of a Story"""
+        compiled = await self.get_compiled_story(story_id)
+        if not compiled or not compiled.start_passage_id:
+            return None
+        return compiled.get_passage(compiled.start_passage_id)
 
     async def get_available_links(
         self,
         passage_id: str,
         previous_passage_id: Optional[str] = None
-    ) -> List[Link]:
+    ) -> List[LinkResponse]:
         """Get available links from current Passage (after condition evaluation)"""
-        result = await self.db.execute(
-            select(Link)
-            .where(Link.source_passage_id == passage_id)
-            .order_by(Link.link_order)
-        )
-        all_links = result.scalars().all()
-
-        valid_links = []
-        for link in all_links:
-            if self._evaluate_condition(link, previous_passage_id):
-                valid_links.append(link)
+        compiled = await self.get_compiled_story_for_passage(passage_id)
+        if not compiled:
+            return []
+        return self._filter_links(compiled.get_links(passage_id), previous_passage_id)
 
-        return valid_links
+    def _filter_links(
+        self,
+        links: List[LinkResponse],
+        previous_passage_id: Optional[str]
+    ) -> List[LinkResponse]:
+        return [
+            link for link in links
+            if self._evaluate_condition(link, previous_passage_id)
+        ]
 
     def _evaluate_condition(
         self,
-        link: Link,
+        link: LinkResponse,
         previous_passage_id: Optional[str]
     ) -> bool:
         """Evaluate Link condition"""
@@ -78,19 +74,40 @@ class StoryEngine:
     async def get_passage_with_context(
         self,
         passage_id: str,
-        previous_passage_id: Optional[str] = None
+        previous_passage_id: Optional[str] = None,
+        prefetch_depth: int = 0,
+        render: bool = False
     ) -> Optional[PassageWithContext]:
-        """Get Passage with navigation context"""
-        result = await self.db.execute(
-            select(Passage).where(Passage.id == passage_id)
-        )
-        passage = result.scalar_one_or_none()
+        """Get Passage with navigation context (optionally prefetched and server-rendered)"""
+        compiled = await self.get_compiled_story_for_passage(passage_id)
+        if not compiled:
+            return None
 
+        context = self.build_context(compiled, passage_id, previous_passage_id, render)
+        if context and prefetch_depth > 0:
+            self.attach_prefetch(
+                compiled,
+                context,
+                min(prefetch_depth, settings.PREFETCH_MAX_DEPTH),
+                settings.PREFETCH_MAX_BYTES,
+                render
+            )
+        return context
+
+    def build_context(
+        self,
+        compiled: CompiledStory,
+        passage_id: str,
+        previous_passage_id: Optional[str] = None,
+        render: bool = False
+    ) -> Optional[PassageWithContext]:
+        """Build navigation context from a compiled Story (no database access)"""
+        passage = compiled.get_passage(passage_id)
         if not passage:
             return None
 
-        available_links = await self.get_available_links(
-            passage_id,
+        available_links = self._filter_links(
+            compiled.get_links(passage_id),
             previous_passage_id
         )
 
@@ -99,62 +116,67 @@ class StoryEngine:
             len(available_links) == 0
         )
 
-        # Convert to response models
-        passage_response = PassageResponse(
-            id=passage.id,
-            story_id=passage.story_id,
-            passage_number=passage.passage_number,
-            name=passage.name,
-            content=passage.content or "",
-            passage_type=passage.passage_type,
-            tags=json.loads(passage.tags) if passage.tags else [],
-            position_x=passage.position_x,
-            position_y=passage.position_y,
-            width=passage.width,
-            height=passage.height,
-            created_at=passage.created_at,
-            updated_at=passage.updated_at
-        )
-
-        link_responses = [
-            LinkResponse(
-                id=link.id,
-                story_id=link.story_id,
-                source_passage_id=link.source_passage_id,
-                target_passage_id=link.target_passage_id,
-                name=link.name,
-                condition_type=link.condition_type,
-                condition_value=link.condition_value,
-                link_order=link.link_order
-            )
-            for link in available_links
-        ]
-
         return PassageWithContext(
-            passage=passage_response,
-            available_links=link_responses,
+            passage=passage,
+            available_links=available_links,
             previous_passage_id=previous_passage_id,
-            is_end=is_end
+            is_end=is_end,
+            rendered=render_passage(compiled, passage_id) if render else None
         )
 
+    def attach_prefetch(
+        self,
+        compiled: CompiledStory,
+        context: PassageWithContext,
+        depth: int,
+        max_bytes: int,
+        render: bool = False
+    ):
+        """
+        Embed next-hop contexts into context.prefetched
+        - Breadth first, up to depth hops
+        - Stops once the serialized size would exceed max_bytes
+        """
+        budget = max_bytes
+        seen = set()
+        frontier = [context]
+
+        for _ in range(depth):
+            next_frontier = []
+            for parent in frontier:
+                for link in parent.available_links:
+                    key = (link.target_passage_id, parent.passage.id)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                    child = self.build_context(
+                        compiled, link.target_passage_id, parent.passage.id, render
+                    )
+                    if not child:
+                        continue
+
+                    size = len(child.model_dump_json())
+                    if size > budget:
+                        return
+                    budget -= size
+
+                    parent.prefetched.append(child)
+                    next_frontier.append(child)
+            frontier = next_frontier
+
     async def navigate(
         self,
         current_passage_id: str,
         link_id: str
-    ) -> Optional[Passage]:
+    ) -> Optional[PassageResponse]:
         """Navigate to next Passage via Link"""
-        result = await self.db.execute(
-            select(Link).where(
-                Link.id == link_id,
-                Link.source_passage_id == current_passage_id
-            )
-        )
-        link = result.scalar_one_or_none()
+        compiled = await self.get_compiled_story_for_passage(current_passage_id)
+        if not compiled:
+            return None
 
-        if not link:
+        link = compiled.links.get(link_id)
+        if not link or link.source_passage_id != current_passage_id:
             return None
 
-        result = await self.db.execute(
-            select(Passage).where(Passage.id == link.target_passage_id)
-        )
-        return result.scalar_one_or_none()
+        return compiled.get_passage(link.target_passage_id)
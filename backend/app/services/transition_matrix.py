@@ -0,0 +1,348 @@
+"""Per-story transition matrices built from previous_passage_id
+- Seeded per Story from the daily rollups, then kept current by the visit-log
+  writer of this process (apply_batch after each committed flush)
+- Rebuilt from the rollups after ttl_seconds, so with several worker processes
+  each matrix trails the other workers' visits by at most that long
+- Sparse rows keyed by the Story's passage ordering (passage_number)
+"""
+
+from typing import Optional, List, Dict, Tuple
+from dataclasses import dataclass, field
+import asyncio
+import time
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.analytics import PassageVisitRollup, TransitionRollup
+from app.services.story_cache import CompiledStory
+from app.services.visit_rollups import DAY
+from app.config import get_settings
+
+settings = get_settings()
+
+REACH_MAX_ITERATIONS = 200
+REACH_TOLERANCE = 1e-9
+
+
+@dataclass
+class TransitionMatrix:
+    """
+    Sparse visit/transition counts of one Story
+    - passage_ids[i] is the passage at index i; unseen passages are appended
+    - edges[i][j] counts traversals i -> j
+    """
+    story_id: str
+    passage_ids: List[str] = field(default_factory=list)
+    index: Dict[str, int] = field(default_factory=dict)
+    visits: List[int] = field(default_factory=list)
+    edges: Dict[int, Dict[int, int]] = field(default_factory=dict)
+
+    def slot(self, passage_id: str) -> int:
+        i = self.index.get(passage_id)
+        if i is None:
+            i = len(self.passage_ids)
+            self.index[passage_id] = i
+            self.passage_ids.append(passage_id)
+            self.visits.append(0)
+        return i
+
+    def add_visits(self, passage_id: str, count: int = 1):
+        self.visits[self.slot(passage_id)] += count
+
+    def add_transition(self, from_passage_id: str, to_passage_id: str, count: int = 1):
+        row = self.edges.setdefault(self.slot(from_passage_id), {})
+        j = self.slot(to_passage_id)
+        row[j] = row.get(j, 0) + count
+
+    def visit_count(self, passage_id: str) -> int:
+        i = self.index.get(passage_id)
+        return self.visits[i] if i is not None else 0
+
+    def edge_count(self, from_passage_id: str, to_passage_id: str) -> int:
+        i = self.index.get(from_passage_id)
+        j = self.index.get(to_passage_id)
+        if i is None or j is None:
+            return 0
+        return self.edges.get(i, {}).get(j, 0)
+
+    def out_count(self, passage_id: str) -> int:
+        i = self.index.get(passage_id)
+        return sum(self.edges.get(i, {}).values()) if i is not None else 0
+
+    def exit_probabilities(self, passage_id: str) -> Dict[str, float]:
+        """P(next = j | at passage); the remainder is the drop-off probability"""
+        i = self.index.get(passage_id)
+        if i is None:
+            return {}
+        row = self.edges.get(i, {})
+        total = max(self.visits[i], sum(row.values()))
+        if not total:
+            return {}
+        return {self.passage_ids[j]: count / total for j, count in row.items()}
+
+
+def visit_totals_statement(story_id: str):
+    """All-time visits per Passage of a Story from the daily rollups"""
+    return (
+        select(PassageVisitRollup.passage_id, func.sum(PassageVisitRollup.visit_count))
+        .where(
+            PassageVisitRollup.story_id == story_id,
+            PassageVisitRollup.granularity == DAY
+        )
+        .group_by(PassageVisitRollup.passage_id)
+    )
+
+
+def transition_totals_statement(story_id: str):
+    """All-time transition counts of a Story from the daily rollups"""
+    return (
+        select(
+            TransitionRollup.from_passage_id,
+            TransitionRollup.to_passage_id,
+            func.sum(TransitionRollup.transition_count)
+        )
+        .where(
+            TransitionRollup.story_id == story_id,
+            TransitionRollup.granularity == DAY
+        )
+        .group_by(TransitionRollup.from_passage_id, TransitionRollup.to_passage_id)
+    )
+
+
+class TransitionMatrixCache:
+    """
+    Process-local transition matrices, one per Story
+    - get() seeds a matrix from the rollups on first use and again once it is ttl_seconds old
+    - apply_batch() adds committed visit rows to every loaded matrix
+    - A load is only kept when no batch for the same Story landed meanwhile (per-story
+      generations), so traffic on other stories never discards it
+    """
+
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self._matrices: Dict[str, TransitionMatrix] = {}
+        self._expires: Dict[str, float] = {}
+        # Bumped by clear(); per-story generations by apply_batch() and invalidate()
+        self._generation = 0
+        self._story_generations: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _fresh(self, story_id: str) -> Optional[TransitionMatrix]:
+        if self._expires.get(story_id, 0) <= time.monotonic():
+            return None
+        return self._matrices.get(story_id)
+
+    async def get(self, db: AsyncSession, compiled: CompiledStory) -> TransitionMatrix:
+        matrix = self._fresh(compiled.story_id)
+        if matrix is not None:
+            return matrix
+
+        lock = self._locks.setdefault(compiled.story_id, asyncio.Lock())
+        async with lock:
+            matrix = self._fresh(compiled.story_id)
+            if matrix is not None:
+                return matrix
+
+            generation = self._generation_of(compiled.story_id)
+            matrix = await self._load(db, compiled)
+            # A flush for this Story landed while loading; its rows may be missing, so don't keep this copy
+            if self._generation_of(compiled.story_id) == generation:
+                self._matrices[compiled.story_id] = matrix
+                self._expires[compiled.story_id] = time.monotonic() + self.ttl_seconds
+            return matrix
+
+    def _generation_of(self, story_id: str):
+        return self._generation, self._story_generations.get(story_id, 0)
+
+    def _bump(self, story_id: str):
+        self._story_generations[story_id] = self._story_generations.get(story_id, 0) + 1
+
+    async def _load(self, db: AsyncSession, compiled: CompiledStory) -> TransitionMatrix:
+        matrix = TransitionMatrix(story_id=compiled.story_id)
+        for passage_id in sorted(
+            compiled.passages,
+            key=lambda pid: (compiled.passages[pid].passage_number is None, compiled.passages[pid].passage_number or 0)
+        ):
+            matrix.slot(passage_id)
+
+        result = await db.execute(visit_totals_statement(compiled.story_id))
+        for passage_id, count in result.all():
+            matrix.add_visits(passage_id, int(count or 0))
+
+        result = await db.execute(transition_totals_statement(compiled.story_id))
+        for from_passage_id, to_passage_id, count in result.all():
+            matrix.add_transition(from_passage_id, to_passage_id, int(count or 0))
+
+        return matrix
+
+    def apply_batch(self, batch: List[dict]):
+        """Add committed visit-log rows to the loaded matrices"""
+        for story_id in {row["story_id"] for row in batch}:
+            self._bump(story_id)
+        for row in batch:
+            matrix = self._matrices.get(row["story_id"])
+            if matrix is None:
+                continue
+            matrix.add_visits(row["passage_id"])
+            if row["previous_passage_id"]:
+                matrix.add_transition(row["previous_passage_id"], row["passage_id"])
+
+    def invalidate(self, story_id: Optional[str]):
+        if story_id:
+            self._bump(story_id)
+            self._matrices.pop(story_id, None)
+            self._expires.pop(story_id, None)
+
+    def clear(self):
+        self._generation += 1
+        self._matrices.clear()
+        self._expires.clear()
+
+
+def passage_flow(compiled: CompiledStory, matrix: TransitionMatrix) -> List[dict]:
+    """Visits, onward traversals and drop-off per Passage, in passage ordering"""
+    flow = []
+    for passage_id in matrix.passage_ids:
+        passage = compiled.get_passage(passage_id)
+        if passage is None:
+            continue
+        visits = matrix.visit_count(passage_id)
+        onward = matrix.out_count(passage_id)
+        drop_off = max(visits - onward, 0)
+        flow.append({
+            "passage_id": passage_id,
+            "passage_name": passage.name,
+            "passage_number": passage.passage_number,
+            "passage_type": passage.passage_type,
+            "visit_count": visits,
+            "onward_count": onward,
+            "drop_off_count": drop_off,
+            "drop_off_rate": drop_off / visits if visits else 0.0,
+        })
+    return flow
+
+
+def link_probabilities(compiled: CompiledStory, matrix: TransitionMatrix) -> List[dict]:
+    """Traversal count and probability of every Link of the Story"""
+    stats = []
+    for source_id, links in compiled.links_by_source.items():
+        probabilities = matrix.exit_probabilities(source_id)
+        for link in links:
+            stats.append({
+                "link_id": link.id,
+                "source_passage_id": source_id,
+                "target_passage_id": link.target_passage_id,
+                "name": link.name,
+                "traversal_count": matrix.edge_count(source_id, link.target_passage_id),
+                "probability": probabilities.get(link.target_passage_id, 0.0),
+            })
+    return stats
+
+
+def transition_rows(matrix: TransitionMatrix) -> Dict[int, List[Tuple[int, float]]]:
+    """Snapshot of the observed exit probabilities per passage index (safe to use off the event loop)"""
+    rows = {}
+    for i, row in matrix.edges.items():
+        total = max(matrix.visits[i], sum(row.values()))
+        if total:
+            rows[i] = [(j, count / total) for j, count in row.items()]
+    return rows
+
+
+def reach_probabilities(
+    rows: Dict[int, List[Tuple[int, float]]],
+    start_index: int,
+    target_indexes: List[int]
+) -> List[float]:
+    """
+    Probability of eventually reaching each target from start_index, treating observed exit
+    probabilities as a Markov chain (drop-off absorbs, each target absorbs for itself)
+    - One Gauss-Seidel solve for all targets over the passages reachable from the start,
+      swept in reverse discovery order, so an acyclic story converges in a single pass
+    """
+    order = [start_index]
+    seen = {start_index}
+    for i in order:
+        for j, _ in rows.get(i, ()):
+            if j not in seen:
+                seen.add(j)
+                order.append(j)
+
+    columns = {target: k for k, target in enumerate(target_indexes)}
+    width = len(target_indexes)
+    reach = {i: [0.0] * width for i in order}
+    for target, k in columns.items():
+        if target in reach:
+            reach[target][k] = 1.0
+
+    sweep = [i for i in reversed(order) if i in rows]
+    for _ in range(REACH_MAX_ITERATIONS):
+        delta = 0.0
+        for i in sweep:
+            values = [0.0] * width
+            for j, p in rows[i]:
+                values = [value + p * r for value, r in zip(values, reach[j])]
+            own = columns.get(i)
+            if own is not None:
+                values[own] = 1.0
+            delta = max(delta, max((abs(a - b) for a, b in zip(values, reach[i])), default=0.0))
+            reach[i] = values
+        if delta < REACH_TOLERANCE:
+            break
+    return [reach[start_index][columns[target]] for target in target_indexes]
+
+
+async def story_funnel(
+    compiled: CompiledStory,
+    matrix: TransitionMatrix,
+    end_passage_ids: Optional[List[str]] = None
+) -> dict:
+    """
+    Completion from the start Passage to each end Passage
+    - completion_rate: end visits / start visits (observed)
+    - reach_probability: chance of reaching the end from the start under the transition model,
+      solved for all ends at once on a worker thread
+    """
+    start_id = compiled.start_passage_id
+    if end_passage_ids is None:
+        end_passage_ids = [p.id for p in compiled.passages.values() if p.passage_type == "end"]
+
+    start_visits = matrix.visit_count(start_id) if start_id else 0
+    # Read-only lookups: the matrix is shared with concurrent requests and the writer
+    start_index = matrix.index.get(start_id) if start_id else None
+    ends = []
+    for end_id in end_passage_ids:
+        passage = compiled.get_passage(end_id)
+        if passage is None:
+            continue
+        end_visits = matrix.visit_count(end_id)
+        ends.append({
+            "passage_id": end_id,
+            "passage_name": passage.name,
+            "visit_count": end_visits,
+            "completion_rate": end_visits / start_visits if start_visits else 0.0,
+            "reach_probability": 0.0,
+        })
+
+    solvable = [end for end in ends if matrix.index.get(end["passage_id"]) is not None]
+    if start_index is not None and solvable:
+        reach = await asyncio.to_thread(
+            reach_probabilities,
+            transition_rows(matrix),
+            start_index,
+            [matrix.index[end["passage_id"]] for end in solvable]
+        )
+        for end, probability in zip(solvable, reach):
+            end["reach_probability"] = probability
+
+    completed = sum(end["visit_count"] for end in ends)
+    return {
+        "story_id": compiled.story_id,
+        "start_passage_id": start_id,
+        "start_visit_count": start_visits,
+        "completed_count": completed,
+        "completion_rate": completed / start_visits if start_visits else 0.0,
+        "ends": ends,
+    }
+
+
+transition_matrix_cache = TransitionMatrixCache(ttl_seconds=settings.TRANSITION_MATRIX_TTL_SECONDS)
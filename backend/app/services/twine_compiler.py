@@ -0,0 +1,238 @@
+"""Server-side Twine macro compiler
+- Parses passage content into a cached intermediate form (keyed by content)
+- Pre-renders static parts: passage links, (link-goto:) and (display:) transclusions
+- Leaves dynamic macros ((set:), (if:), (print:), $variables, hooks ...) as source
+  so the browser runtime only evaluates state-dependent parts; a hook attached to a
+  macro (e.g. (if: $x)[...]) stays source as a whole, transclusions included
+- Macros are matched with balanced parentheses (quoted strings skipped), so nested
+  calls like (set: $x to (a: 1)) are one token
+Output markup matches frontend/src/utils/twine-runtime.ts
+"""
+
+from typing import Optional, List, Tuple, Dict
+from functools import lru_cache
+import hashlib
+import html
+import re
+from app.schemas.story import RenderedContent
+from app.services.story_cache import CompiledStory
+
+RENDERED_ARTIFACT_KEY = "rendered"
+MAX_DISPLAY_DEPTH = 8
+
+BRANCH_DATA_MARKER = "<!--BRANCH_DATA:"
+
+TOKEN_START = re.compile(r"\((?P<macro_name>[a-zA-Z_][a-zA-Z0-9_-]*):|\[\[")
+LINK_PATTERN = re.compile(
+    r"(?P<id_link>\[\[(?P<id_link_text>[^\]|]+?)(?:\||->)#(?P<id_link_number>\d{1,6})\]\])"
+    r"|(?P<simple_id_link>\[\[#(?P<simple_id_number>\d{1,6})\]\])"
+    r"|(?P<named_link>\[\[(?P<named_link_text>[^\]|]+?)(?:\||->)(?P<named_link_target>[^\]]+)\]\])"
+    r"|(?P<simple_link>\[\[(?P<simple_link_target>[^\]]+)\]\])"
+)
+QUOTED_PAIR_PATTERN = re.compile(r'"([^"]+)"\s*,\s*"([^"]+)"')
+QUOTED_PATTERN = re.compile(r'"([^"]+)"')
+DYNAMIC_TEXT_PATTERN = re.compile(r"\$[a-zA-Z_]|\|[a-zA-Z_][a-zA-Z0-9_]*>\[")
+
+# Intermediate node kinds
+TEXT = "text"
+LINK = "link"
+ID_LINK = "id_link"
+DISPLAY = "display"
+MACRO = "macro"
+
+Node = Tuple[str, ...]
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def strip_branch_data(content: str) -> str:
+    """Remove the trailing branch choice block written by the editor"""
+    marker_index = content.rfind(BRANCH_DATA_MARKER)
+    if marker_index == -1 or content.find("-->", marker_index) == -1:
+        return content
+    return content[:marker_index].rstrip()
+
+
+def _balanced_end(content: str, start: int, open_char: str, close_char: str, quotes: str = "") -> Optional[int]:
+    """Index just past the close_char matching content[start] (an open_char); None if unclosed"""
+    depth = 0
+    quote = None
+    i = start
+    while i < len(content):
+        char = content[i]
+        if quote:
+            if char == "\\":
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in quotes:
+            quote = char
+        elif char == open_char:
+            depth += 1
+        elif char == close_char:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return None
+
+
+def _hook_end(content: str, start: int) -> Optional[int]:
+    """End of a hook starting at content[start], or None when there is none (a [[link]] is not a hook)"""
+    if not content.startswith("[", start):
+        return None
+    end = _balanced_end(content, start, "[", "]")
+    link = LINK_PATTERN.match(content, start)
+    if link and link.end() == end:
+        return None
+    return end
+
+
+def _macro_node(content: str, match: "re.Match", end: int) -> Tuple[Node, int]:
+    name = match.group("macro_name").lower()
+    args = content[match.end():end - 1]
+    hook_end = _hook_end(content, end)
+    if hook_end is not None:
+        return (MACRO, content[match.start():hook_end]), hook_end
+
+    if name == "display":
+        target = QUOTED_PATTERN.search(args)
+        if target:
+            return (DISPLAY, target.group(1)), end
+    elif name == "link-goto":
+        pair = QUOTED_PAIR_PATTERN.search(args)
+        if pair:
+            return (LINK, pair.group(1), pair.group(2)), end
+    return (MACRO, content[match.start():end]), end
+
+
+def _link_node(link: "re.Match") -> Node:
+    if link.group("id_link"):
+        return (ID_LINK, link.group("id_link_text").strip(), link.group("id_link_number"))
+    if link.group("simple_id_link"):
+        return (ID_LINK, None, link.group("simple_id_number"))
+    if link.group("named_link"):
+        return (LINK, link.group("named_link_text").strip(), link.group("named_link_target").strip())
+    target = link.group("simple_link_target").strip()
+    return (LINK, target, target)
+
+
+@lru_cache(maxsize=2048)
+def parse_content(content: str) -> Tuple[Node, ...]:
+    """Parse passage content into intermediate nodes"""
+    nodes: List[Node] = []
+    position = 0
+    search_from = 0
+
+    while True:
+        match = TOKEN_START.search(content, search_from)
+        if match is None:
+            break
+        start = match.start()
+
+        if match.group("macro_name"):
+            end = _balanced_end(content, start, "(", ")", "\"'")
+            if end is None:
+                search_from = start + 1
+                continue
+            node, end = _macro_node(content, match, end)
+        else:
+            link = LINK_PATTERN.match(content, start)
+            if link is None:
+                search_from = start + 1
+                continue
+            node, end = _link_node(link), link.end()
+
+        if start > position:
+            nodes.append((TEXT, content[position:start]))
+        nodes.append(node)
+        position = search_from = end
+
+    if position < len(content):
+        nodes.append((TEXT, content[position:]))
+
+    return tuple(nodes)
+
+
+def _text(value: str) -> str:
+    return html.escape(value, quote=False)
+
+
+def _attr(value: str) -> str:
+    return html.escape(value, quote=True)
+
+
+class _Renderer:
+    def __init__(self, compiled: CompiledStory):
+        self.compiled = compiled
+        self.is_static = True
+
+    def render(self, content: str, display_stack: Tuple[str, ...] = ()) -> str:
+        parts = []
+        for node in parse_content(strip_branch_data(content)):
+            kind = node[0]
+
+            if kind == TEXT:
+                if DYNAMIC_TEXT_PATTERN.search(node[1]):
+                    self.is_static = False
+                parts.append(node[1])
+
+            elif kind == LINK:
+                _, text, target = node
+                parts.append(f'<a class="passage-link" data-passage="{_attr(target)}">{_text(text)}</a>')
+
+            elif kind == ID_LINK:
+                _, text, id_str = node
+                passage = self.compiled.get_passage_by_number(int(id_str))
+                if passage:
+                    parts.append(
+                        f'<a class="passage-link" data-passage="{_attr(passage.name)}" '
+                        f'data-passage-id="{id_str}">{_text(text if text is not None else passage.name)}</a>'
+                    )
+                else:
+                    label = text if text is not None else f"#{id_str}"
+                    parts.append(
+                        f'<a class="passage-link passage-link-broken" data-passage-id="{id_str}" '
+                        f'title="Passage not found">{_text(label)} ⚠</a>'
+                    )
+
+            elif kind == DISPLAY:
+                parts.append(self._render_display(node[1], display_stack))
+
+            else:
+                self.is_static = False
+                parts.append(node[1])
+
+        return "".join(parts)
+
+    def _render_display(self, name: str, display_stack: Tuple[str, ...]) -> str:
+        passage = self.compiled.get_passage_by_name(name)
+        if not passage or passage.id in display_stack or len(display_stack) >= MAX_DISPLAY_DEPTH:
+            return f'<span class="passage-display-broken" title="Cannot display passage">{html.escape(name)} ⚠</span>'
+        return self.render(passage.content or "", display_stack + (passage.id,))
+
+
+def render_passage(compiled: CompiledStory, passage_id: str) -> Optional[RenderedContent]:
+    """
+    Render a Passage of a compiled Story
+    - Cached per compiled Story, so any Story change re-renders
+    """
+    rendered: Dict[str, RenderedContent] = compiled.artifacts.setdefault(RENDERED_ARTIFACT_KEY, {})
+    if passage_id in rendered:
+        return rendered[passage_id]
+
+    passage = compiled.get_passage(passage_id)
+    if not passage:
+        return None
+
+    renderer = _Renderer(compiled)
+    html_output = renderer.render(passage.content or "", (passage.id,))
+    result = RenderedContent(
+        content_hash=content_hash(passage.content or ""),
+        html=html_output,
+        is_static=renderer.is_static
+    )
+    rendered[passage_id] = result
+    return result
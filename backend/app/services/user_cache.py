@@ -0,0 +1,93 @@
+from typing import Dict, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+import time
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user import User
+from app.config import get_settings
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """What request handlers read from the authenticated user"""
+    id: str
+    name: str
+    role: str
+
+
+class UserCache:
+    """
+    Process-local TTL + LRU cache of authenticated users (user id -> CachedUser)
+    - get_current_user resolves a token without a database query while the entry is fresh
+    - Endpoints that change a user's name or role must call invalidate() after commit;
+      other worker processes pick the change up when their entry expires (ttl_seconds)
+    """
+
+    def __init__(self, max_users: int = 10000, ttl_seconds: float = 60):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._users: "OrderedDict[str, Tuple[float, CachedUser]]" = OrderedDict()
+        self._generation = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "invalidated": 0,
+        }
+
+    def get_cached(self, user_id: str) -> Optional[CachedUser]:
+        entry = self._users.get(user_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._users[user_id]
+            self.stats["expired"] += 1
+            return None
+        self._users.move_to_end(user_id)
+        return user
+
+    async def get(self, db: AsyncSession, user_id: str) -> Optional[CachedUser]:
+        """Return the user, loading id, name and role on a miss; unknown ids are not cached"""
+        user = self.get_cached(user_id)
+        if user is not None:
+            self.stats["hits"] += 1
+            return user
+
+        self.stats["misses"] += 1
+        generation = self._generation
+        result = await db.execute(select(User.id, User.name, User.role).where(User.id == user_id))
+        row = result.one_or_none()
+        if row is None:
+            return None
+
+        user = CachedUser(id=row.id, name=row.name, role=row.role)
+        # Don't store a snapshot that was invalidated while loading
+        if self._generation == generation:
+            self._store(user)
+        return user
+
+    def _store(self, user: CachedUser):
+        self._users[user.id] = (time.monotonic() + self.ttl_seconds, user)
+        self._users.move_to_end(user.id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        """Drop a user after their name or role changed"""
+        self._generation += 1
+        if self._users.pop(user_id, None) is not None:
+            self.stats["invalidated"] += 1
+
+    def clear(self):
+        self._generation += 1
+        self._users.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "cached": len(self._users)}
+
+
+user_cache = UserCache(max_users=settings.USER_CACHE_MAX_USERS, ttl_seconds=settings.USER_CACHE_TTL_SECONDS)
@@ -0,0 +1,399 @@
+"""Monthly visit-log partitions
+- visit_logs is the live partition; whole months older than VISIT_ARCHIVE_AFTER_MONTHS
+  are moved into one compressed columnar file per month and deleted from SQLite
+- Archive file: a zip of column members (like NumPy .npz, built on the stdlib array module),
+  split into self-contained chunks of at most VISIT_ARCHIVE_BATCH_SIZE rows (chunk-NNNNN/)
+  * ids.txt: newline-separated visit ids
+  * user_id / story_id / passage_id / previous_passage_id: dictionary-encoded per chunk
+    (<col>.dict.json value list + <col>.codes uint32 array)
+  * created_at.micros: int64 microseconds since the epoch
+  * duration_seconds.i32: int32, -1 for NULL
+  Format 1 files hold the same members once, unprefixed, and read as a single chunk
+- Readers decode one chunk at a time, so memory stays flat however large a month is
+- Archiving reads from the read pool in pages, compresses each chunk in a worker thread and
+  deletes in short transactions, so requests and other writers are not held up by a large month
+- Rollup tables are never archived, so rollup-based statistics already span all months
+"""
+
+from typing import Optional, List, Dict, Iterable, Iterator, AsyncIterator
+from array import array
+from datetime import datetime, timedelta
+import asyncio
+import json
+import logging
+import os
+import sys
+import zipfile
+from sqlalchemy import select, delete, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import engine, async_session_maker, async_read_session_maker
+from app.models.analytics import VisitLog
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT_VERSION = 2
+ARCHIVE_PREFIX = "visit_logs_"
+ARCHIVE_SUFFIX = ".zip"
+EPOCH = datetime(1970, 1, 1)
+
+DICTIONARY_COLUMNS = ("user_id", "story_id", "passage_id", "previous_passage_id")
+
+
+def next_month(month: str) -> str:
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+
+def archive_cutoff_month(now: Optional[datetime] = None, keep_months: Optional[int] = None) -> str:
+    """First month that stays live (current month counts as one)"""
+    now = now or datetime.utcnow()
+    keep_months = settings.VISIT_ARCHIVE_AFTER_MONTHS if keep_months is None else keep_months
+    month = f"{now.year:04d}-{now.month:02d}"
+    for _ in range(max(keep_months, 1) - 1):
+        year, mon = int(month[:4]), int(month[5:7])
+        month = f"{year - (mon == 1):04d}-{(mon - 2) % 12 + 1:02d}"
+    return month
+
+
+def _to_micros(created_at: str) -> int:
+    delta = datetime.fromisoformat(created_at) - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(micros: int) -> str:
+    return (EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+def _row_key(row: dict) -> tuple:
+    return (row["created_at"] or "", row["id"])
+
+
+def _chunk_prefix(index: int) -> str:
+    return f"chunk-{index:05d}/"
+
+
+class ArchiveWriter:
+    """
+    Streams one month into a new archive file, chunk_rows rows per chunk
+    - add() takes rows in (created_at, id) order, in as many calls as needed
+    - merge_with: rows of the month's existing archive in the same order, merged in;
+      a live row replaces the archived row with the same id
+    - close() writes the manifest and swaps the file in; abort() discards it
+    """
+
+    def __init__(
+        self,
+        archive: "VisitArchive",
+        month: str,
+        chunk_rows: int,
+        merge_with: Optional[Iterator[dict]] = None
+    ):
+        self.archive = archive
+        self.month = month
+        self.chunk_rows = chunk_rows
+        self._merge_with = merge_with
+        self._merged = next(merge_with, None) if merge_with is not None else None
+        self._buffer: List[dict] = []
+        self._chunks: List[dict] = []
+        self._story_counts: Dict[str, int] = {}
+        os.makedirs(archive.directory, exist_ok=True)
+        self._tmp_path = archive.path(month) + ".tmp"
+        self._zip = zipfile.ZipFile(self._tmp_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9)
+
+    def add(self, rows: Iterable[dict]):
+        for row in rows:
+            key = _row_key(row)
+            while self._merged is not None and _row_key(self._merged) <= key:
+                if self._merged["id"] != row["id"]:
+                    self._append(self._merged)
+                self._merged = next(self._merge_with, None)
+            self._append(row)
+
+    def _append(self, row: dict):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.chunk_rows:
+            self._write_chunk()
+
+    def _write_chunk(self):
+        rows, self._buffer = self._buffer, []
+        if not rows:
+            return
+        prefix = _chunk_prefix(len(self._chunks))
+        self._zip.writestr(prefix + "ids.txt", "\n".join(row["id"] for row in rows))
+
+        for column in DICTIONARY_COLUMNS:
+            values: Dict[Optional[str], int] = {None: 0}
+            codes = array("I", (values.setdefault(row[column], len(values)) for row in rows))
+            self._zip.writestr(f"{prefix}{column}.dict.json", json.dumps(list(values)))
+            self._zip.writestr(f"{prefix}{column}.codes", codes.tobytes())
+
+        self._zip.writestr(
+            prefix + "created_at.micros",
+            array("q", (_to_micros(row["created_at"]) for row in rows)).tobytes()
+        )
+        self._zip.writestr(
+            prefix + "duration_seconds.i32",
+            array("i", (
+                -1 if row["duration_seconds"] is None else row["duration_seconds"]
+                for row in rows
+            )).tobytes()
+        )
+
+        for row in rows:
+            if row["story_id"]:
+                self._story_counts[row["story_id"]] = self._story_counts.get(row["story_id"], 0) + 1
+        self._chunks.append({
+            "row_count": len(rows),
+            "first_created_at": rows[0]["created_at"],
+            "last_created_at": rows[-1]["created_at"],
+        })
+
+    def close(self):
+        while self._merged is not None:
+            self._append(self._merged)
+            self._merged = next(self._merge_with, None)
+        self._write_chunk()
+
+        manifest = {
+            "format_version": ARCHIVE_FORMAT_VERSION,
+            "month": self.month,
+            "row_count": sum(chunk["row_count"] for chunk in self._chunks),
+            "byteorder": sys.byteorder,
+            "story_counts": self._story_counts,
+            "first_created_at": self._chunks[0]["first_created_at"] if self._chunks else None,
+            "last_created_at": self._chunks[-1]["last_created_at"] if self._chunks else None,
+            "chunks": self._chunks,
+        }
+        self._zip.writestr("manifest.json", json.dumps(manifest))
+        self._zip.close()
+        os.replace(self._tmp_path, self.archive.path(self.month))
+        self.archive._manifests.pop(self.month, None)
+
+    def abort(self):
+        self._zip.close()
+        if self._merge_with is not None:
+            self._merge_with.close()
+        os.remove(self._tmp_path)
+
+
+class VisitArchive:
+    """Reads and writes per-month archive files under one directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._manifests: Dict[str, tuple] = {}  # month -> (mtime, manifest)
+
+    def path(self, month: str) -> str:
+        return os.path.join(self.directory, f"{ARCHIVE_PREFIX}{month}{ARCHIVE_SUFFIX}")
+
+    def months(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name[len(ARCHIVE_PREFIX):-len(ARCHIVE_SUFFIX)]
+            for name in os.listdir(self.directory)
+            if name.startswith(ARCHIVE_PREFIX) and name.endswith(ARCHIVE_SUFFIX)
+        )
+
+    def manifest(self, month: str) -> dict:
+        """Manifest of an archived month (cached until the file changes)"""
+        path = self.path(month)
+        mtime = os.path.getmtime(path)
+        cached = self._manifests.get(month)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with zipfile.ZipFile(path) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+        self._manifests[month] = (mtime, manifest)
+        return manifest
+
+    def visit_count(self, story_id: Optional[str] = None) -> int:
+        total = 0
+        for month in self.months():
+            manifest = self.manifest(month)
+            total += manifest["story_counts"].get(story_id, 0) if story_id else manifest["row_count"]
+        return total
+
+    def write(self, month: str, rows: List[dict], chunk_rows: Optional[int] = None):
+        """Write (or replace) the archive of one month; rows are visit_logs dicts"""
+        writer = ArchiveWriter(self, month, chunk_rows or settings.VISIT_ARCHIVE_BATCH_SIZE)
+        writer.add(sorted(rows, key=_row_key))
+        writer.close()
+
+    def read(self, month: str) -> List[dict]:
+        """Decode every row of an archived month"""
+        return list(self.iter_month(month))
+
+    def iter_month(self, month: str, start: Optional[str] = None, end: Optional[str] = None) -> Iterator[dict]:
+        """
+        Rows of an archived month in time order, decoded one chunk at a time
+        start / end (ISO strings) only skip chunks entirely outside [start, end)
+        """
+        with zipfile.ZipFile(self.path(month)) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+            swap = manifest["byteorder"] != sys.byteorder
+            if manifest["format_version"] == 1:
+                yield from self._iter_chunk(archive, "", manifest["row_count"], swap)
+                return
+
+            for index, chunk in enumerate(manifest["chunks"]):
+                if start and chunk["last_created_at"] < start:
+                    continue
+                if end and chunk["first_created_at"] >= end:
+                    break
+                yield from self._iter_chunk(archive, _chunk_prefix(index), chunk["row_count"], swap)
+
+    @staticmethod
+    def _iter_chunk(archive: zipfile.ZipFile, prefix: str, row_count: int, swap: bool) -> Iterator[dict]:
+        """Columns stay in their compact array form; row dicts are built one at a time"""
+        def load_array(typecode: str, member: str) -> array:
+            values = array(typecode)
+            values.frombytes(archive.read(prefix + member))
+            if swap:
+                values.byteswap()
+            return values
+
+        if not row_count:
+            return
+        ids = archive.read(prefix + "ids.txt").decode("utf-8").split("\n")
+        dictionaries = {}
+        codes = {}
+        for column in DICTIONARY_COLUMNS:
+            dictionaries[column] = json.loads(archive.read(f"{prefix}{column}.dict.json"))
+            codes[column] = load_array("I", f"{column}.codes")
+        created_at = load_array("q", "created_at.micros")
+        durations = load_array("i", "duration_seconds.i32")
+
+        for i in range(row_count):
+            yield {
+                "id": ids[i],
+                **{column: dictionaries[column][codes[column][i]] for column in DICTIONARY_COLUMNS},
+                "duration_seconds": None if durations[i] < 0 else durations[i],
+                "created_at": _from_micros(created_at[i]),
+            }
+
+    def iter_rows(
+        self,
+        story_id: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> Iterator[dict]:
+        """Archived rows in time order; start inclusive, end exclusive (ISO strings)"""
+        for month in self.months():
+            if end and month > end[:7]:
+                break
+            if start and next_month(month) <= start[:7]:
+                continue
+            for row in self.iter_month(month, start, end):
+                if story_id and row["story_id"] != story_id:
+                    continue
+                if start and row["created_at"] < start:
+                    continue
+                if end and row["created_at"] >= end:
+                    continue
+                yield row
+
+
+visit_archive = VisitArchive(settings.VISIT_ARCHIVE_DIR)
+
+
+async def live_month_counts(db: AsyncSession) -> Dict[str, int]:
+    month = func.substr(VisitLog.created_at, 1, 7)
+    result = await db.execute(select(month, func.count(VisitLog.id)).group_by(month).order_by(month))
+    return {m: count for m, count in result.all()}
+
+
+async def read_live_month(month: str, page_size: int) -> AsyncIterator[List[dict]]:
+    """
+    One month of visit_logs, read from the read pool in keyset pages on (created_at, id);
+    each page is its own short read transaction
+    """
+    in_month = (VisitLog.created_at >= month, VisitLog.created_at < next_month(month))
+    last = None
+    while True:
+        query = select(*VisitLog.__table__.columns).where(*in_month)
+        if last:
+            query = query.where(tuple_(VisitLog.created_at, VisitLog.id) > (last["created_at"], last["id"]))
+        async with async_read_session_maker() as db:
+            result = await db.execute(query.order_by(VisitLog.created_at, VisitLog.id).limit(page_size))
+            page = [dict(row._mapping) for row in result.all()]
+        if page:
+            last = page[-1]
+            yield page
+        if len(page) < page_size:
+            return
+
+
+async def archive_month(month: str, batch_size: Optional[int] = None) -> int:
+    """
+    Move one month of visit_logs into its archive file; returns the number of rows moved
+    - Pages are read from the read pool and compressed chunk by chunk in a worker thread;
+      an existing file (a previous run wrote it but did not finish the delete) is merged in
+    - The archived rows are then deleted in short transactions of batch_size rows
+    """
+    batch_size = batch_size or settings.VISIT_ARCHIVE_BATCH_SIZE
+    merge_with = visit_archive.iter_month(month) if month in visit_archive.months() else None
+    writer = None
+    moved = 0
+    last = None
+    try:
+        async for page in read_live_month(month, batch_size):
+            if writer is None:
+                writer = await asyncio.to_thread(ArchiveWriter, visit_archive, month, batch_size, merge_with)
+            await asyncio.to_thread(writer.add, page)
+            moved += len(page)
+            last = page[-1]
+        if writer is None:
+            return 0
+        await asyncio.to_thread(writer.close)
+    except BaseException:
+        if writer is not None:
+            await asyncio.to_thread(writer.abort)
+        raise
+    finally:
+        if writer is None and merge_with is not None:
+            merge_with.close()
+
+    archived = select(VisitLog.id).where(
+        VisitLog.created_at >= month,
+        tuple_(VisitLog.created_at, VisitLog.id) <= (last["created_at"], last["id"])
+    ).limit(batch_size)
+    while True:
+        async with async_session_maker() as db:
+            result = await db.execute(delete(VisitLog).where(VisitLog.id.in_(archived)))
+            await db.commit()
+        if result.rowcount < batch_size:
+            return moved
+
+
+async def archive_old_partitions(keep_months: Optional[int] = None, vacuum: bool = False) -> Dict[str, int]:
+    """Archive every live month before the retention cutoff; optionally VACUUM afterwards"""
+    cutoff = archive_cutoff_month(keep_months=keep_months)
+    archived = {}
+
+    async with async_read_session_maker() as db:
+        months = await live_month_counts(db)
+    for month in months:
+        if month and month < cutoff:
+            archived[month] = await archive_month(month)
+
+    if vacuum and archived:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.exec_driver_sql("VACUUM")
+
+    return archived
+
+
+async def run_archiver(interval_hours: float):
+    """Periodic retention job (started from the app lifespan)"""
+    while True:
+        try:
+            archived = await archive_old_partitions()
+            if archived:
+                logger.info("Archived visit-log months: %s", archived)
+        except Exception:
+            logger.exception("Visit-log archiving failed")
+        await asyncio.sleep(interval_hours * 3600)
@@ -0,0 +1,295 @@
+"""Hourly / daily visit rollups
+- Maintained incrementally by the visit-log writer, inside the flush transaction
+- Admin statistics read these instead of scanning visit_logs
+- Daily HyperLogLog sketches of distinct readers (signed-in users) per passage and story
+"""
+
+from typing import Optional, List, Tuple, Dict, Iterable, Set
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.analytics import (
+    PassageVisitRollup, StoryVisitRollup, TransitionRollup, PassageDwellRollup,
+    PassageReaderSketch, StoryReaderSketch
+)
+from app.services.hyperloglog import HyperLogLog
+from app.config import get_settings
+
+settings = get_settings()
+
+HOUR = "hour"
+DAY = "day"
+GRANULARITIES = (HOUR, DAY)
+
+# Upper bounds (seconds, inclusive) of the dwell-time histogram bins; bin 0 is [0, 1]
+DWELL_BIN_BOUNDS = (
+    1, 2, 3, 5, 8, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 300,
+    450, 600, 900, 1200, 1800, 2700, 3600, 7200, 21600
+)
+
+
+def bucket_key(created_at: str, granularity: str) -> str:
+    """ISO timestamp -> bucket key (2026-10-17T09 for hours, 2026-10-17 for days)"""
+    return created_at[:13] if granularity == HOUR else created_at[:10]
+
+
+def parse_bucket_range(
+    start: Optional[str],
+    end: Optional[str],
+    granularity: Optional[str] = None
+) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Turn ISO date/datetime filters into (granularity, start_key, end_key), both keys inclusive
+    - Without an explicit granularity, plain dates read the daily rollups
+      and anything with a time part the hourly ones
+    Raises ValueError on malformed input
+    """
+    for value in (start, end):
+        if value:
+            datetime.fromisoformat(value)
+
+    if granularity is None:
+        granularity = HOUR if any(v and "T" in v for v in (start, end)) else DAY
+
+    def key(value: Optional[str]) -> Optional[str]:
+        if not value:
+            return None
+        if granularity == HOUR and "T" not in value:
+            value = f"{value}T00"
+        return bucket_key(value, granularity)
+
+    end_key = key(end)
+    if end and granularity == HOUR and "T" not in end:
+        end_key = f"{end}T23"
+    return granularity, key(start), end_key
+
+
+def _aggregate(batch: List[dict]):
+    passage_counts: Counter = Counter()
+    story_counts: Counter = Counter()
+    transition_counts: Counter = Counter()
+
+    for row in batch:
+        for granularity in GRANULARITIES:
+            bucket = bucket_key(row["created_at"], granularity)
+            passage_counts[(granularity, bucket, row["passage_id"], row["story_id"])] += 1
+            if row["story_id"]:
+                story_counts[(granularity, bucket, row["story_id"])] += 1
+            if row["previous_passage_id"]:
+                transition_counts[(
+                    granularity, bucket, row["previous_passage_id"], row["passage_id"], row["story_id"]
+                )] += 1
+
+    return passage_counts, story_counts, transition_counts
+
+
+async def apply_visit_rollups(db: AsyncSession, batch: List[dict]):
+    """Add one batch of visit-log rows to the rollup tables (no commit)"""
+    passage_counts, story_counts, transition_counts = _aggregate(batch)
+
+    if passage_counts:
+        stmt = sqlite_insert(PassageVisitRollup)
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["granularity", "bucket", "passage_id"],
+                set_={"visit_count": PassageVisitRollup.visit_count + stmt.excluded.visit_count}
+            ),
+            [
+                {
+                    "granularity": granularity,
+                    "bucket": bucket,
+                    "passage_id": passage_id,
+                    "story_id": story_id,
+                    "visit_count": count,
+                }
+                for (granularity, bucket, passage_id, story_id), count in passage_counts.items()
+            ]
+        )
+
+    if story_counts:
+        stmt = sqlite_insert(StoryVisitRollup)
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["granularity", "bucket", "story_id"],
+                set_={"visit_count": StoryVisitRollup.visit_count + stmt.excluded.visit_count}
+            ),
+            [
+                {"granularity": granularity, "bucket": bucket, "story_id": story_id, "visit_count": count}
+                for (granularity, bucket, story_id), count in story_counts.items()
+            ]
+        )
+
+    if transition_counts:
+        stmt = sqlite_insert(TransitionRollup)
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["granularity", "bucket", "from_passage_id", "to_passage_id"],
+                set_={"transition_count": TransitionRollup.transition_count + stmt.excluded.transition_count}
+            ),
+            [
+                {
+                    "granularity": granularity,
+                    "bucket": bucket,
+                    "from_passage_id": from_id,
+                    "to_passage_id": to_id,
+                    "story_id": story_id,
+                    "transition_count": count,
+                }
+                for (granularity, bucket, from_id, to_id, story_id), count in transition_counts.items()
+            ]
+        )
+
+
+def dwell_bin(seconds: int) -> int:
+    for index, bound in enumerate(DWELL_BIN_BOUNDS):
+        if seconds <= bound:
+            return index
+    return len(DWELL_BIN_BOUNDS) - 1
+
+
+async def apply_dwell_rollups(db: AsyncSession, rows: Iterable[dict]):
+    """Add visits with a known duration_seconds to the daily dwell histograms (no commit)"""
+    counts: Counter = Counter()
+    seconds: Counter = Counter()
+    for row in rows:
+        key = (
+            bucket_key(row["created_at"], DAY), row["passage_id"], row["story_id"],
+            dwell_bin(row["duration_seconds"])
+        )
+        counts[key] += 1
+        seconds[key] += row["duration_seconds"]
+
+    if not counts:
+        return
+
+    stmt = sqlite_insert(PassageDwellRollup)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["granularity", "bucket", "passage_id", "bin"],
+            set_={
+                "visit_count": PassageDwellRollup.visit_count + stmt.excluded.visit_count,
+                "total_seconds": PassageDwellRollup.total_seconds + stmt.excluded.total_seconds,
+            }
+        ),
+        [
+            {
+                "granularity": DAY,
+                "bucket": bucket,
+                "passage_id": passage_id,
+                "story_id": story_id,
+                "bin": bin_index,
+                "visit_count": count,
+                "total_seconds": seconds[(bucket, passage_id, story_id, bin_index)],
+            }
+            for (bucket, passage_id, story_id, bin_index), count in counts.items()
+        ]
+    )
+
+
+def dwell_percentiles(histogram: Dict[int, int], percentiles: Iterable[int]) -> Dict[str, Optional[float]]:
+    """Approximate percentiles from a dwell histogram, interpolating linearly inside a bin"""
+    total = sum(histogram.values())
+    result = {}
+    for percentile in percentiles:
+        name = f"p{percentile}"
+        if not total:
+            result[name] = None
+            continue
+
+        rank = percentile / 100 * total
+        cumulative = 0
+        for index in sorted(histogram):
+            count = histogram[index]
+            if count and cumulative + count >= rank:
+                lower = DWELL_BIN_BOUNDS[index - 1] if index > 0 else 0
+                upper = DWELL_BIN_BOUNDS[index]
+                result[name] = round(lower + (upper - lower) * (rank - cumulative) / count, 1)
+                break
+            cumulative += count
+    return result
+
+
+def stored_sketches_statement(model, key_column: str, pairs: Iterable[Tuple[str, str]]):
+    """Stored sketches of the given (bucket, key) pairs (plus any other bucket x key combinations)"""
+    pairs = list(pairs)
+    key_attr = getattr(model, key_column)
+    return select(model.bucket, key_attr, model.sketch).where(
+        model.bucket.in_({bucket for bucket, _ in pairs}),
+        key_attr.in_({key for _, key in pairs})
+    )
+
+
+async def _update_sketches(
+    db: AsyncSession,
+    model,
+    key_column: str,
+    readers: Dict[Tuple[str, str], Set[str]],
+    extra: Optional[Dict[Tuple[str, str], dict]] = None
+):
+    """Read-modify-write the sketches of (bucket, key) pairs; only changed sketches are written"""
+    result = await db.execute(stored_sketches_statement(model, key_column, readers))
+    existing = {(bucket, key): blob for bucket, key, blob in result.all()}
+
+    rows = []
+    for (bucket, key), user_ids in readers.items():
+        blob = existing.get((bucket, key))
+        sketch = HyperLogLog.from_bytes(blob) if blob else HyperLogLog(settings.HLL_PRECISION)
+        changed = blob is None
+        # HLL_PRECISION was lowered since this sketch was written; a raised one applies to new days only
+        if sketch.precision > settings.HLL_PRECISION:
+            sketch = sketch.fold(settings.HLL_PRECISION)
+            changed = True
+        for user_id in user_ids:
+            changed = sketch.add(user_id) or changed
+        if changed:
+            rows.append({
+                "bucket": bucket,
+                key_column: key,
+                "sketch": sketch.to_bytes(),
+                **(extra or {}).get((bucket, key), {}),
+            })
+
+    if rows:
+        stmt = sqlite_insert(model)
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["bucket", key_column],
+                set_={"sketch": stmt.excluded.sketch}
+            ),
+            rows
+        )
+
+
+async def apply_reader_sketches(db: AsyncSession, batch: List[dict]):
+    """Add the signed-in readers of one batch to the daily sketches (no commit)"""
+    passage_readers: Dict[Tuple[str, str], Set[str]] = {}
+    passage_stories: Dict[Tuple[str, str], dict] = {}
+    story_readers: Dict[Tuple[str, str], Set[str]] = {}
+
+    for row in batch:
+        if not row["user_id"]:
+            continue
+        bucket = bucket_key(row["created_at"], DAY)
+        passage_key = (bucket, row["passage_id"])
+        passage_readers.setdefault(passage_key, set()).add(row["user_id"])
+        passage_stories[passage_key] = {"story_id": row["story_id"]}
+        if row["story_id"]:
+            story_readers.setdefault((bucket, row["story_id"]), set()).add(row["user_id"])
+
+    if passage_readers:
+        await _update_sketches(db, PassageReaderSketch, "passage_id", passage_readers, passage_stories)
+    if story_readers:
+        await _update_sketches(db, StoryReaderSketch, "story_id", story_readers)
+
+
+def union_sketches(blobs: Iterable[bytes]) -> Optional[HyperLogLog]:
+    union = None
+    for blob in blobs:
+        sketch = HyperLogLog.from_bytes(blob)
+        if union is None:
+            union = sketch
+        else:
+            union.merge(sketch)
+    return union
@@ -0,0 +1,276 @@
+from typing import Optional, List, Dict
+from datetime import datetime
+import asyncio
+import logging
+import uuid
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import async_session_maker, existing_ids
+from app.models.analytics import VisitLog
+from app.models.passage import Passage
+from app.models.story import Story
+from app.models.user import User
+from app.services.visit_rollups import apply_visit_rollups, apply_dwell_rollups, apply_reader_sketches
+from app.services.transition_matrix import transition_matrix_cache
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+
+
+class VisitLogWriter:
+    """
+    Background visit-log ingestion
+    - Reader requests only enqueue (no write transaction on the request path)
+    - Rows are flushed as one executemany INSERT every flush_interval_ms or batch_size rows
+    - Hourly/daily rollups are updated in the same transaction (see visit_rollups)
+    - Bounded queue; on overflow either the new or the oldest row is dropped and counted
+    - Dwell-time beacons are coalesced per visit id and written with the next flush:
+      into the INSERT when the visit is still queued, otherwise as one bulk UPDATE
+    - Visits of passages or stories deleted while queued are dropped and counted as orphaned
+      instead of failing the whole batch on the foreign keys
+    - stop() drains everything still queued (called from the app lifespan)
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval_ms: int = 200,
+        overflow_policy: str = OVERFLOW_DROP_NEWEST,
+        max_dwell_seconds: int = 21600
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.overflow_policy = overflow_policy
+        self.max_pending_durations = max_queue_size
+        self.max_dwell_seconds = max_dwell_seconds
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._queued_ids: set = set()
+        self._durations: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "failed": 0,
+            "orphaned": 0,
+            "flushes": 0,
+            "durations_received": 0,
+            "durations_written": 0,
+            "durations_dropped": 0,
+        }
+
+    def record(
+        self,
+        passage_id: str,
+        story_id: Optional[str],
+        user_id: Optional[str] = None,
+        previous_passage_id: Optional[str] = None
+    ) -> str:
+        """Queue a visit and return its id (assigned up front so clients can refer to it)"""
+        row = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "story_id": story_id,
+            "passage_id": passage_id,
+            "previous_passage_id": previous_passage_id,
+            "duration_seconds": None,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            if self.overflow_policy != OVERFLOW_DROP_OLDEST:
+                self.stats["dropped"] += 1
+                return row["id"]
+            self._queued_ids.discard(self._queue.get_nowait()["id"])
+            self._queue.put_nowait(row)
+            self.stats["dropped"] += 1
+
+        self._queued_ids.add(row["id"])
+        self.stats["enqueued"] += 1
+        return row["id"]
+
+    def record_duration(self, visit_id: str, duration: float):
+        """Coalesce a dwell-time beacon; the longest report per visit wins"""
+        seconds = min(int(round(duration)), self.max_dwell_seconds)
+        self.stats["durations_received"] += 1
+
+        if visit_id not in self._durations and len(self._durations) >= self.max_pending_durations:
+            self.stats["durations_dropped"] += 1
+            return
+        self._durations[visit_id] = max(seconds, self._durations.get(visit_id, 0))
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            "queued": self._queue.qsize(),
+            "durations_pending": len(self._durations),
+            "running": int(self._task is not None and not self._task.done()),
+        }
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still queued"""
+        self._stopping = True
+        if self._task is not None:
+            await self._task
+            self._task = None
+        # Rows queued while no loop was running
+        await self.flush_pending()
+
+    async def flush_pending(self):
+        while not self._queue.empty():
+            batch = []
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._flush(batch)
+        while self._durations:
+            pending = len(self._durations)
+            await self._flush([])
+            if len(self._durations) >= pending:
+                break
+
+    async def _run(self):
+        while not (self._stopping and self._queue.empty() and not self._durations):
+            batch = await self._collect()
+            if batch or self._durations:
+                await self._flush(batch)
+
+    async def _collect(self) -> List[dict]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        batch = []
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+            # Drain whatever is already queued without waiting
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+        return batch
+
+    def _take_durations(self, batch: List[dict]) -> Dict[str, int]:
+        """
+        Move pending durations into the batch rows they belong to and return up to
+        batch_size of the rest (visits already written); durations of visits still
+        queued and the overflow stay pending for the next flush
+        """
+        for row in batch:
+            self._queued_ids.discard(row["id"])
+            seconds = self._durations.pop(row["id"], None)
+            if seconds is not None:
+                row["duration_seconds"] = seconds
+
+        updates = {}
+        for visit_id, seconds in self._durations.items():
+            if len(updates) >= self.batch_size:
+                break
+            if visit_id not in self._queued_ids:
+                updates[visit_id] = seconds
+        for visit_id in updates:
+            del self._durations[visit_id]
+        return updates
+
+    async def _flush(self, batch: List[dict]):
+        durations = self._take_durations(batch)
+        if not batch and not durations:
+            return
+        try:
+            async with async_session_maker() as db:
+                batch = await self.drop_orphans(db, batch)
+                written_durations = await self.write_batch(db, batch, durations)
+                await db.commit()
+                transition_matrix_cache.apply_batch(batch)
+            self.stats["written"] += len(batch)
+            self.stats["durations_written"] += written_durations
+            self.stats["flushes"] += 1
+        except Exception:
+            self.stats["failed"] += len(batch)
+            self.stats["durations_dropped"] += len(durations)
+            logger.exception("Failed to write %d visit logs", len(batch))
+
+    async def drop_orphans(self, db: AsyncSession, batch: List[dict]) -> List[dict]:
+        """
+        Drop visits whose passage or story was deleted after they were queued (and forget
+        unknown users); with foreign keys on, one such row would fail the whole batch
+        """
+        if not batch:
+            return batch
+
+        passages = await existing_ids(db, Passage, {row["passage_id"] for row in batch})
+        stories = await existing_ids(db, Story, {row["story_id"] for row in batch if row["story_id"]})
+        users = await existing_ids(db, User, {row["user_id"] for row in batch if row["user_id"]})
+
+        kept = []
+        for row in batch:
+            if row["passage_id"] not in passages or (row["story_id"] and row["story_id"] not in stories):
+                continue
+            if row["user_id"] and row["user_id"] not in users:
+                row["user_id"] = None
+            kept.append(row)
+
+        self.stats["orphaned"] += len(batch) - len(kept)
+        return kept
+
+    async def write_batch(
+        self,
+        db: AsyncSession,
+        batch: List[dict],
+        durations: Optional[Dict[str, int]] = None
+    ) -> int:
+        """
+        Write one batch, its rollup increments and pending durations inside the flush transaction
+        Returns the number of durations written
+        """
+        timed_rows = [row for row in batch if row["duration_seconds"] is not None]
+
+        if batch:
+            await db.execute(insert(VisitLog), batch)
+            await apply_visit_rollups(db, batch)
+            await apply_reader_sketches(db, batch)
+
+        if durations:
+            # Only the first report per visit counts; later beacons for the same visit are ignored
+            result = await db.execute(
+                select(VisitLog.id, VisitLog.story_id, VisitLog.passage_id, VisitLog.created_at)
+                .where(VisitLog.id.in_(list(durations)), VisitLog.duration_seconds.is_(None))
+            )
+            updated_rows = [
+                {**row._mapping, "duration_seconds": durations[row.id]}
+                for row in result.all()
+            ]
+            if updated_rows:
+                await db.execute(
+                    update(VisitLog),
+                    [{"id": row["id"], "duration_seconds": row["duration_seconds"]} for row in updated_rows]
+                )
+                timed_rows.extend(updated_rows)
+
+        await apply_dwell_rollups(db, timed_rows)
+        return len(timed_rows)
+
+
+visit_log_writer = VisitLogWriter(
+    max_queue_size=settings.VISIT_QUEUE_MAX_SIZE,
+    batch_size=settings.VISIT_FLUSH_BATCH_SIZE,
+    flush_interval_ms=settings.VISIT_FLUSH_INTERVAL_MS,
+    overflow_policy=settings.VISIT_QUEUE_OVERFLOW,
+    max_dwell_seconds=settings.DWELL_MAX_SECONDS
+)
@@ -0,0 +1,130 @@
+"""Login-rush benchmark: reader latency with and without concurrent logins
+
+Run against a running server (sample accounts from init_data.py):
+    python scripts/bench_login_load.py --url http://localhost:8000 \
+        --email user@example.com --password user123 --readers 20 --logins 8 --duration 10
+
+Phase 1 runs only readers (GET /api/stories/{id}/start of the first story);
+phase 2 runs the same readers while --logins clients log in back to back.
+Reader p99 should stay roughly flat between the two phases.
+"""
+import argparse
+import asyncio
+import time
+from typing import List, Optional
+
+import httpx
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of latencies in milliseconds"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summary(label: str, latencies: List[float], errors: int, seconds: float) -> str:
+    return (
+        f"{label:<22} {len(latencies):>7} {len(latencies) / seconds:>8.1f} "
+        f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} "
+        f"{percentile(latencies, 99):>8.1f} {max(latencies, default=0):>8.1f} {errors:>6}"
+    )
+
+
+async def client_loop(
+    client: httpx.AsyncClient,
+    method: str,
+    path: str,
+    deadline: float,
+    latencies: List[float],
+    errors: List[int],
+    json: Optional[dict] = None
+):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=json)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies.append((time.perf_counter() - started) * 1000)
+        else:
+            errors[0] += 1
+
+
+async def run_phase(
+    client: httpx.AsyncClient,
+    reader_path: str,
+    readers: int,
+    logins: int,
+    credentials: dict,
+    duration: float
+):
+    deadline = time.perf_counter() + duration
+    reader_latencies: List[float] = []
+    login_latencies: List[float] = []
+    reader_errors, login_errors = [0], [0]
+
+    tasks = [
+        client_loop(client, "GET", reader_path, deadline, reader_latencies, reader_errors)
+        for _ in range(readers)
+    ]
+    tasks += [
+        client_loop(client, "POST", "/api/auth/login", deadline, login_latencies, login_errors, credentials)
+        for _ in range(logins)
+    ]
+    await asyncio.gather(*tasks)
+    return reader_latencies, reader_errors[0], login_latencies, login_errors[0]
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.readers + args.logins)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        stories = (await client.get("/api/stories")).json()
+        if not stories:
+            raise SystemExit("No active stories; run scripts/init_data.py first")
+        reader_path = args.path or f"/api/stories/{stories[0]['id']}/start"
+        credentials = {"email": args.email, "password": args.password}
+
+        response = await client.post("/api/auth/login", json=credentials)
+        if response.status_code != 200:
+            raise SystemExit(f"Login failed ({response.status_code}); check --email / --password")
+
+        # Warm caches before measuring
+        await run_phase(client, reader_path, args.readers, 0, credentials, 1)
+
+        print(f"Readers: {args.readers} x GET {reader_path}, {args.duration:.0f}s per phase\n")
+        print(f"{'':<22} {'count':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>6}")
+
+        readers, reader_errors, _, _ = await run_phase(
+            client, reader_path, args.readers, 0, credentials, args.duration
+        )
+        print(summary("readers only", readers, reader_errors, args.duration))
+
+        readers, reader_errors, logins, login_errors = await run_phase(
+            client, reader_path, args.readers, args.logins, credentials, args.duration
+        )
+        print(summary(f"readers + {args.logins} logins", readers, reader_errors, args.duration))
+        print(summary("  logins", logins, login_errors, args.duration))
+
+        stats = await client.get("/api/admin/stats/password-hashing", headers=args.admin_headers)
+        if stats.status_code == 200:
+            print(f"\nPassword hasher: {stats.json()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", default="user@example.com")
+    parser.add_argument("--password", default="user123")
+    parser.add_argument("--path", help="Reader endpoint (default: start passage of the first story)")
+    parser.add_argument("--readers", type=int, default=20, help="Concurrent reader clients")
+    parser.add_argument("--logins", type=int, default=8, help="Concurrent login clients in phase 2")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per phase")
+    parser.add_argument("--admin-token", help="Bearer token to print the hasher counters at the end")
+    args = parser.parse_args()
+    args.admin_headers = {"Authorization": f"Bearer {args.admin_token}"} if args.admin_token else {}
+    asyncio.run(main(args))
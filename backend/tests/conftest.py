@@ -1,9 +1,18 @@
 import pytest
-import asyncio
-from typing import Generator
+from sqlalchemy import create_engine
+from app.database import Base, _apply_pragmas
+from app.models.analytics import counter_trigger_statements
 
-@pytest.fixture(scope="session")
-def event_loop() -> Generator:
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A file database with the full schema and counter triggers, as init_db creates it"""
+    path = tmp_path / "app.db"
+    engine = create_engine(f"sqlite:///{path}")
+    _apply_pragmas(engine, read_only=False)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for statement in counter_trigger_statements():
+            conn.exec_driver_sql(statement)
+    engine.dispose()
+    return path
@@ -0,0 +1,90 @@
+"""
+Bulk bookmark sync
+Only the difference between the stored and the requested set is written;
+unknown passages are reported, other users' bookmarks are untouched.
+"""
+import asyncio
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.database import _apply_pragmas
+from app.models import Story, Passage, User, Bookmark
+from app.routers import bookmarks
+from app.routers.bookmarks import sync_bookmarks
+from app.schemas.bookmark import BookmarkSyncRequest
+from app.services.user_cache import CachedUser
+
+READER = CachedUser(id="u1", name="U1", role="user")
+
+
+def run_with_bookmarks(db_path, scenario):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        _apply_pragmas(engine.sync_engine, read_only=False)
+        maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            async with maker() as db:
+                await db.execute(insert(User), [
+                    {"id": f"u{i}", "email": f"u{i}@example.com", "password": "x", "name": f"U{i}"}
+                    for i in (1, 2)
+                ])
+                await db.execute(insert(Story), [{"id": "s1", "name": "S1"}])
+                await db.execute(insert(Passage), [
+                    {"id": f"p{i}", "story_id": "s1", "passage_number": i, "name": f"P{i}"} for i in range(1, 5)
+                ])
+                await db.execute(insert(Bookmark), [
+                    {"id": "b1", "user_id": "u1", "passage_id": "p1", "created_at": "2020-01-01T09:00:00"},
+                    {"id": "b2", "user_id": "u1", "passage_id": "p2", "created_at": "2020-01-01T10:00:00"},
+                    {"id": "b3", "user_id": "u2", "passage_id": "p3", "created_at": "2020-01-01T10:00:00"},
+                ])
+                await db.commit()
+                await scenario(db)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+async def stored(db, user_id: str):
+    result = await db.execute(select(Bookmark.id, Bookmark.passage_id).where(Bookmark.user_id == user_id))
+    return dict(result.all())
+
+
+def test_sync_writes_the_difference(db_path):
+    async def scenario(db):
+        response = await sync_bookmarks(
+            BookmarkSyncRequest(passage_ids=["p2", "p3", "p3", "gone"]), db=db, user=READER
+        )
+        assert (response.added, response.removed, response.ignored) == (1, 1, ["gone"])
+        assert [(b.passage_id, b.passage_name, b.story_name) for b in response.bookmarks] == [
+            ("p3", "P3", "S1"),
+            ("p2", "P2", "S1"),
+        ]
+
+        rows = await stored(db, "u1")
+        # The kept bookmark is not rewritten
+        assert rows["b2"] == "p2"
+        assert sorted(rows.values()) == ["p2", "p3"]
+        assert await stored(db, "u2") == {"b3": "p3"}
+
+        response = await sync_bookmarks(BookmarkSyncRequest(passage_ids=["p3", "p2"]), db=db, user=READER)
+        assert (response.added, response.removed, response.ignored) == (0, 0, [])
+
+        response = await sync_bookmarks(BookmarkSyncRequest(passage_ids=[]), db=db, user=READER)
+        assert (response.added, response.removed, response.bookmarks) == (0, 2, [])
+        assert await stored(db, "u2") == {"b3": "p3"}
+
+    run_with_bookmarks(db_path, scenario)
+
+
+def test_sync_rejects_oversized_sets(db_path, monkeypatch):
+    monkeypatch.setattr(bookmarks.settings, "BOOKMARK_SYNC_MAX_ITEMS", 2)
+
+    async def scenario(db):
+        with pytest.raises(HTTPException) as error:
+            await sync_bookmarks(BookmarkSyncRequest(passage_ids=["p1", "p2", "p3"]), db=db, user=READER)
+        assert error.value.status_code == 413
+        assert sorted((await stored(db, "u1")).values()) == ["p1", "p2"]
+
+    run_with_bookmarks(db_path, scenario)
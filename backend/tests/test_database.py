@@ -0,0 +1,107 @@
+"""
+Connection profile and counter reconciliation
+Foreign keys are enforced on every connection, so ondelete= clauses work
+and rows pointing at deleted parents are rejected.
+"""
+import asyncio
+import pytest
+from sqlalchemy import create_engine, insert, delete, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.database import _apply_pragmas
+from app.models import Story, Passage, VisitLog, Feedback, User
+from app.services import stat_counters
+
+
+@pytest.fixture
+def conn(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    _apply_pragmas(engine, read_only=False)
+    with engine.begin() as connection:
+        yield connection
+    engine.dispose()
+
+
+def seed(conn):
+    conn.execute(insert(User), [{"id": "u1", "email": "u1@example.com", "password": "x", "name": "U1"}])
+    conn.execute(insert(Story), [{"id": "s1", "name": "S1"}])
+    conn.execute(insert(Passage), [
+        {"id": "p1", "story_id": "s1", "passage_number": 1, "name": "P1"},
+        {"id": "p2", "story_id": "s1", "passage_number": 2, "name": "P2"},
+    ])
+
+
+def test_pragmas_on_every_connection(db_path):
+    for read_only in (False, True):
+        engine = create_engine(f"sqlite:///{db_path}")
+        _apply_pragmas(engine, read_only=read_only)
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+            assert connection.exec_driver_sql("PRAGMA query_only").scalar() == int(read_only)
+        engine.dispose()
+
+
+def test_rejects_rows_of_missing_parents(conn):
+    seed(conn)
+    with pytest.raises(IntegrityError):
+        with conn.begin_nested():
+            conn.execute(insert(VisitLog), [{"id": "v1", "story_id": "s1", "passage_id": "gone"}])
+    with pytest.raises(IntegrityError):
+        with conn.begin_nested():
+            conn.execute(insert(Passage), [{"id": "p3", "story_id": "gone", "name": "P3"}])
+
+
+def test_delete_cascades_and_sets_null(conn):
+    seed(conn)
+    conn.execute(insert(VisitLog), [
+        {"id": "v1", "user_id": "u1", "story_id": "s1", "passage_id": "p1"},
+        {"id": "v2", "user_id": "u1", "story_id": "s1", "passage_id": "p2"},
+    ])
+    conn.execute(insert(Feedback), [{"id": "f1", "user_id": "u1", "passage_id": "p2", "content": "hi"}])
+
+    conn.execute(delete(Passage).where(Passage.id == "p1"))
+    assert conn.execute(select(VisitLog.id)).scalars().all() == ["v2"]
+
+    conn.execute(delete(User).where(User.id == "u1"))
+    assert conn.execute(select(VisitLog.user_id)).scalars().all() == [None]
+    assert conn.execute(select(Feedback.user_id)).scalars().all() == [None]
+
+    conn.execute(delete(Story).where(Story.id == "s1"))
+    assert conn.execute(select(Passage.id)).scalars().all() == []
+    assert conn.execute(select(VisitLog.id)).scalars().all() == []
+    assert conn.execute(select(Feedback.id)).scalars().all() == []
+
+
+def test_reconcile_applies_drift_only(db_path, monkeypatch):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        read_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        _apply_pragmas(read_engine.sync_engine, read_only=True)
+        maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        monkeypatch.setattr(stat_counters, "async_session_maker", maker)
+        monkeypatch.setattr(
+            stat_counters, "async_read_session_maker",
+            async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+        )
+        try:
+            async with maker() as db:
+                await db.execute(insert(Story), [{"id": f"s{i}", "name": f"S{i}"} for i in range(3)])
+                await db.execute(text("UPDATE stat_counters SET value = 10 WHERE name = 'stories'"))
+                await db.execute(text("DELETE FROM stat_counters WHERE name = 'passages'"))
+                await db.commit()
+
+            report = await stat_counters.reconcile_counters()
+            assert report["stories"] == {"value": 3, "drift": 7}
+            assert report["passages"] == {"value": 0, "drift": 0}
+
+            async with maker() as db:
+                await db.execute(insert(Story), [{"id": "s3", "name": "S3"}])
+                await db.commit()
+                counters = await stat_counters.read_counters(db)
+            assert counters["stories"] == 4
+            assert counters["passages"] == 0
+        finally:
+            await engine.dispose()
+            await read_engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,34 @@
+"""
+Streaming exports
+Synchronous sources (archive files) are read on worker threads, in
+partitions, and closed when the stream stops early.
+"""
+import asyncio
+import threading
+from app.services.export_stream import batched
+
+
+def test_batched_reads_off_the_event_loop():
+    readers = set()
+    closed = []
+
+    def rows():
+        try:
+            for i in range(7):
+                readers.add(threading.get_ident())
+                yield {"id": i}
+        finally:
+            closed.append(True)
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        batches = [[row["id"] for row in batch] async for batch in batched(rows(), 3)]
+        assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+        assert loop_thread not in readers
+
+        stream = batched(rows(), 2)
+        assert len(await stream.__anext__()) == 2
+        await stream.aclose()
+
+    asyncio.run(scenario())
+    assert closed == [True, True]
@@ -0,0 +1,123 @@
+"""
+Keyset-paginated feedback listings
+Pages on (created_at, id) visit every top-level item exactly once, even
+when many share a timestamp; the admin page is enriched in fixed queries.
+"""
+import asyncio
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.models import Story, Passage, User, Feedback
+from app.routers.admin import admin_feedback_page_statement
+from app.services.feedback_threads import page_statement, split_page, page_items
+
+SAME_TIME = "2026-10-17T10:00:00"
+
+# (id, passage, created_at, parent, anonymous)
+FEEDBACK = [
+    ("f1", "p1", "2026-10-17T09:00:00", None, 0),
+    ("f2", "p2", SAME_TIME, None, 0),
+    ("f3", "p1", SAME_TIME, None, 1),
+    ("f4", "p3", SAME_TIME, None, 0),
+    ("f5", "p1", SAME_TIME, None, 0),
+    ("f6", None, SAME_TIME, None, 0),
+    ("f7", "p3", "2026-10-17T11:00:00", None, 0),
+    ("r1", "p1", "2026-10-17T12:00:00", "f5", 0),
+    ("r2", "p1", "2026-10-17T12:00:00", "f5", 0),
+    ("r3", "p1", "2026-10-17T12:00:00", "r1", 0),
+]
+NEWEST_FIRST = ["f7", "f6", "f5", "f4", "f3", "f2", "f1"]
+
+
+def run_with_feedback(db_path, scenario):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            async with maker() as db:
+                await db.execute(insert(User), [{"id": "u1", "email": "u1@example.com", "password": "x", "name": "Ann"}])
+                await db.execute(insert(Story), [{"id": "s1", "name": "S1"}, {"id": "s2", "name": "S2"}])
+                await db.execute(insert(Passage), [
+                    {"id": "p1", "story_id": "s1", "name": "P1"},
+                    {"id": "p2", "story_id": "s1", "name": "P2"},
+                    {"id": "p3", "story_id": "s2", "name": "P3"},
+                ])
+                await db.execute(insert(Feedback), [
+                    {
+                        "id": feedback_id, "user_id": "u1", "passage_id": passage_id, "content": feedback_id,
+                        "created_at": created_at, "parent_id": parent_id, "is_anonymous": anonymous
+                    }
+                    for feedback_id, passage_id, created_at, parent_id, anonymous in FEEDBACK
+                ])
+                await db.commit()
+                await scenario(db)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+async def walk(db, build, limit: int):
+    """Follow next_cursor to the end; returns the ids of every page"""
+    pages, cursor = [], None
+    while True:
+        result = await db.execute(build(limit, cursor))
+        rows = result.all()
+        feedbacks, cursor = split_page([row[0] for row in rows], limit)
+        pages.append([f.id for f in feedbacks])
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 20])
+def test_pages_cover_equal_timestamps_once(db_path, limit):
+    async def scenario(db):
+        pages = await walk(db, page_statement, limit)
+        assert sum(pages, []) == NEWEST_FIRST
+        assert all(len(page) == limit for page in pages[:-1])
+
+        pages = await walk(db, lambda n, cursor: page_statement(n, cursor, Feedback.passage_id == "p1"), limit)
+        assert sum(pages, []) == ["f5", "f3", "f1"]
+
+    run_with_feedback(db_path, scenario)
+
+
+def test_admin_page_filters_by_story_and_joins_names(db_path):
+    async def scenario(db):
+        pages = await walk(db, lambda n, cursor: admin_feedback_page_statement(n, cursor, "s1"), 2)
+        assert sum(pages, []) == ["f5", "f3", "f2", "f1"]
+
+        rows = (await db.execute(admin_feedback_page_statement(3, None))).all()
+        assert [(row[0].id, *row[1:]) for row in rows] == [
+            ("f7", "P3", "s2", "S2"),
+            ("f6", None, None, None),
+            ("f5", "P1", "s1", "S1"),
+            ("f4", "P3", "s2", "S2"),
+        ]
+
+    run_with_feedback(db_path, scenario)
+
+
+def test_malformed_cursor():
+    for cursor in ["not-base64!", "W10=", "WzEsIDJd"]:
+        with pytest.raises(ValueError):
+            admin_feedback_page_statement(5, cursor)
+
+
+def test_page_items(db_path):
+    async def scenario(db):
+        feedbacks = (await db.execute(select(Feedback).where(Feedback.id.in_(["f5", "f3"])))).scalars().all()
+        feedbacks.sort(key=lambda f: f.id, reverse=True)
+
+        items = await page_items(db, feedbacks)
+        assert [(item.id, item.user_name, item.reply_count) for item in items] == [
+            ("f5", "Ann", 2),
+            ("f3", None, 0),
+        ]
+        assert items[1].user_id is None
+
+        items = await page_items(db, feedbacks, expand_replies=True)
+        assert [reply.id for reply in items[0].replies] == ["r1", "r2"]
+        assert [reply.id for reply in items[0].replies[0].replies] == ["r3"]
+
+    run_with_feedback(db_path, scenario)
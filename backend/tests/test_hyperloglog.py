@@ -0,0 +1,70 @@
+"""
+HyperLogLog distinct counter
+Estimates stay within a few standard errors, unions equal the sketch of
+all values, and folding to a lower precision is exact.
+"""
+import pytest
+from app.services.hyperloglog import HyperLogLog
+from app.services.visit_rollups import union_sketches
+
+
+def sketch(values, precision: int = 12) -> HyperLogLog:
+    hll = HyperLogLog(precision)
+    for value in values:
+        hll.add(value)
+    return hll
+
+
+def users(start: int, stop: int):
+    return [f"user-{i}" for i in range(start, stop)]
+
+
+@pytest.mark.parametrize("n", [0, 1, 100, 5000, 50000])
+def test_count_accuracy(n):
+    # 1.04 / sqrt(4096) ~ 1.6% standard error; allow four of them
+    assert abs(sketch(users(0, n)).count() - n) <= max(2, 0.065 * n)
+
+
+def test_add_reports_changes():
+    hll = HyperLogLog()
+    assert hll.add("reader")
+    assert not hll.add("reader")
+
+
+def test_merge_equals_sketch_of_union():
+    left, right = sketch(users(0, 3000)), sketch(users(2000, 6000))
+    assert left.merge(right)
+    assert left.registers == sketch(users(0, 6000)).registers
+    assert not left.merge(right)
+
+
+@pytest.mark.parametrize("high, low", [(14, 12), (12, 4), (16, 10)])
+def test_fold_is_exact(high, low):
+    values = users(0, 20000)
+    assert sketch(values, high).fold(low).registers == sketch(values, low).registers
+
+
+def test_fold_cannot_raise_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(10).fold(12)
+
+
+def test_merge_meets_at_lower_precision():
+    low, high = sketch(users(0, 3000), 10), sketch(users(2000, 6000), 14)
+    union = sketch(users(0, 6000), 10)
+
+    merged = HyperLogLog.from_bytes(high.to_bytes())
+    merged.merge(low)
+    assert merged.precision == 10
+    assert merged.registers == union.registers
+
+    low.merge(high)
+    assert low.registers == union.registers
+
+
+def test_union_of_stored_sketches():
+    blobs = [sketch(users(0, 1000), 12).to_bytes(), sketch(users(500, 2000), 13).to_bytes()]
+    union = union_sketches(blobs)
+    assert union.precision == 12
+    assert union.registers == sketch(users(0, 2000), 12).registers
+    assert union_sketches([]) is None
@@ -0,0 +1,96 @@
+"""
+bcrypt off the event loop
+At most max_workers hashes run and max_queue wait; anything beyond is
+rejected with PasswordHasherBusy, which the auth routes turn into a 503.
+"""
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.core.password_hasher import PasswordHasher, PasswordHasherBusy
+from app.core.security import get_password_hash
+from app.models import User
+from app.routers import auth
+from app.routers.auth import login, register
+from app.schemas.user import UserCreate, UserLogin
+
+
+def test_queue_limit_rejects_overflow():
+    async def scenario():
+        hasher = PasswordHasher(max_workers=1, max_queue=1)
+        gate = threading.Event()
+        try:
+            # Occupy the only worker, then fill the queue
+            running = asyncio.create_task(hasher._run(gate.wait))
+            await asyncio.sleep(0)
+            waiting = asyncio.create_task(hasher.hash("secret"))
+            await asyncio.sleep(0)
+
+            with pytest.raises(PasswordHasherBusy):
+                await hasher.verify("secret", "not-a-hash")
+            stats = hasher.get_stats()
+            assert (stats["running"], stats["waiting"], stats["rejected"]) == (1, 1, 1)
+
+            gate.set()
+            await running
+            assert await hasher.verify("secret", await waiting)
+            stats = hasher.get_stats()
+            assert (stats["completed"], stats["waiting"], stats["max_waiting"]) == (3, 0, 1)
+        finally:
+            gate.set()
+            hasher.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_no_queueing_still_serves_idle_workers():
+    async def scenario():
+        hasher = PasswordHasher(max_workers=1, max_queue=0)
+        try:
+            assert await hasher.verify("secret", await hasher.hash("secret"))
+            assert hasher.get_stats()["rejected"] == 0
+        finally:
+            hasher.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_auth_routes_answer_503_when_busy(db_path, monkeypatch):
+    hasher = PasswordHasher(max_workers=1, max_queue=0)
+    monkeypatch.setattr(auth, "password_hasher", hasher)
+    credentials = UserLogin(email="u1@example.com", password="secret")
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        gate = threading.Event()
+        try:
+            async with maker() as db:
+                await db.execute(insert(User), [
+                    {"id": "u1", "email": "u1@example.com", "password": get_password_hash("secret"), "name": "U1"}
+                ])
+                await db.commit()
+
+                # Saturate the only worker; with no queue every further sign-in is turned away
+                running = asyncio.create_task(hasher._run(gate.wait))
+                await asyncio.sleep(0)
+
+                with pytest.raises(HTTPException) as error:
+                    await login(credentials, db=db)
+                assert error.value.status_code == 503
+
+                with pytest.raises(HTTPException) as error:
+                    await register(UserCreate(email="u2@example.com", password="secret", name="U2"), db=db)
+                assert error.value.status_code == 503
+
+                gate.set()
+                await running
+                assert (await login(credentials, db=db)).access_token
+        finally:
+            gate.set()
+            hasher.shutdown()
+            await engine.dispose()
+
+    asyncio.run(scenario())
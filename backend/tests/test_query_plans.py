@@ -0,0 +1,121 @@
+"""
+EXPLAIN QUERY PLAN regression suite
+Every hot query must be answered through an index; a plain
+"SCAN <table>" (full table scan) fails the test.
+"""
+import re
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.pool import StaticPool
+from app.database import Base
+from app.models import Link, Feedback, Bookmark, VisitLog, PassageReaderSketch
+from app.services.story_cache import story_graph_statement, passage_story_subquery
+from app.services.feedback_threads import (
+    thread_statement, page_statement, reply_count_statement, encode_cursor
+)
+from app.services.transition_matrix import visit_totals_statement, transition_totals_statement
+from app.services.visit_rollups import stored_sketches_statement
+from app.services.reading_sessions import session_statement, stored_visits_statement
+from app.routers.bookmarks import bookmark_listing, bookmarked_passages, bookmark_removal
+from app.routers.admin_csv import passage_export_statement, link_export_statement
+from app.routers.admin_export import visit_export_statement
+from app.routers.admin import (
+    max_passage_number_statement, passage_visits_statement, story_visits_statement,
+    transition_counts_statement, timeseries_statement, dwell_histogram_statement,
+    story_sketches_statement, passage_sketches_statement, heatmap_statements,
+    admin_feedback_page_statement
+)
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+# Scanning a CTE's own (already indexed) result set is expected
+MATERIALIZED = re.compile(r"^MATERIALIZE (\w+)$")
+
+CURSOR = encode_cursor(Feedback(id="f1", created_at="2026-10-17T10:00:00"))
+
+
+@pytest.fixture(scope="module")
+def conn():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+
+def query_plan(conn, statement) -> list:
+    sql = str(statement.compile(conn.engine, compile_kwargs={"literal_binds": True}))
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return [row[3] for row in rows]
+
+
+DAY_RANGE = ("day", "2026-10-01", "2026-10-17")
+HOUR_RANGE = ("hour", "2026-10-17T00", "2026-10-17T23")
+
+# The statements the routes and services execute, built by their own functions
+HOT_QUERIES = {
+    # StoryEngine / StoryGraphCache
+    "story_graph_by_story": story_graph_statement("s1"),
+    "story_graph_by_passage": story_graph_statement(passage_story_subquery("p1")),
+
+    # Story editor
+    "next_passage_number": max_passage_number_statement("s1"),
+    "export_passages": passage_export_statement("s1"),
+    "export_links": link_export_statement("s1"),
+    "export_visits_by_story": visit_export_statement("s1", "2026-10-01", "2026-10-18"),
+
+    # Admin statistics
+    "passage_rollups": passage_visits_statement("day", "2026-10-01", None),
+    "passage_rollups_by_story": passage_visits_statement(*HOUR_RANGE, story_id="s1"),
+    "story_rollups": story_visits_statement("day", None, None),
+    "transition_rollups_by_story": transition_counts_statement("s1", *DAY_RANGE),
+    "timeseries": timeseries_statement(*HOUR_RANGE),
+    "timeseries_by_story": timeseries_statement(*DAY_RANGE, story_id="s1"),
+    "dwell_histograms": dwell_histogram_statement(*DAY_RANGE),
+    "dwell_histograms_by_story": dwell_histogram_statement(*DAY_RANGE, story_id="s1"),
+    "story_reader_sketches": story_sketches_statement("2026-10-01", "2026-10-17"),
+    "story_reader_sketches_by_story": story_sketches_statement("2026-10-01", None, "s1"),
+    "passage_reader_sketches": passage_sketches_statement("s1", "2026-10-01", "2026-10-17"),
+    **{
+        f"heatmap_{source}": statement
+        for source, statement in heatmap_statements("s1", *DAY_RANGE).items()
+    },
+    "transition_matrix_visits": visit_totals_statement("s1"),
+    "transition_matrix_transitions": transition_totals_statement("s1"),
+    "reader_sketch_ingest": stored_sketches_statement(
+        PassageReaderSketch, "passage_id", [("2026-10-17", "p1"), ("2026-10-17", "p2")]
+    ),
+
+    # Feedback threads
+    "feedback_page": page_statement(20, CURSOR),
+    "feedback_page_by_passage": page_statement(20, CURSOR, Feedback.passage_id == "p1"),
+    "feedback_admin_page": admin_feedback_page_statement(20, CURSOR),
+    "feedback_admin_page_by_story": admin_feedback_page_statement(20, CURSOR, "s1"),
+    "feedback_page_reply_counts": reply_count_statement(["f1", "f2"]),
+    "feedback_thread_replies": thread_statement(Feedback.parent_id == "f1"),
+    "feedback_threads_for_page": thread_statement(Feedback.id.in_(["f1", "f2"])),
+
+    # Bookmarks
+    "bookmark_listing": bookmark_listing("u1"),
+    "bookmark_sync_current": bookmarked_passages("u1"),
+    "bookmark_removal": bookmark_removal("u1", ["p1", "p2"]),
+
+    # Reading sessions
+    "reading_session": session_statement("u1", "s1"),
+    "reading_session_flush": stored_visits_statement([("u1", "s1"), ("u2", "s2")]),
+
+    # Lookups SQLite itself runs for ON DELETE CASCADE / SET NULL (no application code builds these)
+    "fk_links_by_target": select(Link.id).where(Link.target_passage_id == "p1"),
+    "fk_visits_by_passage": select(VisitLog.id).where(VisitLog.passage_id == "p1"),
+    "fk_visits_by_user": select(VisitLog.id).where(VisitLog.user_id == "u1"),
+    "fk_feedback_by_parent": select(Feedback.id).where(Feedback.parent_id == "f1"),
+    "fk_bookmarks_by_passage": select(Bookmark.id).where(Bookmark.passage_id == "p1"),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(conn, name):
+    plan = query_plan(conn, HOT_QUERIES[name])
+    steps = [step.strip() for step in plan]
+    ctes = {m.group(1) for m in map(MATERIALIZED.match, steps) if m}
+    full_scans = [step for step in steps if FULL_SCAN.match(step) and FULL_SCAN.match(step).group(1) not in ctes]
+    assert not full_scans, f"{name} falls back to a full table scan: {plan}"
@@ -0,0 +1,155 @@
+"""
+Transition matrix, flow and funnel statistics
+Matrices are seeded from the daily rollups, follow committed visit batches
+and are rebuilt once ttl_seconds old; funnels never modify the shared matrix.
+"""
+import asyncio
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.models import Story, Passage, Link, PassageVisitRollup, TransitionRollup
+from app.services.story_cache import compile_story
+from app.services.transition_matrix import (
+    TransitionMatrix, TransitionMatrixCache, passage_flow, link_probabilities, story_funnel,
+    transition_rows, reach_probabilities
+)
+
+NOW = "2026-10-17T10:00:00"
+PASSAGES = [("p1", "start"), ("p2", "branch"), ("p3", "end"), ("p4", "end")]
+LINKS = [("l1", "p1", "p2"), ("l2", "p2", "p3"), ("l3", "p2", "p4")]
+
+
+@pytest.fixture
+def compiled():
+    story = Story(id="s1", name="S", is_active=True, zoom=1.0, sort_order=0, created_at=NOW, updated_at=NOW)
+    passages = [
+        Passage(
+            id=passage_id, story_id="s1", passage_number=number, name=passage_id.upper(),
+            passage_type=passage_type, tags="[]", position_x=0, position_y=0, width=100, height=100,
+            created_at=NOW, updated_at=NOW
+        )
+        for number, (passage_id, passage_type) in enumerate(PASSAGES, start=1)
+    ]
+    links = [
+        Link(
+            id=link_id, story_id="s1", source_passage_id=source, target_passage_id=target,
+            name=target.upper(), condition_type="always", link_order=order
+        )
+        for order, (link_id, source, target) in enumerate(LINKS)
+    ]
+    return compile_story(story, passages, links)
+
+
+def observed_matrix() -> TransitionMatrix:
+    # 10 readers start, 8 go on to the branch, 5 and 2 of them reach the two endings
+    matrix = TransitionMatrix(story_id="s1")
+    for passage_id, visits in [("p1", 10), ("p2", 8), ("p3", 5), ("p4", 2)]:
+        matrix.add_visits(passage_id, visits)
+    matrix.add_transition("p1", "p2", 8)
+    matrix.add_transition("p2", "p3", 5)
+    matrix.add_transition("p2", "p4", 2)
+    return matrix
+
+
+def test_flow_and_link_probabilities(compiled):
+    matrix = observed_matrix()
+
+    flow = {entry["passage_id"]: entry for entry in passage_flow(compiled, matrix)}
+    assert (flow["p1"]["onward_count"], flow["p1"]["drop_off_count"]) == (8, 2)
+    assert flow["p2"]["drop_off_rate"] == pytest.approx(1 / 8)
+    assert flow["p3"]["drop_off_rate"] == 1.0
+
+    links = {entry["link_id"]: entry for entry in link_probabilities(compiled, matrix)}
+    assert links["l1"]["probability"] == pytest.approx(0.8)
+    assert links["l2"]["probability"] == pytest.approx(5 / 8)
+    assert links["l3"]["traversal_count"] == 2
+
+
+def test_funnel(compiled):
+    funnel = asyncio.run(story_funnel(compiled, observed_matrix()))
+    assert funnel["start_passage_id"] == "p1"
+    assert funnel["completed_count"] == 7
+    assert funnel["completion_rate"] == pytest.approx(0.7)
+
+    ends = {end["passage_id"]: end for end in funnel["ends"]}
+    assert ends["p3"]["reach_probability"] == pytest.approx(0.8 * 5 / 8)
+    assert ends["p4"]["reach_probability"] == pytest.approx(0.8 * 2 / 8)
+
+
+def test_reach_solves_all_targets_with_cycles():
+    # Readers loop back from the branch to the start before reaching an ending
+    matrix = observed_matrix()
+    matrix.add_transition("p2", "p1", 1)
+    rows = transition_rows(matrix)
+    index = matrix.index
+
+    p3, p4, p2 = reach_probabilities(rows, index["p1"], [index["p3"], index["p4"], index["p2"]])
+    # r1 = 0.8 r2, r2 = 5/8 + 1/8 r1  =>  r2 = (5/8) / 0.9
+    assert p3 == pytest.approx(0.8 * (5 / 8) / 0.9)
+    assert p4 == pytest.approx(0.8 * (2 / 8) / 0.9)
+    assert p2 == pytest.approx(0.8)
+    assert reach_probabilities(rows, index["p3"], [index["p1"], index["p3"]]) == [0.0, 1.0]
+
+
+def test_funnel_does_not_touch_the_matrix(compiled):
+    matrix = TransitionMatrix(story_id="s1")
+    matrix.add_visits("p1", 3)
+
+    funnel = asyncio.run(story_funnel(compiled, matrix, ["p3", "missing"]))
+    assert matrix.passage_ids == ["p1"]
+    assert [(end["passage_id"], end["reach_probability"]) for end in funnel["ends"]] == [("p3", 0.0)]
+
+
+def test_cache_follows_batches_and_expires(db_path, compiled):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        cache = TransitionMatrixCache(ttl_seconds=300)
+        try:
+            async with maker() as db:
+                await db.execute(insert(Story), [{"id": "s1", "name": "S"}])
+                await db.execute(insert(Passage), [
+                    {"id": passage_id, "story_id": "s1", "name": passage_id} for passage_id, _ in PASSAGES
+                ])
+                await db.execute(insert(PassageVisitRollup), [
+                    {"granularity": granularity, "bucket": bucket, "story_id": "s1", "passage_id": "p1", "visit_count": 4}
+                    for granularity, bucket in [("day", "2026-10-16"), ("day", "2026-10-17"), ("hour", "2026-10-17T09")]
+                ])
+                await db.execute(insert(TransitionRollup), [
+                    {"granularity": "day", "bucket": "2026-10-17", "story_id": "s1",
+                     "from_passage_id": "p1", "to_passage_id": "p2", "transition_count": 3}
+                ])
+                await db.commit()
+
+                matrix = await cache.get(db, compiled)
+                # Slots follow passage ordering; hourly rollups are not double counted
+                assert matrix.passage_ids == ["p1", "p2", "p3", "p4"]
+                assert (matrix.visit_count("p1"), matrix.edge_count("p1", "p2")) == (8, 3)
+
+                cache.apply_batch([
+                    {"story_id": "s1", "passage_id": "p2", "previous_passage_id": "p1"},
+                    {"story_id": "other", "passage_id": "x", "previous_passage_id": None},
+                ])
+                assert await cache.get(db, compiled) is matrix
+                assert (matrix.visit_count("p2"), matrix.edge_count("p1", "p2")) == (1, 4)
+
+                cache._expires["s1"] = 0
+                reloaded = await cache.get(db, compiled)
+                assert reloaded is not matrix
+                assert reloaded.edge_count("p1", "p2") == 3
+
+                cache.invalidate("s1")
+                assert await cache.get(db, compiled) is not reloaded
+
+                # Batches of other stories during a load don't discard it; one of this Story does
+                for story_id, kept in [("other", True), ("s1", False)]:
+                    cache.invalidate("s1")
+                    loading = asyncio.create_task(cache.get(db, compiled))
+                    await asyncio.sleep(0)
+                    cache.apply_batch([{"story_id": story_id, "passage_id": "p1", "previous_passage_id": None}])
+                    loaded = await loading
+                    assert (cache._fresh("s1") is loaded) == kept
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
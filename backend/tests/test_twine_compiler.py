@@ -0,0 +1,87 @@
+"""
+Twine macro compiler
+Static parts (links, transclusions) are pre-rendered; macros, hooks and
+$variables stay source for the browser runtime.
+"""
+import pytest
+from app.models import Story, Passage
+from app.services.story_cache import compile_story
+from app.services.twine_compiler import parse_content, render_passage, TEXT, LINK, DISPLAY, MACRO
+
+NOW = "2026-10-17T10:00:00"
+
+
+def passage(id: str, number: int, name: str, content: str) -> Passage:
+    return Passage(
+        id=id, story_id="s1", passage_number=number, name=name, content=content,
+        passage_type="content", tags="[]", position_x=0, position_y=0, width=100, height=100,
+        created_at=NOW, updated_at=NOW
+    )
+
+
+def compiled_story(*passages: Passage):
+    story = Story(id="s1", name="S", is_active=True, zoom=1.0, sort_order=0, created_at=NOW, updated_at=NOW)
+    return compile_story(story, list(passages), [])
+
+
+def test_nested_macro_is_one_token():
+    assert parse_content("(set: $x to (a: 1, (b: 2)))!") == (
+        (MACRO, "(set: $x to (a: 1, (b: 2)))"),
+        (TEXT, "!"),
+    )
+
+
+def test_parentheses_in_macro_strings_are_skipped():
+    assert parse_content('(print: "a)b")x') == ((MACRO, '(print: "a)b")'), (TEXT, "x"))
+
+
+def test_unclosed_macro_is_text():
+    assert parse_content("(set: $x to 1") == ((TEXT, "(set: $x to 1"),)
+
+
+def test_static_macros_and_links():
+    assert parse_content('(display: "Side") [[Go->Side]] (link-goto: "Back", "Intro")') == (
+        (DISPLAY, "Side"),
+        (TEXT, " "),
+        (LINK, "Go", "Side"),
+        (TEXT, " "),
+        (LINK, "Back", "Intro"),
+    )
+
+
+@pytest.mark.parametrize("content", [
+    '(if: $x)[(display: "Side")]',
+    '(if: $x)[a [[Go->Side]] (display: "Side")]',
+    '(link-goto: "Back", "Intro")[hook]',
+])
+def test_hook_keeps_its_macro_dynamic(content):
+    assert parse_content(content) == ((MACRO, content),)
+
+
+def test_link_after_macro_is_not_a_hook():
+    assert parse_content("(set: $x to 1)[[Side]]") == ((MACRO, "(set: $x to 1)"), (LINK, "Side", "Side"))
+
+
+def test_render_expands_static_parts_only():
+    compiled = compiled_story(
+        passage("p1", 1, "Intro", '(if: $x)[(display: "Side")] [[Go <b>->Side]] (display: "Side")'),
+        passage("p2", 2, "Side", "side & text [[#1]]"),
+    )
+
+    rendered = render_passage(compiled, "p1")
+    assert rendered.html == (
+        '(if: $x)[(display: "Side")] '
+        '<a class="passage-link" data-passage="Side">Go &lt;b&gt;</a> '
+        'side & text <a class="passage-link" data-passage="Intro" data-passage-id="1">Intro</a>'
+    )
+    assert not rendered.is_static
+    assert render_passage(compiled, "p2").is_static
+
+
+def test_render_marks_missing_targets():
+    compiled = compiled_story(
+        passage("p1", 1, "Intro", '[[Lost->#9]] (display: "Nowhere") (display: "Intro")'),
+    )
+    html = render_passage(compiled, "p1").html
+    assert 'class="passage-link passage-link-broken" data-passage-id="9"' in html
+    assert html.count('class="passage-display-broken"') == 2
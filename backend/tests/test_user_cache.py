@@ -0,0 +1,108 @@
+"""
+Authenticated-user cache
+Fresh entries answer without a query; role and name changes invalidate
+the entry, and every entry is reloaded after ttl_seconds.
+"""
+import asyncio
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import insert, delete
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.core import dependencies
+from app.core.dependencies import get_current_user
+from app.core.security import create_access_token
+from app.models import User
+from app.routers import admin
+from app.routers.admin import update_user_role
+from app.schemas.user import UserUpdate
+from app.services.user_cache import UserCache, CachedUser
+
+
+def run_with_users(db_path, scenario):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            async with maker() as db:
+                await db.execute(insert(User), [
+                    {"id": f"u{i}", "email": f"u{i}@example.com", "password": "x", "name": f"U{i}", "role": "user"}
+                    for i in range(1, 4)
+                ])
+                await db.commit()
+                await scenario(db)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+def test_fresh_entries_skip_the_database(db_path):
+    cache = UserCache(ttl_seconds=60)
+
+    async def scenario(db):
+        assert await cache.get(db, "u1") == CachedUser(id="u1", name="U1", role="user")
+        await db.execute(delete(User).where(User.id == "u1"))
+        await db.commit()
+        assert (await cache.get(db, "u1")).name == "U1"
+
+        cache.invalidate("u1")
+        assert await cache.get(db, "u1") is None
+        # Unknown ids are not cached
+        assert await cache.get(db, "u1") is None
+        assert cache.get_stats() == {"hits": 1, "misses": 3, "expired": 0, "invalidated": 1, "cached": 0}
+
+    run_with_users(db_path, scenario)
+
+
+def test_entries_expire_after_ttl(db_path):
+    cache = UserCache(ttl_seconds=0)
+
+    async def scenario(db):
+        await cache.get(db, "u1")
+        await cache.get(db, "u1")
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["expired"]) == (0, 2, 1)
+
+    run_with_users(db_path, scenario)
+
+
+def test_least_recently_used_entries_are_evicted(db_path):
+    cache = UserCache(max_users=2)
+
+    async def scenario(db):
+        for user_id in ("u1", "u2", "u1", "u3"):
+            await cache.get(db, user_id)
+        assert cache.get_cached("u2") is None
+        assert cache.get_cached("u1") is not None
+        assert cache.get_cached("u3") is not None
+
+    run_with_users(db_path, scenario)
+
+
+def test_invalidation_while_loading_is_not_stored(db_path):
+    cache = UserCache()
+
+    async def scenario(db):
+        loading = asyncio.create_task(cache.get(db, "u1"))
+        await asyncio.sleep(0)
+        cache.invalidate("u1")
+        assert (await loading).id == "u1"
+        assert cache.get_cached("u1") is None
+
+    run_with_users(db_path, scenario)
+
+
+def test_role_change_reaches_the_next_request(db_path, monkeypatch):
+    cache = UserCache(ttl_seconds=60)
+    monkeypatch.setattr(dependencies, "user_cache", cache)
+    monkeypatch.setattr(admin, "user_cache", cache)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": "u2"}))
+
+    async def scenario(db):
+        assert (await get_current_user(credentials, db)).role == "user"
+
+        await update_user_role("u2", UserUpdate(role="admin", name="Boss"), db=db, admin=None)
+        user = await get_current_user(credentials, db)
+        assert (user.role, user.name) == ("admin", "Boss")
+        assert cache.get_stats()["invalidated"] == 1
+
+    run_with_users(db_path, scenario)
@@ -0,0 +1,55 @@
+"""
+Dwell-time beacon size limit
+Oversized bodies are refused from Content-Length or, without one, as soon
+as the streamed total passes BEACON_MAX_BYTES.
+"""
+import asyncio
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+from app.routers import visits
+from app.routers.visits import visit_beacon
+
+
+def beacon_request(chunks, headers=()):
+    """Request whose body arrives in the given chunks; records how many were read"""
+    sent = []
+
+    async def receive():
+        if len(sent) < len(chunks):
+            sent.append(chunks[len(sent)])
+            return {"type": "http.request", "body": sent[-1], "more_body": len(sent) < len(chunks)}
+        return {"type": "http.disconnect"}
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/api/visits/beacon",
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+    }
+    return Request(scope, receive), sent
+
+
+def test_beacon_size_limit(monkeypatch):
+    monkeypatch.setattr(visits.settings, "BEACON_MAX_BYTES", 10)
+    recorded = []
+    monkeypatch.setattr(visits.visit_log_writer, "record_duration", lambda *item: recorded.append(item))
+
+    async def scenario():
+        request, sent = beacon_request([b"x" * 8] * 4, [("content-length", "32")])
+        with pytest.raises(HTTPException) as error:
+            await visit_beacon(request)
+        assert error.value.status_code == 413
+        assert sent == []
+
+        # Chunked: stops reading at the chunk that crosses the limit
+        request, sent = beacon_request([b"x" * 8] * 4)
+        with pytest.raises(HTTPException) as error:
+            await visit_beacon(request)
+        assert error.value.status_code == 413
+        assert len(sent) == 2
+
+        request, _ = beacon_request([b'[{"visit_id"', b': "v7", "duration": 3}]'])
+        monkeypatch.setattr(visits.settings, "BEACON_MAX_BYTES", 64)
+        assert (await visit_beacon(request)).status_code == 204
+        assert recorded == [("v7", 3.0)]
+
+    asyncio.run(scenario())
@@ -0,0 +1,92 @@
+"""
+Batched visit-log writer
+Visits of passages deleted while queued are dropped instead of failing
+the batch; dwell-time beacons land in the INSERT or in a later UPDATE.
+"""
+import asyncio
+from sqlalchemy import insert, delete, select, func
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.database import _apply_pragmas
+from app.models import Story, Passage, User, VisitLog, PassageVisitRollup
+from app.services import visit_writer
+from app.services.visit_writer import VisitLogWriter
+
+
+def run_with_writer(db_path, monkeypatch, scenario, **writer_options):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        _apply_pragmas(engine.sync_engine, read_only=False)
+        maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        monkeypatch.setattr(visit_writer, "async_session_maker", maker)
+        try:
+            async with maker() as db:
+                await db.execute(insert(User), [
+                    {"id": f"u{i}", "email": f"u{i}@example.com", "password": "x", "name": f"U{i}"}
+                    for i in (1, 2)
+                ])
+                await db.execute(insert(Story), [{"id": "s1", "name": "S1"}])
+                await db.execute(insert(Passage), [
+                    {"id": "p1", "story_id": "s1", "passage_number": 1, "name": "P1"},
+                    {"id": "p2", "story_id": "s1", "passage_number": 2, "name": "P2"},
+                ])
+                await db.commit()
+            await scenario(maker, VisitLogWriter(**writer_options))
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+def test_flush_drops_visits_of_deleted_passages(db_path, monkeypatch):
+    async def scenario(maker, writer):
+        first = writer.record("p1", "s1", "u1")
+        writer.record("p2", "s1", "u1", previous_passage_id="p1")
+        writer.record("p1", "s1", "u2", previous_passage_id="p2")
+        writer.record_duration(first, 12.4)
+
+        async with maker() as db:
+            await db.execute(delete(Passage).where(Passage.id == "p2"))
+            await db.execute(delete(User).where(User.id == "u2"))
+            await db.commit()
+
+        await writer.flush_pending()
+
+        async with maker() as db:
+            rows = (await db.execute(
+                select(VisitLog.passage_id, VisitLog.user_id, VisitLog.duration_seconds)
+                .order_by(VisitLog.user_id.desc())
+            )).all()
+            visits = (await db.execute(
+                select(func.sum(PassageVisitRollup.visit_count))
+                .where(PassageVisitRollup.passage_id == "p1", PassageVisitRollup.granularity == "day")
+            )).scalar()
+
+        assert [tuple(row) for row in rows] == [("p1", "u1", 12), ("p1", None, None)]
+        assert visits == 2
+        stats = writer.get_stats()
+        assert (stats["written"], stats["orphaned"], stats["failed"]) == (2, 1, 0)
+
+    run_with_writer(db_path, monkeypatch, scenario)
+
+
+def test_late_durations_are_updated_in_batches(db_path, monkeypatch):
+    async def scenario(maker, writer):
+        visit_ids = [writer.record("p1", "s1", "u1") for _ in range(3)]
+        await writer.flush_pending()
+        assert writer.get_stats()["flushes"] == 2
+
+        for seconds, visit_id in enumerate(visit_ids, start=5):
+            writer.record_duration(visit_id, seconds)
+        # Only the longest report per visit is kept while pending
+        writer.record_duration(visit_ids[0], 1)
+        writer.record_duration(visit_ids[0], 9)
+        await writer.flush_pending()
+
+        async with maker() as db:
+            durations = dict((await db.execute(select(VisitLog.id, VisitLog.duration_seconds))).all())
+
+        assert [durations[visit_id] for visit_id in visit_ids] == [9, 6, 7]
+        stats = writer.get_stats()
+        assert (stats["durations_written"], stats["durations_pending"], stats["flushes"]) == (3, 0, 4)
+
+    run_with_writer(db_path, monkeypatch, scenario, batch_size=2)
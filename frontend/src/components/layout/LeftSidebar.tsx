@@ -3,6 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import { ChevronLeft, ChevronRight, Bookmark, List, History } from 'lucide-react';
 import { useUIStore } from '../../stores/uiStore';
 import { useStoryStore } from '../../stores/storyStore';
+import { useAuthStore } from '../../stores/authStore';
 import type { Link as LinkType } from '../../types';
 
 interface LeftSidebarProps {
@@ -24,6 +25,7 @@ export const LeftSidebar: React.FC<LeftSidebarProps> = () => {
     fetchStories,
     startStory,
   } = useStoryStore();
+  const { isAuthenticated } = useAuthStore();
 
   useEffect(() => {
     fetchStories();
@@ -132,7 +134,7 @@ export const LeftSidebar: React.FC<LeftSidebarProps> = () => {
                 <li key={story.id}>
                   <button
                     onClick={async () => {
-                      await startStory(story.id);
+                      await startStory(story.id, isAuthenticated);
                       // Navigate to /passage - PassagePage will load from currentPassage state
                       navigate('/passage');
                     }}
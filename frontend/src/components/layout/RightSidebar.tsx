@@ -4,7 +4,8 @@ import { useUIStore } from '../../stores/uiStore';
 import { useStoryStore } from '../../stores/storyStore';
 import { useAuthStore } from '../../stores/authStore';
 import api from '../../services/api';
-import type { Feedback } from '../../types';
+import { subscribeFeedback, type FeedbackEvent } from '../../services/feedbackStream';
+import type { Feedback, FeedbackPage } from '../../types';
 import { Button } from '../common';
 
 interface FeedbackItemProps {
@@ -30,8 +31,28 @@ const FeedbackItem: React.FC<FeedbackItemProps> = ({
   const [replyContent, setReplyContent] = useState('');
   const [replyAnonymous, setReplyAnonymous] = useState(false);
   const [isSubmitting, setIsSubmitting] = useState(false);
+  // Top-level items arrive without replies; the thread is fetched on demand
+  const [loadedReplies, setLoadedReplies] = useState<Feedback[] | null>(null);
 
   const canDelete = isAdmin || feedback.user_id === currentUserId;
+  const replies = loadedReplies ?? feedback.replies ?? [];
+  const hiddenReplyCount = depth === 0 && loadedReplies === null ? feedback.reply_count || 0 : 0;
+
+  const loadReplies = async () => {
+    const response = await api.get(`/feedback/${feedback.id}/replies`);
+    setLoadedReplies(response.data);
+  };
+
+  // Changes inside this thread refresh the thread owned by the top-level item
+  const replyInThread = async (feedbackId: string, content: string, isAnonymous: boolean) => {
+    await onReply(feedbackId, content, isAnonymous);
+    if (depth === 0) await loadReplies();
+  };
+
+  const deleteInThread = async (feedbackId: string) => {
+    await onDelete(feedbackId);
+    if (depth === 0 && loadedReplies !== null) await loadReplies();
+  };
 
   const handleReply = async (e: React.FormEvent) => {
     e.preventDefault();
@@ -39,7 +60,7 @@ const FeedbackItem: React.FC<FeedbackItemProps> = ({
 
     setIsSubmitting(true);
     try {
-      await onReply(feedback.id, replyContent, replyAnonymous);
+      await replyInThread(feedback.id, replyContent, replyAnonymous);
       setReplyContent('');
       setShowReplyForm(false);
     } finally {
@@ -60,7 +81,7 @@ const FeedbackItem: React.FC<FeedbackItemProps> = ({
             </span>
             {canDelete && (
               <button
-                onClick={() => onDelete(feedback.id)}
+                onClick={() => deleteInThread(feedback.id)}
                 className="p-1 text-gray-400 hover:text-red-500 transition-colors"
                 title="삭제"
               >
@@ -123,15 +144,25 @@ const FeedbackItem: React.FC<FeedbackItemProps> = ({
         )}
       </div>
 
+      {/* Lazily loaded thread */}
+      {hiddenReplyCount > 0 && (
+        <button
+          onClick={loadReplies}
+          className="mt-1 text-xs text-gray-500 hover:text-primary-600"
+        >
+          답글 {hiddenReplyCount}개 보기
+        </button>
+      )}
+
       {/* Nested replies */}
-      {feedback.replies?.length > 0 && (
+      {replies.length > 0 && (
         <div className="mt-2 space-y-2">
-          {feedback.replies.map((reply) => (
+          {replies.map((reply) => (
             <FeedbackItem
               key={reply.id}
               feedback={reply}
-              onReply={onReply}
-              onDelete={onDelete}
+              onReply={replyInThread}
+              onDelete={deleteInThread}
               isAuthenticated={isAuthenticated}
               currentUserId={currentUserId}
               isAdmin={isAdmin}
@@ -150,6 +181,7 @@ export const RightSidebar: React.FC = () => {
   const { isAuthenticated, user } = useAuthStore();
 
   const [feedbacks, setFeedbacks] = useState<Feedback[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [newFeedback, setNewFeedback] = useState('');
   const [isAnonymous, setIsAnonymous] = useState(false);
   const [isLoading, setIsLoading] = useState(false);
@@ -160,13 +192,40 @@ export const RightSidebar: React.FC = () => {
     fetchFeedbacks();
   }, [currentPassage?.passage.id]);
 
-  const fetchFeedbacks = async () => {
+  // Live updates: new posts are prepended, replies and deletions adjust the list in place
+  useEffect(() => {
+    const applyEvent = ({ type, feedback }: FeedbackEvent) => {
+      setFeedbacks((prev) => {
+        if (!feedback.parent_id) {
+          if (type === 'deleted') return prev.filter((f) => f.id !== feedback.id);
+          if (prev.some((f) => f.id === feedback.id)) return prev;
+          return [feedback, ...prev];
+        }
+        const delta = type === 'created' ? 1 : -1;
+        return prev.map((f) =>
+          f.id === feedback.parent_id
+            ? { ...f, reply_count: Math.max((f.reply_count || 0) + delta, 0) }
+            : f
+        );
+      });
+    };
+    return subscribeFeedback(
+      { passageId: currentPassage?.passage.id },
+      applyEvent,
+      () => fetchFeedbacks()
+    );
+  }, [currentPassage?.passage.id]);
+
+  const fetchFeedbacks = async (cursor?: string) => {
     try {
-      const params = currentPassage?.passage.id
+      const params: Record<string, string> = currentPassage?.passage.id
         ? { passage_id: currentPassage.passage.id }
         : {};
+      if (cursor) params.cursor = cursor;
       const response = await api.get('/feedback', { params });
-      setFeedbacks(response.data);
+      const page: FeedbackPage = response.data;
+      setFeedbacks((prev) => (cursor ? [...prev, ...page.items] : page.items));
+      setNextCursor(page.next_cursor ?? null);
     } catch (error) {
       console.error('Failed to fetch feedbacks:', error);
     }
@@ -257,6 +316,14 @@ export const RightSidebar: React.FC = () => {
             아직 게시글이 없습니다. 첫 게시글을 남겨보세요!
           </p>
         )}
+        {nextCursor && (
+          <button
+            onClick={() => fetchFeedbacks(nextCursor)}
+            className="w-full py-2 text-sm text-primary-600 hover:text-primary-700"
+          >
+            더 보기
+          </button>
+        )}
       </div>
 
       <form onSubmit={handleSubmit} className="absolute bottom-[72px] left-0 right-0 p-4 border-t border-gray-200 bg-white">
@@ -218,7 +218,12 @@ export const PassageView: React.FC<PassageViewProps> = ({ context }) => {
         />
       ) : (
         <TwinePassageRenderer
-          content={(passage.passage_type === 'branch' || passage.passage_type === 'start') ? cleanContent : (passageContent || '')}
+          content={
+            // Prefer server-compiled content unless it was just edited inline
+            context.rendered && passageContent === passage.content
+              ? context.rendered.html
+              : (passage.passage_type === 'branch' || passage.passage_type === 'start') ? cleanContent : (passageContent || '')
+          }
           state={twineState}
           onStateChange={handleStateChange}
           onNavigate={handleNavigate}
@@ -31,15 +31,15 @@ import {
   ExternalLink,
 } from 'lucide-react';
 import api from '../../services/api';
+import { subscribeFeedback } from '../../services/feedbackStream';
 import { Layout } from '../../components/layout';
 import { Card, Button } from '../../components/common';
-import type { Story, Feedback } from '../../types';
+import type { Story, Feedback, FeedbackPage } from '../../types';
 
 interface FeedbackWithPassageInfo extends Feedback {
   passage_name?: string;
   story_id?: string;
   story_name?: string;
-  reply_count?: number;
 }
 
 // Available icons for stories
@@ -79,7 +79,9 @@ export const AdminDashboard: React.FC = () => {
   const [stories, setStories] = useState<Story[]>([]);
   const [feedbacks, setFeedbacks] = useState<FeedbackWithPassageInfo[]>([]);
   const [selectedStoryFilter, setSelectedStoryFilter] = useState<string>('');
+  const [nextFeedbackCursor, setNextFeedbackCursor] = useState<string | null>(null);
   const [expandedFeedbackId, setExpandedFeedbackId] = useState<string | null>(null);
+  const [threadReplies, setThreadReplies] = useState<Record<string, Feedback[]>>({});
   const [replyingTo, setReplyingTo] = useState<string | null>(null);
   const [replyContent, setReplyContent] = useState('');
   const [isLoading, setIsLoading] = useState(true);
@@ -101,6 +103,20 @@ export const AdminDashboard: React.FC = () => {
     fetchFeedbacks();
   }, [selectedStoryFilter]);
 
+  // Live updates: refetch the first page when feedback in scope changes (bursts coalesced)
+  useEffect(() => {
+    let timer: ReturnType<typeof setTimeout> | undefined;
+    const refresh = () => {
+      clearTimeout(timer);
+      timer = setTimeout(() => fetchFeedbacks(), 500);
+    };
+    const unsubscribe = subscribeFeedback({ storyId: selectedStoryFilter || undefined }, refresh, refresh);
+    return () => {
+      clearTimeout(timer);
+      unsubscribe();
+    };
+  }, [selectedStoryFilter]);
+
   const fetchData = async () => {
     try {
       const [statsRes, storiesRes] = await Promise.all([
@@ -116,16 +132,38 @@ export const AdminDashboard: React.FC = () => {
     }
   };
 
-  const fetchFeedbacks = async () => {
+  const fetchFeedbacks = async (cursor?: string) => {
     try {
-      const params = selectedStoryFilter ? { story_id: selectedStoryFilter } : {};
+      const params: Record<string, string> = selectedStoryFilter ? { story_id: selectedStoryFilter } : {};
+      if (cursor) params.cursor = cursor;
       const res = await api.get('/admin/feedback/all', { params });
-      setFeedbacks(res.data);
+      const page: FeedbackPage<FeedbackWithPassageInfo> = res.data;
+      setFeedbacks((prev) => (cursor ? [...prev, ...page.items] : page.items));
+      setNextFeedbackCursor(page.next_cursor ?? null);
     } catch (error) {
       console.error('Failed to fetch feedbacks:', error);
     }
   };
 
+  // Replies are not part of the listing; a thread is fetched when it is expanded
+  const fetchThread = async (feedbackId: string) => {
+    try {
+      const res = await api.get(`/feedback/${feedbackId}/replies`);
+      setThreadReplies((prev) => ({ ...prev, [feedbackId]: res.data }));
+    } catch (error) {
+      console.error('Failed to fetch replies:', error);
+    }
+  };
+
+  const toggleThread = (feedbackId: string) => {
+    if (expandedFeedbackId === feedbackId) {
+      setExpandedFeedbackId(null);
+      return;
+    }
+    setExpandedFeedbackId(feedbackId);
+    fetchThread(feedbackId);
+  };
+
   const handleReplyFeedback = async (feedbackId: string) => {
     if (!replyContent.trim()) return;
     try {
@@ -136,6 +174,7 @@ export const AdminDashboard: React.FC = () => {
       setReplyContent('');
       setReplyingTo(null);
       fetchFeedbacks();
+      if (expandedFeedbackId === feedbackId) fetchThread(feedbackId);
     } catch (error) {
       console.error('Failed to reply:', error);
     }
@@ -146,6 +185,7 @@ export const AdminDashboard: React.FC = () => {
     try {
       await api.delete(`/feedback/${feedbackId}`);
       fetchFeedbacks();
+      if (expandedFeedbackId) fetchThread(expandedFeedbackId);
     } catch (error) {
       console.error('Failed to delete feedback:', error);
     }
@@ -644,9 +684,7 @@ export const AdminDashboard: React.FC = () => {
                     </div>
                     <div className="flex items-center gap-1">
                       <button
-                        onClick={() => setExpandedFeedbackId(
-                          expandedFeedbackId === feedback.id ? null : feedback.id
-                        )}
+                        onClick={() => toggleThread(feedback.id)}
                         className="p-1 text-gray-400 hover:text-gray-600"
                       >
                         {expandedFeedbackId === feedback.id ? (
@@ -714,9 +752,9 @@ export const AdminDashboard: React.FC = () => {
                 </div>
 
                 {/* Expanded replies */}
-                {expandedFeedbackId === feedback.id && feedback.replies && feedback.replies.length > 0 && (
+                {expandedFeedbackId === feedback.id && (threadReplies[feedback.id]?.length ?? 0) > 0 && (
                   <div className="border-t border-gray-200 bg-white p-4 space-y-3">
-                    {feedback.replies.map((reply) => (
+                    {threadReplies[feedback.id].map((reply) => (
                       <div
                         key={reply.id}
                         className="pl-4 border-l-2 border-primary-200"
@@ -748,6 +786,15 @@ export const AdminDashboard: React.FC = () => {
                 아직 게시글이 없습니다.
               </p>
             )}
+
+            {nextFeedbackCursor && (
+              <button
+                onClick={() => fetchFeedbacks(nextFeedbackCursor)}
+                className="w-full py-2 text-sm text-primary-600 hover:text-primary-700"
+              >
+                더 보기
+              </button>
+            )}
           </div>
         </Card>
       </div>
@@ -0,0 +1,37 @@
+// Live feedback updates over Server-Sent Events (GET /api/feedback/stream[...])
+import type { Feedback } from '../types';
+
+export interface FeedbackEvent {
+  type: 'created' | 'deleted';
+  feedback: Feedback;
+}
+
+/**
+ * Subscribe to feedback changes of one passage, one story or everything.
+ * onResync fires when events may have been missed (the server dropped a backlog,
+ * or the browser reconnected); the caller should refetch its list.
+ * Returns the unsubscribe function.
+ */
+export function subscribeFeedback(
+  scope: { passageId?: string; storyId?: string },
+  onEvent: (event: FeedbackEvent) => void,
+  onResync: () => void
+): () => void {
+  if (typeof EventSource === 'undefined') return () => undefined;
+
+  let path = '/api/feedback/stream';
+  if (scope.passageId) path += `/passages/${scope.passageId}`;
+  else if (scope.storyId) path += `/stories/${scope.storyId}`;
+
+  const source = new EventSource(path);
+  let connected = false;
+
+  source.addEventListener('open', () => {
+    if (connected) onResync();
+    connected = true;
+  });
+  source.addEventListener('feedback', (e) => onEvent(JSON.parse((e as MessageEvent).data)));
+  source.addEventListener('resync', onResync);
+
+  return () => source.close();
+}
@@ -0,0 +1,58 @@
+// Dwell-time beacons: measures how long each logged visit stays on screen
+// and reports it in batches via navigator.sendBeacon (POST /api/visits/beacon)
+
+interface PendingDwell {
+  visit_id: string;
+  duration: number;
+}
+
+const BEACON_URL = '/api/visits/beacon';
+const MAX_BATCH = 20;
+
+let currentVisitId: string | null = null;
+let startedAt = 0;
+let pending: PendingDwell[] = [];
+
+function closeCurrentVisit() {
+  if (!currentVisitId) return;
+  pending.push({ visit_id: currentVisitId, duration: Math.round((Date.now() - startedAt) / 100) / 10 });
+  currentVisitId = null;
+}
+
+function flush() {
+  if (pending.length === 0) return;
+  const body = JSON.stringify(pending);
+  pending = [];
+  if (navigator.sendBeacon) {
+    navigator.sendBeacon(BEACON_URL, body);
+  } else {
+    fetch(BEACON_URL, { method: 'POST', body, keepalive: true }).catch(() => undefined);
+  }
+}
+
+/** Start timing a new visit (closes the previous one) */
+export function trackVisit(visitId: string | null | undefined) {
+  if (visitId === currentVisitId) return;
+  closeCurrentVisit();
+  if (pending.length >= MAX_BATCH) flush();
+  if (!visitId) return;
+
+  currentVisitId = visitId;
+  startedAt = Date.now();
+}
+
+if (typeof document !== 'undefined') {
+  // The server keeps the first duration reported per visit, so leaving the tab
+  // ends the visit; time after coming back is not counted
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') {
+      closeCurrentVisit();
+      flush();
+    }
+  });
+
+  window.addEventListener('pagehide', () => {
+    closeCurrentVisit();
+    flush();
+  });
+}
@@ -1,5 +1,6 @@
 import { create } from 'zustand';
 import api from '../services/api';
+import { trackVisit } from '../services/visitBeacon';
 import type { Story, PassageWithContext, Bookmark, Link, StoryWithPassages } from '../types';
 
 interface HistoryEntry {
@@ -29,7 +30,7 @@ interface StoryState {
   fetchStories: () => Promise<void>;
   fetchStory: (storyId: string) => Promise<void>;
   fetchStoryStructure: (storyId: string) => Promise<void>;
-  startStory: (storyId: string) => Promise<void>;
+  startStory: (storyId: string, resume?: boolean) => Promise<void>;
   loadPassageById: (passageId: string, updateHistory?: boolean) => Promise<void>;
   loadPassageByNumber: (passageNumber: number, storyId: string) => Promise<void>;
   navigateToPassage: (passageIdOrName: string, prevPassageId?: string) => Promise<void>;
@@ -131,11 +132,13 @@ export const useStoryStore = create<StoryState>((set, get) => ({
     }
   },
 
-  startStory: async (storyId: string) => {
+  startStory: async (storyId: string, resume = false) => {
     set({ isLoading: true });
     try {
       await get().fetchStory(storyId);
-      const response = await api.get(`/stories/${storyId}/start`);
+      // Signed-in readers continue from their server-side reading session
+      const path = resume ? `/stories/${storyId}/resume` : `/stories/${storyId}/start`;
+      const response = await api.get(path, { params: { render: true } });
       const passage = response.data.passage;
       set({
         currentPassage: response.data,
@@ -154,7 +157,7 @@ export const useStoryStore = create<StoryState>((set, get) => ({
     set({ isLoading: true });
     try {
       // Get the passage without previous context (used for direct URL access)
-      const response = await api.get(`/passages/${passageId}`);
+      const response = await api.get(`/passages/${passageId}`, { params: { prefetch: 1, render: true } });
       const passage = response.data.passage;
       const storyId = passage.story_id;
 
@@ -233,12 +236,12 @@ export const useStoryStore = create<StoryState>((set, get) => ({
       let response;
       if (isUuid) {
         response = await api.get(`/passages/${passageIdOrName}`, {
-          params: { previous_passage_id: prev },
+          params: { previous_passage_id: prev, prefetch: 1, render: true },
         });
       } else {
         // Navigate by name - need to find the passage first
         response = await api.get(`/stories/${storyId}/passages/by-name/${encodeURIComponent(passageIdOrName)}`, {
-          params: { previous_passage_id: prev },
+          params: { previous_passage_id: prev, render: true },
         });
       }
 
@@ -260,22 +263,19 @@ export const useStoryStore = create<StoryState>((set, get) => ({
   },
 
   navigateViaLink: async (linkId: string) => {
-    const currentPassageId = get().currentPassage?.passage.id;
+    const current = get().currentPassage;
+    const currentPassageId = current?.passage.id;
     if (!currentPassageId) return;
 
-    set({ isLoading: true });
-    try {
-      const response = await api.post(`/passages/${currentPassageId}/navigate`, {
-        link_id: linkId,
-      });
-      const passage = response.data.passage;
+    const applyContext = (context: PassageWithContext) => {
+      const passage = context.passage;
       set((state) => {
         // Truncate history after current index (like browser back/forward)
         const truncatedHistory = state.navigationHistory.slice(0, state.currentHistoryIndex + 1);
         const truncatedHistoryWithNames = state.navigationHistoryWithNames.slice(0, state.currentHistoryIndex + 1);
 
         return {
-          currentPassage: response.data,
+          currentPassage: context,
           previousPassageId: currentPassageId,
           navigationHistory: [...truncatedHistory, passage.id],
           navigationHistoryWithNames: [...truncatedHistoryWithNames, { id: passage.id, name: passage.name }],
@@ -283,6 +283,30 @@ export const useStoryStore = create<StoryState>((set, get) => ({
         };
       });
       get().saveLastVisit();
+    };
+
+    const navigateRequest = () =>
+      api.post(`/passages/${currentPassageId}/navigate`, { link_id: linkId }, { params: { prefetch: 1, render: true } });
+
+    // Render the prefetched next hop immediately, then refresh its own prefetch in the background
+    const link = current.available_links.find((l) => l.id === linkId);
+    const prefetched = link && current.prefetched?.find((p) => p.passage.id === link.target_passage_id);
+    if (prefetched) {
+      applyContext(prefetched);
+      navigateRequest()
+        .then((response) => {
+          if (get().currentPassage?.passage.id === response.data.passage.id) {
+            set({ currentPassage: response.data });
+          }
+        })
+        .catch((error) => console.error('Failed to refresh prefetched passage:', error));
+      return;
+    }
+
+    set({ isLoading: true });
+    try {
+      const response = await navigateRequest();
+      applyContext(response.data);
     } finally {
       set({ isLoading: false });
     }
@@ -301,7 +325,7 @@ export const useStoryStore = create<StoryState>((set, get) => ({
     set({ isLoading: true });
     try {
       const response = await api.get(`/passages/${passageId}`, {
-        params: { previous_passage_id: prevPassageId },
+        params: { previous_passage_id: prevPassageId, render: true },
       });
       set({
         currentPassage: response.data,
@@ -324,7 +348,7 @@ export const useStoryStore = create<StoryState>((set, get) => ({
     set({ isLoading: true });
     try {
       const response = await api.get(`/passages/${passageId}`, {
-        params: { previous_passage_id: prevPassageId },
+        params: { previous_passage_id: prevPassageId, render: true },
       });
       set({
         currentPassage: response.data,
@@ -346,7 +370,7 @@ export const useStoryStore = create<StoryState>((set, get) => ({
     set({ isLoading: true });
     try {
       const response = await api.get(`/passages/${passageId}`, {
-        params: { previous_passage_id: prevPassageId },
+        params: { previous_passage_id: prevPassageId, render: true },
       });
 
       // Update navigation history to reflect this jump
@@ -376,14 +400,15 @@ export const useStoryStore = create<StoryState>((set, get) => ({
     }
   },
 
+  // The add response already carries passage/story names, so the list is updated in place
   addBookmark: async (passageId: string) => {
-    await api.post(`/bookmarks/${passageId}`);
-    await get().fetchBookmarks();
+    const response = await api.post(`/bookmarks/${passageId}`);
+    set({ bookmarks: [response.data, ...get().bookmarks.filter((b) => b.passage_id !== passageId)] });
   },
 
   removeBookmark: async (passageId: string) => {
     await api.delete(`/bookmarks/${passageId}`);
-    await get().fetchBookmarks();
+    set({ bookmarks: get().bookmarks.filter((b) => b.passage_id !== passageId) });
   },
 
   saveLastVisit: () => {
@@ -417,7 +442,7 @@ export const useStoryStore = create<StoryState>((set, get) => ({
 
     try {
       const response = await api.get(`/passages/${currentPassage.passage.id}`, {
-        params: { previous_passage_id: previousPassageId },
+        params: { previous_passage_id: previousPassageId, render: true },
       });
       set({ currentPassage: response.data });
     } catch (error) {
@@ -425,3 +450,10 @@ export const useStoryStore = create<StoryState>((set, get) => ({
     }
   },
 }));
+
+// Time each logged visit for dwell-time beacons
+useStoryStore.subscribe((state, prevState) => {
+  if (state.currentPassage?.visit_id !== prevState.currentPassage?.visit_id) {
+    trackVisit(state.currentPassage?.visit_id);
+  }
+});
@@ -54,11 +54,20 @@ export interface StoryWithPassages extends Story {
   links: Link[];
 }
 
+export interface RenderedContent {
+  content_hash: string;
+  html: string;
+  is_static: boolean;
+}
+
 export interface PassageWithContext {
   passage: Passage;
   available_links: Link[];
   previous_passage_id?: string;
   is_end: boolean;
+  rendered?: RenderedContent;
+  prefetched?: PassageWithContext[];
+  visit_id?: string;
 }
 
 export interface Feedback {
@@ -71,15 +80,22 @@ export interface Feedback {
   parent_id?: string;
   created_at: string;
   updated_at: string;
+  reply_count?: number;
   replies: Feedback[];
 }
 
+export interface FeedbackPage<T = Feedback> {
+  items: T[];
+  next_cursor?: string | null;
+}
+
 export interface Bookmark {
   id: string;
   user_id: string;
   passage_id: string;
   passage_name?: string;
   story_id?: string;
+  story_name?: string;
   created_at: string;
 }
 